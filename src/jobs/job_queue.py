@@ -0,0 +1,279 @@
+from typing import Dict, Any, List, Optional
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from pydantic import BaseModel
+
+# Job states; the last three are final
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = "queued", "running", "succeeded", "failed", "cancelled"
+FINAL_STATES = {SUCCEEDED, FAILED, CANCELLED}
+
+class Job(BaseModel):
+    """A queued unit of work and its outcome."""
+    id: str
+    tenant: str
+    priority: int
+    status: str
+    payload: Dict[str, Any]
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    cancel_requested: bool = False
+    worker: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+class JobQueue:
+    """Persistent job queue shared by the API and worker processes (SQLite).
+
+    Workers claim the next job atomically. Tenants with the fewest running
+    jobs go first, so one tenant's backlog cannot starve the others; within
+    that, higher priorities, then the least recently served tenant, then
+    older jobs win. Running jobs send heartbeats, and jobs whose worker
+    stopped sending them are requeued (or failed after ``max_attempts``).
+    """
+
+    def __init__(self, path: str = "./data/jobs.db", max_attempts: int = 3):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.logger = logging.getLogger("job_queue")
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connect()
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS jobs ("
+                    "id TEXT PRIMARY KEY, tenant TEXT NOT NULL, priority INTEGER NOT NULL, "
+                    "status TEXT NOT NULL, payload TEXT NOT NULL, result TEXT, error TEXT, "
+                    "attempts INTEGER NOT NULL DEFAULT 0, cancel_requested INTEGER NOT NULL DEFAULT 0, "
+                    "worker TEXT, created_at REAL NOT NULL, started_at REAL, finished_at REAL, heartbeat_at REAL)"
+                )
+                connection.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, tenant)")
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS tenants (tenant TEXT PRIMARY KEY, last_served REAL NOT NULL)"
+                )
+        finally:
+            connection.close()
+
+    async def submit(self, payload: Dict[str, Any], tenant: str = "default", priority: int = 0) -> Job:
+        """Queue a job and return it."""
+        return await asyncio.to_thread(self._submit, payload, tenant, priority)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        """Return a job, or None if it does not exist."""
+        return await asyncio.to_thread(self._get, job_id)
+
+    async def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued job, or ask the worker running it to stop.
+
+        Finished jobs are returned unchanged.
+        """
+        return await asyncio.to_thread(self._cancel, job_id)
+
+    async def claim(self, worker: str) -> Optional[Job]:
+        """Mark the next job running on behalf of ``worker`` and return it."""
+        return await asyncio.to_thread(self._claim, worker)
+
+    async def heartbeat(self, job_id: str) -> bool:
+        """Record that a job is still running; returns whether it should be cancelled."""
+        return await asyncio.to_thread(self._heartbeat, job_id)
+
+    async def finish(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None
+    ):
+        """Record the final state of a running job."""
+        await asyncio.to_thread(self._finish, job_id, status, result, error)
+
+    async def requeue_stale(self, timeout: float) -> List[str]:
+        """Requeue running jobs without a heartbeat for ``timeout`` seconds."""
+        return await asyncio.to_thread(self._requeue_stale, timeout)
+
+    async def counts(self) -> Dict[str, int]:
+        """Return the number of jobs in each state."""
+        return await asyncio.to_thread(self._counts)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode; transactions are opened explicitly where needed
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    @staticmethod
+    def _job(row: sqlite3.Row) -> Job:
+        return Job(
+            id=row["id"],
+            tenant=row["tenant"],
+            priority=row["priority"],
+            status=row["status"],
+            payload=json.loads(row["payload"]),
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=row["error"],
+            attempts=row["attempts"],
+            cancel_requested=bool(row["cancel_requested"]),
+            worker=row["worker"],
+            created_at=row["created_at"],
+            started_at=row["started_at"],
+            finished_at=row["finished_at"]
+        )
+
+    def _submit(self, payload: Dict[str, Any], tenant: str, priority: int) -> Job:
+        job_id = uuid.uuid4().hex
+        connection = self._connect()
+        try:
+            connection.execute(
+                "INSERT INTO jobs (id, tenant, priority, status, payload, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, tenant, priority, QUEUED, json.dumps(payload), time.time())
+            )
+            return self._job(connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+        finally:
+            connection.close()
+
+    def _get(self, job_id: str) -> Optional[Job]:
+        connection = self._connect()
+        try:
+            row = connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return self._job(row) if row else None
+        finally:
+            connection.close()
+
+    def _cancel(self, job_id: str) -> Optional[Job]:
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+                (CANCELLED, time.time(), job_id, QUEUED)
+            )
+            connection.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?",
+                (job_id, RUNNING)
+            )
+            row = connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            connection.execute("COMMIT")
+            return self._job(row) if row else None
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+
+    def _claim(self, worker: str) -> Optional[Job]:
+        connection = self._connect()
+        try:
+            # IMMEDIATE takes the write lock up front, so two workers never claim the same job
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute(
+                "SELECT j.id, j.tenant FROM jobs j "
+                "LEFT JOIN (SELECT tenant, COUNT(*) AS running FROM jobs WHERE status = ? GROUP BY tenant) r "
+                "ON r.tenant = j.tenant "
+                "LEFT JOIN tenants t ON t.tenant = j.tenant "
+                "WHERE j.status = ? "
+                "ORDER BY COALESCE(r.running, 0), j.priority DESC, COALESCE(t.last_served, 0), j.created_at "
+                "LIMIT 1",
+                (RUNNING, QUEUED)
+            ).fetchone()
+            if row is None:
+                connection.execute("COMMIT")
+                return None
+            now = time.time()
+            connection.execute(
+                "UPDATE jobs SET status = ?, worker = ?, attempts = attempts + 1, "
+                "started_at = ?, heartbeat_at = ? WHERE id = ?",
+                (RUNNING, worker, now, now, row["id"])
+            )
+            connection.execute(
+                "INSERT OR REPLACE INTO tenants (tenant, last_served) VALUES (?, ?)",
+                (row["tenant"], now)
+            )
+            job = connection.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+            connection.execute("COMMIT")
+            return self._job(job)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+
+    def _heartbeat(self, job_id: str) -> bool:
+        connection = self._connect()
+        try:
+            connection.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = ?",
+                (time.time(), job_id, RUNNING)
+            )
+            row = connection.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return bool(row and row["cancel_requested"])
+        finally:
+            connection.close()
+
+    def _finish(self, job_id: str, status: str, result: Optional[Dict[str, Any]], error: Optional[str]):
+        connection = self._connect()
+        try:
+            connection.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ? AND status = ?",
+                (status, json.dumps(result, default=str) if result is not None else None, error,
+                 time.time(), job_id, RUNNING)
+            )
+        finally:
+            connection.close()
+
+    def _requeue_stale(self, timeout: float) -> List[str]:
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            stale = connection.execute(
+                "SELECT id, attempts, cancel_requested FROM jobs WHERE status = ? AND heartbeat_at < ?",
+                (RUNNING, time.time() - timeout)
+            ).fetchall()
+            for row in stale:
+                if row["cancel_requested"]:
+                    status, error = CANCELLED, None
+                elif row["attempts"] >= self.max_attempts:
+                    status, error = FAILED, "Worker stopped responding"
+                else:
+                    status, error = QUEUED, None
+                connection.execute(
+                    "UPDATE jobs SET status = ?, error = ?, worker = NULL, finished_at = ? WHERE id = ?",
+                    (status, error, time.time() if status in FINAL_STATES else None, row["id"])
+                )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+        if stale:
+            self.logger.warning(f"Recovered {len(stale)} jobs from unresponsive workers")
+        return [row["id"] for row in stale]
+
+    def _counts(self) -> Dict[str, int]:
+        connection = self._connect()
+        try:
+            rows = connection.execute("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status").fetchall()
+            return {row["status"]: row["count"] for row in rows}
+        finally:
+            connection.close()
+
+_shared_queue: Optional[JobQueue] = None
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide job queue."""
+    global _shared_queue
+    if _shared_queue is None:
+        _shared_queue = JobQueue(
+            path=os.getenv("JOB_QUEUE_DB", "./data/jobs.db"),
+            max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+        )
+    return _shared_queue
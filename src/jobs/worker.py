@@ -0,0 +1,205 @@
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Tuple
+import asyncio
+import logging
+import multiprocessing
+import os
+from .job_queue import JobQueue, Job, SUCCEEDED, FAILED, CANCELLED, get_job_queue
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+class JobWorker:
+    """Claims jobs from the queue and runs them one at a time.
+
+    While a job runs the worker sends heartbeats, which is also when it
+    notices cancellation requests and cancels the job's task.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handler: JobHandler,
+        worker_id: str,
+        poll_interval: float = 1.0,
+        heartbeat_interval: float = 5.0,
+        stale_timeout: float = 120.0
+    ):
+        self.queue = queue
+        self.handler = handler
+        self.worker_id = worker_id
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_timeout = stale_timeout
+        self.logger = logging.getLogger("job_worker")
+
+    async def run(self, should_stop: Callable[[], bool] = lambda: False):
+        """Process jobs until ``should_stop`` returns True."""
+        while not should_stop():
+            await self.queue.requeue_stale(self.stale_timeout)
+            if not await self.run_once():
+                await asyncio.sleep(self.poll_interval)
+
+    async def run_once(self) -> bool:
+        """Claim and process one job; returns False when the queue is empty."""
+        job = await self.queue.claim(self.worker_id)
+        if job is None:
+            return False
+        await self.process(job)
+        return True
+
+    async def process(self, job: Job):
+        self.logger.info(f"Worker {self.worker_id} running job {job.id} for tenant {job.tenant}")
+        task = asyncio.create_task(self.handler(job.payload))
+        cancelled = False
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=self.heartbeat_interval)
+            if done:
+                break
+            if await self.queue.heartbeat(job.id):
+                cancelled = True
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                break
+
+        if cancelled or task.cancelled():
+            await self.queue.finish(job.id, CANCELLED)
+        elif task.exception() is not None:
+            self.logger.error(f"Job {job.id} failed: {str(task.exception())}")
+            await self.queue.finish(job.id, FAILED, error=str(task.exception()))
+        else:
+            await self.queue.finish(job.id, SUCCEEDED, result=task.result())
+
+async def create_generation_handler(
+    llm: Optional[Any] = None,
+    browser_pool: Optional[Any] = None
+) -> Tuple[JobHandler, Callable[[], Awaitable[None]]]:
+    """Build the handler running code generation jobs, and its cleanup.
+
+    The OpenAI interface and the shared browser pool are used unless an LLM
+    or a browser pool is given.
+    """
+    from src.llm.checkpoint import get_checkpoint_store
+    from src.llm.orchestration import FormMigrationOrchestrator
+    from src.tools.base import ToolRegistry
+    from src.tools.browser_pool import get_browser_pool
+    from src.tools.code_generation import CodeGenerationTool
+    from src.tools.form_analysis import FormAnalysisTool
+    from src.tools.static_extraction import close_http_client
+    from src.tools.web_navigation import WebNavigationTool
+
+    if llm is None:
+        from src.llm.base import LLMConfig
+        from src.llm.openai_interface import OpenAIInterface
+        llm = OpenAIInterface(LLMConfig())
+    browser_pool = browser_pool or get_browser_pool()
+    tool_registry = ToolRegistry()
+    tool_registry.register(WebNavigationTool(browser_pool=browser_pool))
+    tool_registry.register(FormAnalysisTool())
+    tool_registry.register(CodeGenerationTool())
+    orchestrator = FormMigrationOrchestrator(
+        llm=llm,
+        tool_registry=tool_registry,
+        # A job requeued after its worker died resumes from its last completed step
+        checkpoint_store=get_checkpoint_store()
+    )
+    await browser_pool.start()
+
+    async def handle(payload: Dict[str, Any]) -> Dict[str, Any]:
+        plan = await orchestrator.create_plan({
+            "form_url": payload["url"],
+            "platform": payload.get("platform"),
+            "form_name": payload.get("form_name"),
+            "language": payload.get("language"),
+            "params": payload.get("params", {})
+        })
+        result = await orchestrator.execute_plan(plan)
+        if not result["success"]:
+            raise RuntimeError("; ".join(f"{step}: {error}" for step, error in result["errors"].items()))
+        return result
+
+    async def cleanup():
+        for name in tool_registry.list_tools():
+            await tool_registry.get_tool(name).cleanup()
+        await browser_pool.stop()
+        await close_http_client()
+
+    return handle, cleanup
+
+def run_worker_process(worker_id: str, stop_event: Any):
+    """Entry point of a worker process."""
+    from src.config.logging import setup_logging
+    setup_logging()
+
+    async def serve():
+        handler, cleanup = await create_generation_handler()
+        worker = JobWorker(
+            get_job_queue(),
+            handler,
+            worker_id,
+            poll_interval=float(os.getenv("JOB_POLL_INTERVAL", "1")),
+            stale_timeout=float(os.getenv("JOB_STALE_TIMEOUT", "120"))
+        )
+        try:
+            await worker.run(stop_event.is_set)
+        finally:
+            await cleanup()
+
+    asyncio.run(serve())
+
+class WorkerPool:
+    """A pool of local worker processes draining the job queue."""
+
+    def __init__(self, size: int, target: Callable[[str, Any], None] = run_worker_process):
+        self.size = size
+        self.target = target
+        self.logger = logging.getLogger("worker_pool")
+        # Spawned, not forked, so workers never inherit the API's event loop or browser
+        self._context = multiprocessing.get_context("spawn")
+        self._stop_event = self._context.Event()
+        self._processes: List[multiprocessing.Process] = []
+
+    def start(self):
+        self._stop_event.clear()
+        for index in range(self.size):
+            self._spawn(f"worker-{os.getpid()}-{index}")
+        self.logger.info(f"Started {self.size} job workers")
+
+    def replace_dead(self) -> int:
+        """Restart workers that exited unexpectedly; returns how many were restarted."""
+        if self._stop_event.is_set():
+            return 0
+        dead = [process for process in self._processes if not process.is_alive()]
+        for process in dead:
+            self._processes.remove(process)
+            self.logger.warning(f"Job worker {process.name} exited with code {process.exitcode}; restarting it")
+            self._spawn(process.name)
+        return len(dead)
+
+    async def supervise(self, interval: float = 5.0):
+        """Periodically restart dead workers until the pool is stopped."""
+        while not self._stop_event.is_set():
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(self.replace_dead)
+
+    def stop(self, timeout: float = 30.0):
+        """Ask workers to stop after their current job; terminate those that do not."""
+        self._stop_event.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self._processes.clear()
+
+    def _spawn(self, name: str):
+        process = self._context.Process(target=self.target, args=(name, self._stop_event), name=name, daemon=True)
+        process.start()
+        self._processes.append(process)
+
+_shared_pool: Optional[WorkerPool] = None
+
+def get_worker_pool() -> WorkerPool:
+    """Return the process-wide worker pool."""
+    global _shared_pool
+    if _shared_pool is None:
+        _shared_pool = WorkerPool(int(os.getenv("JOB_WORKERS", "2")))
+    return _shared_pool
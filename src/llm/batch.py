@@ -0,0 +1,227 @@
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, List, Optional
+import asyncio
+import json
+import logging
+import time
+from pydantic import BaseModel
+from .base import BaseLLMInterface
+from .orchestration import render_prompt
+from ..tools.base import ToolRegistry
+
+VALIDATION_PROMPT = (
+    "Validate the generated code of each of the following forms. Respond with a JSON "
+    "array holding one validation object per form, in the same order:\n{forms}"
+)
+
+class BatchConfig(BaseModel):
+    """Worker pools, queue bounds and LLM batching of a batch migration."""
+    crawl_workers: int = 4
+    analyze_workers: int = 2
+    generate_workers: int = 2
+    validate_workers: int = 1
+    # Items allowed to wait between two stages before the upstream stage blocks
+    queue_size: int = 8
+    # Forms validated by one LLM call, and how long to wait to fill a batch
+    llm_batch_size: int = 5
+    llm_batch_wait: float = 0.5
+    # Without LLM validation forms are yielded as soon as their code is generated
+    llm_validation: bool = True
+    crawl_params: Dict[str, Any] = {}
+    targets: List[Dict[str, Any]] = [{"language": "python", "framework": "fastapi"}]
+
+class BatchItem(BaseModel):
+    """Progress of one form through the batch pipeline."""
+    url: str
+    form_data: Optional[Dict[str, Any]] = None
+    analysis: Optional[Dict[str, Any]] = None
+    generated: Dict[str, Any] = {}
+    validation: Optional[Any] = None
+    error: Optional[str] = None
+    failed_stage: Optional[str] = None
+    timing: Dict[str, float] = {}
+
+    def generation_input(self) -> Dict[str, Any]:
+        """Return the code generation analysis: the analyzed rules and handlers with the extracted elements."""
+        return {**self.analysis, "elements": self.form_data["elements"]}
+
+def target_key(target: Dict[str, Any]) -> str:
+    """Return the key of a generation target, e.g. ``python-fastapi``."""
+    return target.get("name") or "-".join(str(value) for value in target.values())
+
+class BatchPipeline:
+    """Migrates many forms through the crawl, analyze, generate and validate stages.
+
+    Every stage has its own worker pool and reads from a bounded queue fed by
+    the previous stage, so browser, CPU and LLM work overlap across forms.
+    The validate stage groups forms into micro-batches, one LLM call each.
+    A form that fails a stage skips the remaining stages.
+    """
+
+    def __init__(
+        self,
+        llm: Optional[BaseLLMInterface],
+        tool_registry: ToolRegistry,
+        config: Optional[BatchConfig] = None
+    ):
+        self.llm = llm
+        self.tool_registry = tool_registry
+        self.config = config or BatchConfig()
+        self.logger = logging.getLogger("batch_pipeline")
+
+    async def run(self, urls: List[str], context: Optional[Dict[str, Any]] = None) -> AsyncIterator[BatchItem]:
+        """Run the forms through the pipeline and yield each one as it completes."""
+        context = context or {}
+        stages = [
+            ("crawl", self.config.crawl_workers, lambda item: self._crawl(item, context)),
+            ("analyze", self.config.analyze_workers, lambda item: self._analyze(item, context)),
+            ("generate", self.config.generate_workers, lambda item: self._generate(item, context))
+        ]
+        validate = self.config.llm_validation and self.llm is not None
+        results: asyncio.Queue = asyncio.Queue()
+        queues = [asyncio.Queue(maxsize=self.config.queue_size) for _ in range(len(stages))]
+        queues.append(asyncio.Queue(maxsize=self.config.queue_size) if validate else results)
+
+        async def feed():
+            for url in urls:
+                await queues[0].put(BatchItem(url=url))
+            await queues[0].put(None)
+
+        tasks = [asyncio.create_task(feed())]
+        for index, (name, workers, handler) in enumerate(stages):
+            tasks.append(asyncio.create_task(
+                self._run_stage(name, workers, queues[index], queues[index + 1], handler)
+            ))
+        if validate:
+            tasks.append(asyncio.create_task(
+                self._run_validate_stage(queues[-1], results)
+            ))
+        try:
+            while True:
+                item = await results.get()
+                if item is None:
+                    break
+                yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run_stage(
+        self,
+        name: str,
+        workers: int,
+        inbox: asyncio.Queue,
+        outbox: asyncio.Queue,
+        handler: Callable[[BatchItem], Awaitable[None]]
+    ):
+        """Run a stage's worker pool until the end-of-input marker arrives."""
+        async def worker():
+            while True:
+                item = await inbox.get()
+                if item is None:
+                    # Pass the marker on to the sibling workers
+                    await inbox.put(None)
+                    return
+                if item.error is None:
+                    await self._timed(name, item, handler(item))
+                await outbox.put(item)
+
+        await asyncio.gather(*(worker() for _ in range(max(1, workers))))
+        await outbox.put(None)
+
+    async def _run_validate_stage(self, inbox: asyncio.Queue, outbox: asyncio.Queue):
+        """Validate forms in micro-batches of up to ``llm_batch_size`` per LLM call."""
+        async def worker():
+            finished = False
+            while not finished:
+                batch = [await inbox.get()]
+                if batch[0] is None:
+                    break
+                deadline = time.monotonic() + self.config.llm_batch_wait
+                while len(batch) < self.config.llm_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(inbox.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    if item is None:
+                        finished = True
+                        break
+                    batch.append(item)
+                pending = [item for item in batch if item.error is None]
+                if pending:
+                    await self._timed("validate", pending, self._validate(pending))
+                for item in batch:
+                    await outbox.put(item)
+            await inbox.put(None)
+
+        await asyncio.gather(*(worker() for _ in range(max(1, self.config.validate_workers))))
+        await outbox.put(None)
+
+    async def _timed(self, name: str, items: Any, work: Awaitable[None]):
+        """Run a stage's work, recording its duration and any failure on the items."""
+        items = items if isinstance(items, list) else [items]
+        started = time.perf_counter()
+        try:
+            await work
+        except Exception as e:
+            self.logger.error(f"Stage {name} failed for {', '.join(item.url for item in items)}: {str(e)}")
+            for item in items:
+                item.error = str(e)
+                item.failed_stage = name
+        duration_ms = (time.perf_counter() - started) * 1000
+        for item in items:
+            item.timing[name] = duration_ms
+
+    async def _execute_tool(self, name: str, params: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        result = await self.tool_registry.execute_tool(name, params, context)
+        if not result.success:
+            raise ValueError(result.error)
+        return result.data
+
+    async def _crawl(self, item: BatchItem, context: Dict[str, Any]):
+        item.form_data = await self._execute_tool(
+            "web_navigation", {**self.config.crawl_params, "url": item.url}, context
+        )
+
+    async def _analyze(self, item: BatchItem, context: Dict[str, Any]):
+        item.analysis = await self._execute_tool("form_analysis", {"form_data": item.form_data}, context)
+
+    async def _generate(self, item: BatchItem, context: Dict[str, Any]):
+        # Every target reuses the form's single crawl and analysis
+        generated = await asyncio.gather(*(
+            self._execute_tool("code_generation", {**target, "analysis": item.generation_input()}, context)
+            for target in self.config.targets
+        ))
+        item.generated = {target_key(target): code for target, code in zip(self.config.targets, generated)}
+
+    async def _validate(self, items: List[BatchItem]):
+        """Validate a micro-batch with one LLM call, falling back to one call per form."""
+        if len(items) > 1:
+            validations = await self._ask_llm(items)
+            if isinstance(validations, list) and len(validations) == len(items):
+                for item, validation in zip(items, validations):
+                    item.validation = validation
+                return
+            self.logger.warning(f"Batched validation of {len(items)} forms was unusable; validating one by one")
+        for item in items:
+            validations = await self._ask_llm([item])
+            item.validation = validations[0] if isinstance(validations, list) and len(validations) == 1 else validations
+
+    async def _ask_llm(self, items: List[BatchItem]) -> Any:
+        # Each form is rendered (and size-capped) on its own line
+        forms = "\n".join(
+            render_prompt("{form}", {"form": {"url": item.url, "generated_code": item.generated}})
+            for item in items
+        )
+        response = await self.llm.generate_response(VALIDATION_PROMPT.format(forms=forms))
+        if not response.success:
+            raise ValueError(response.error)
+        if isinstance(response.data, str):
+            try:
+                return json.loads(response.data)
+            except ValueError:
+                return response.data
+        return response.data
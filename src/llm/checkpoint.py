@@ -0,0 +1,106 @@
+from typing import Dict, Any, Optional
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+
+def hash_inputs(value: Any) -> str:
+    """Return a canonical hash of a plan's inputs."""
+    canonical = json.dumps(value, sort_keys=True, default=repr)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+class CheckpointStore:
+    """Durable store of completed orchestration step results (SQLite).
+
+    Results are keyed by plan ID, input hash and step name, so a plan that
+    failed or was interrupted can resume from its first incomplete step
+    when it is run again with the same inputs. Results older than ``ttl``
+    seconds are never resumed and are dropped on the next load.
+    """
+
+    def __init__(self, path: str = "./data/checkpoints.db", ttl: float = 86400.0):
+        self.path = path
+        self.ttl = ttl
+        self.logger = logging.getLogger("checkpoint")
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                "plan_id TEXT NOT NULL, input_hash TEXT NOT NULL, step_name TEXT NOT NULL, "
+                "result TEXT NOT NULL, created_at REAL NOT NULL, "
+                "PRIMARY KEY (plan_id, input_hash, step_name))"
+            )
+
+    async def load(self, plan_id: str, plan_input_hash: str) -> Dict[str, Any]:
+        """Return the stored results of a plan run, by step name."""
+        return await asyncio.to_thread(self._load, plan_id, plan_input_hash)
+
+    async def save(self, plan_id: str, plan_input_hash: str, step_name: str, result: Any) -> bool:
+        """Store a completed step's result; returns False if it is not JSON-serializable."""
+        try:
+            serialized = json.dumps(result)
+        except (TypeError, ValueError) as e:
+            self.logger.warning(f"Not checkpointing step {step_name}: {str(e)}")
+            return False
+        await asyncio.to_thread(self._save, plan_id, plan_input_hash, step_name, serialized)
+        return True
+
+    async def clear(self, plan_id: str, plan_input_hash: str):
+        """Drop the stored results of a plan run."""
+        await asyncio.to_thread(self._clear, plan_id, plan_input_hash)
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per call; calls run on worker threads
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _load(self, plan_id: str, plan_input_hash: str) -> Dict[str, Any]:
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute("DELETE FROM checkpoints WHERE created_at < ?", (time.time() - self.ttl,))
+            rows = connection.execute(
+                "SELECT step_name, result FROM checkpoints WHERE plan_id = ? AND input_hash = ?",
+                (plan_id, plan_input_hash)
+            ).fetchall()
+        finally:
+            connection.close()
+        return {step_name: json.loads(result) for step_name, result in rows}
+
+    def _save(self, plan_id: str, plan_input_hash: str, step_name: str, serialized: str):
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?)",
+                    (plan_id, plan_input_hash, step_name, serialized, time.time())
+                )
+        finally:
+            connection.close()
+
+    def _clear(self, plan_id: str, plan_input_hash: str):
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute(
+                    "DELETE FROM checkpoints WHERE plan_id = ? AND input_hash = ?",
+                    (plan_id, plan_input_hash)
+                )
+        finally:
+            connection.close()
+
+_shared_store: Optional[CheckpointStore] = None
+
+def get_checkpoint_store() -> CheckpointStore:
+    """Return the process-wide checkpoint store."""
+    global _shared_store
+    if _shared_store is None:
+        _shared_store = CheckpointStore(
+            os.getenv("CHECKPOINT_DB", "./data/checkpoints.db"),
+            ttl=float(os.getenv("CHECKPOINT_TTL", "86400"))
+        )
+    return _shared_store
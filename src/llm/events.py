@@ -0,0 +1,178 @@
+from typing import Dict, Any, AsyncIterator, List, Optional, Set
+from collections import OrderedDict
+import asyncio
+import json
+import logging
+import os
+import time
+from pydantic import BaseModel
+
+# Events after which a run's stream ends
+TERMINAL_EVENTS = {"run_finished", "run_failed"}
+
+# Longest preview of a step result kept in an event
+MAX_SUMMARY_CHARS = 500
+
+def summarize(value: Any) -> Dict[str, Any]:
+    """Return a small summary of a step result for progress events.
+
+    Events are kept in each run's history, so they carry the result's type,
+    serialized size and a truncated preview rather than the result itself.
+    """
+    rendered = json.dumps(value, separators=(",", ":"), default=str)
+    summary: Dict[str, Any] = {"type": type(value).__name__, "size": len(rendered)}
+    if isinstance(value, (dict, list)):
+        summary["items"] = len(value)
+    summary["preview"] = rendered if len(rendered) <= MAX_SUMMARY_CHARS else rendered[:MAX_SUMMARY_CHARS] + "..."
+    return summary
+
+class OrchestrationEvent(BaseModel):
+    """A progress event of one orchestration run."""
+    run_id: str
+    sequence: int
+    type: str
+    step: Optional[str] = None
+    data: Dict[str, Any] = {}
+    timestamp: float
+
+class _Run:
+    def __init__(self):
+        self.events: List[OrchestrationEvent] = []
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.finished = False
+        # Last sequence number handed out, dropped events included
+        self.sequence = 0
+        # Full result of each finished step, kept apart from the event history
+        self.results: Dict[str, Any] = {}
+
+class EventBus:
+    """In-process publish/subscribe of orchestration events, keyed by run ID.
+
+    Publishing never blocks the orchestrator. Each run keeps its events so a
+    subscriber that connects late, or reconnects after a given sequence
+    number, replays what it missed before receiving live events. Only the
+    most recent ``max_runs`` runs are kept; runs still being streamed are
+    kept until they finish. Sequence numbers only grow, so an event dropped
+    from a full history leaves a gap rather than having its number reused.
+
+    A step's full result is published separately from its event: subscribers
+    connected at that moment receive it in the event's ``result`` field,
+    while the history keeps only the event, and the result stays available
+    from ``result()`` for as long as the run is kept.
+    """
+
+    def __init__(self, max_runs: int = 100, max_events_per_run: int = 1000):
+        self.max_runs = max_runs
+        self.max_events_per_run = max_events_per_run
+        self.logger = logging.getLogger("event_bus")
+        self._runs: "OrderedDict[str, _Run]" = OrderedDict()
+
+    def publish(
+        self,
+        run_id: str,
+        type: str,
+        step: Optional[str] = None,
+        data: Optional[Dict[str, Any]] = None,
+        result: Any = None
+    ) -> OrchestrationEvent:
+        """Record an event of a run and hand it to the run's subscribers.
+
+        A step's ``result`` is stored for ``result()`` and added to the event
+        only as delivered to the current subscribers.
+        """
+        run = self._run(run_id)
+        run.sequence += 1
+        event = OrchestrationEvent(
+            run_id=run_id,
+            sequence=run.sequence,
+            type=type,
+            step=step,
+            data=data or {},
+            timestamp=time.time()
+        )
+        if len(run.events) < self.max_events_per_run or type in TERMINAL_EVENTS:
+            run.events.append(event)
+        else:
+            self.logger.warning(f"Dropping {type} event of run {run_id}: history is full")
+            return event
+        if type in TERMINAL_EVENTS:
+            run.finished = True
+        live = event
+        if result is not None and step is not None:
+            run.results[step] = result
+            live = event.copy(update={"data": {**event.data, "result": result}})
+        for queue in run.subscribers:
+            queue.put_nowait(live)
+        return event
+
+    def result(self, run_id: str, step: str) -> Any:
+        """Return the full result published for a step of a run, or None."""
+        run = self._runs.get(run_id)
+        return run.results.get(step) if run else None
+
+    def history(self, run_id: str) -> List[OrchestrationEvent]:
+        """Return the recorded events of a run."""
+        run = self._runs.get(run_id)
+        return list(run.events) if run else []
+
+    def has_run(self, run_id: str) -> bool:
+        return run_id in self._runs
+
+    async def subscribe(
+        self,
+        run_id: str,
+        after: int = 0,
+        heartbeat: Optional[float] = None
+    ) -> AsyncIterator[Optional[OrchestrationEvent]]:
+        """Yield a run's events after sequence ``after`` until the run finishes.
+
+        With ``heartbeat``, None is yielded whenever no event arrived for that
+        many seconds, so streaming endpoints can keep idle connections open.
+        """
+        run = self._run(run_id)
+        queue: asyncio.Queue = asyncio.Queue()
+        run.subscribers.add(queue)
+        try:
+            for event in list(run.events):
+                if event.sequence > after:
+                    yield event
+                    after = event.sequence
+            if run.finished:
+                return
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event.sequence <= after:
+                    continue
+                yield event
+                after = event.sequence
+                if event.type in TERMINAL_EVENTS:
+                    return
+        finally:
+            run.subscribers.discard(queue)
+
+    def _run(self, run_id: str) -> _Run:
+        run = self._runs.get(run_id)
+        if run is None:
+            run = self._runs[run_id] = _Run()
+            for old_id, old_run in list(self._runs.items()):
+                if len(self._runs) <= self.max_runs:
+                    break
+                # Runs still being streamed are skipped, not evicted
+                if old_id == run_id or (old_run.subscribers and not old_run.finished):
+                    continue
+                del self._runs[old_id]
+        self._runs.move_to_end(run_id)
+        return run
+
+_shared_bus: Optional[EventBus] = None
+
+def get_event_bus() -> EventBus:
+    """Return the process-wide orchestration event bus."""
+    global _shared_bus
+    if _shared_bus is None:
+        _shared_bus = EventBus(max_runs=int(os.getenv("EVENT_BUS_MAX_RUNS", "100")))
+    return _shared_bus
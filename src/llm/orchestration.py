@@ -1,11 +1,77 @@
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Set, Union
 from abc import ABC, abstractmethod
+import asyncio
+import json
 import logging
+import time
 from .base import BaseLLMInterface, LLMResponse
+from .checkpoint import CheckpointStore, hash_inputs
+from .events import EventBus, get_event_bus, summarize
 from ..tools.base import BaseTool, ToolRegistry, ToolResult
+from ..tools.code_generation import DEFAULT_FRAMEWORKS
 
 logger = logging.getLogger(__name__)
 
+# Longest rendering of a single referenced value inserted into an LLM prompt
+MAX_PROMPT_VALUE_CHARS = 8000
+
+class StepOutput:
+    """Reference to another step's result, or to a part of it.
+
+    References can appear anywhere in ``tool_params`` or ``llm_inputs`` and
+    are resolved when the referencing step starts. Tool steps receive the
+    referenced Python object itself, not a copy or a string rendering.
+    ``StepOutput("analyze_form")["elements"]`` refers to one key of the result.
+    """
+
+    def __init__(self, step_name: str, path: Optional[List[Union[str, int]]] = None):
+        self.step_name = step_name
+        self.path = list(path or [])
+
+    def __getitem__(self, key: Union[str, int]) -> "StepOutput":
+        return StepOutput(self.step_name, self.path + [key])
+
+    def __repr__(self) -> str:
+        return f"StepOutput({self.step_name!r}, {self.path!r})"
+
+    def resolve(self, results: Dict[str, Any]) -> Any:
+        if self.step_name not in results:
+            raise ValueError(f"Output of step {self.step_name} is not available")
+        value = results[self.step_name]
+        for key in self.path:
+            value = value[key]
+        return value
+
+def resolve_refs(value: Any, results: Dict[str, Any]) -> Any:
+    """Replace every StepOutput inside ``value`` with the object it refers to."""
+    if isinstance(value, StepOutput):
+        return value.resolve(results)
+    if isinstance(value, dict):
+        return {key: resolve_refs(item, results) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(resolve_refs(item, results) for item in value)
+    return value
+
+def referenced_steps(value: Any) -> Set[str]:
+    """Return the names of the steps referenced inside ``value``."""
+    if isinstance(value, StepOutput):
+        return {value.step_name}
+    if isinstance(value, dict):
+        return set().union(*(referenced_steps(item) for item in value.values()))
+    if isinstance(value, (list, tuple)):
+        return set().union(*(referenced_steps(item) for item in value))
+    return set()
+
+def render_prompt(template: str, inputs: Dict[str, Any]) -> str:
+    """Fill ``{name}`` placeholders with compact, size-capped renderings of the inputs."""
+    rendered = {}
+    for name, value in inputs.items():
+        text = value if isinstance(value, str) else json.dumps(value, separators=(",", ":"), default=str)
+        if len(text) > MAX_PROMPT_VALUE_CHARS:
+            text = text[:MAX_PROMPT_VALUE_CHARS] + f"... [{len(text) - MAX_PROMPT_VALUE_CHARS} more characters]"
+        rendered[name] = text
+    return template.format_map(rendered)
+
 class OrchestrationStep:
     def __init__(
         self,
@@ -14,23 +80,43 @@ class OrchestrationStep:
         tool_name: Optional[str] = None,
         tool_params: Optional[Dict[str, Any]] = None,
         llm_prompt: Optional[str] = None,
-        required: bool = True
+        required: bool = True,
+        depends_on: Optional[List[str]] = None,
+        llm_inputs: Optional[Dict[str, Any]] = None
     ):
         self.name = name
         self.description = description
         self.tool_name = tool_name
         self.tool_params = tool_params or {}
         self.llm_prompt = llm_prompt
+        # Values for the prompt's {placeholders}; may contain StepOutput references
+        self.llm_inputs = llm_inputs or {}
         self.required = required
+        # None means "the previous step", keeping plans without dependencies
+        # sequential; steps referenced through StepOutput are always added
+        self.depends_on = depends_on
         self.result: Optional[Any] = None
         self.error: Optional[str] = None
+        self.duration_ms: Optional[float] = None
 
 class OrchestrationPlan:
-    def __init__(self, steps: List[OrchestrationStep]):
+    def __init__(
+        self,
+        steps: List[OrchestrationStep],
+        plan_id: Optional[str] = None,
+        inputs: Optional[Dict[str, Any]] = None,
+        run_id: Optional[str] = None
+    ):
         self.steps = steps
         self.current_step_index = 0
         self.results: Dict[str, Any] = {}
         self.errors: Dict[str, str] = {}
+        # Plans with an ID are checkpointed when the orchestrator has a checkpoint store
+        self.plan_id = plan_id
+        self.inputs = inputs or {}
+        self.resumed: List[str] = []
+        # Plans with a run ID publish progress events on the orchestrator's event bus
+        self.run_id = run_id
 
     def add_result(self, step_name: str, result: Any):
         self.results[step_name] = result
@@ -48,16 +134,87 @@ class OrchestrationPlan:
     def is_complete(self) -> bool:
         return self.current_step_index >= len(self.steps)
 
+    def input_hash(self) -> str:
+        """Hash the plan's inputs and step definitions, so an edited plan starts over."""
+        return hash_inputs({
+            "inputs": self.inputs,
+            "steps": [
+                [step.name, step.tool_name, step.tool_params, step.llm_prompt, step.llm_inputs, step.depends_on]
+                for step in self.steps
+            ]
+        })
+
+    def dependencies(self) -> Dict[str, List[str]]:
+        """Return the resolved dependencies of every step."""
+        names = {step.name for step in self.steps}
+        dependencies = {}
+        for index, step in enumerate(self.steps):
+            if step.depends_on is None:
+                depends_on = [self.steps[index - 1].name] if index > 0 else []
+            else:
+                depends_on = list(step.depends_on)
+            for name in sorted(referenced_steps([step.tool_params, step.llm_inputs])):
+                if name not in depends_on:
+                    depends_on.append(name)
+            unknown = [name for name in depends_on if name not in names]
+            if unknown:
+                raise ValueError(f"Step {step.name} depends on unknown steps: {', '.join(unknown)}")
+            dependencies[step.name] = depends_on
+        return dependencies
+
+    def topological_order(self) -> List[str]:
+        """Return the step names ordered so every step follows its dependencies."""
+        dependencies = self.dependencies()
+        order: List[str] = []
+        placed: Set[str] = set()
+        while len(order) < len(self.steps):
+            ready = [
+                step.name for step in self.steps
+                if step.name not in placed and all(d in placed for d in dependencies[step.name])
+            ]
+            if not ready:
+                cycle = [step.name for step in self.steps if step.name not in placed]
+                raise ValueError(f"Steps have circular dependencies: {', '.join(cycle)}")
+            order.extend(ready)
+            placed.update(ready)
+        return order
+
+    def critical_path(self) -> Dict[str, Any]:
+        """Return the longest chain of dependent steps by measured duration."""
+        dependencies = self.dependencies()
+        durations = {step.name: step.duration_ms or 0.0 for step in self.steps}
+        finish: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+        for name in self.topological_order():
+            slowest = max(dependencies[name], key=lambda d: finish[d], default=None)
+            finish[name] = durations[name] + (finish[slowest] if slowest else 0.0)
+            previous[name] = slowest
+        if not finish:
+            return {"steps": [], "duration_ms": 0.0}
+        name: Optional[str] = max(finish, key=finish.get)
+        total = finish[name]
+        path = []
+        while name:
+            path.append(name)
+            name = previous[name]
+        return {"steps": list(reversed(path)), "duration_ms": total}
+
 class BaseOrchestrator(ABC):
     def __init__(
         self,
         llm: BaseLLMInterface,
         tool_registry: ToolRegistry,
-        max_retries: int = 3
+        max_retries: int = 3,
+        max_parallel_steps: int = 4,
+        checkpoint_store: Optional[CheckpointStore] = None,
+        event_bus: Optional[EventBus] = None
     ):
         self.llm = llm
         self.tool_registry = tool_registry
         self.max_retries = max_retries
+        self.max_parallel_steps = max_parallel_steps
+        self.checkpoint_store = checkpoint_store
+        self.event_bus = event_bus or get_event_bus()
         self.logger = logging.getLogger(self.__class__.__name__)
 
     @abstractmethod
@@ -66,116 +223,221 @@ class BaseOrchestrator(ABC):
         pass
 
     async def execute_plan(self, plan: OrchestrationPlan) -> Dict[str, Any]:
-        """Execute the orchestration plan and return the results."""
-        while not plan.is_complete():
-            step = plan.get_next_step()
-            if not step:
+        """Execute the orchestration plan and return the results.
+
+        Steps run as soon as the steps they depend on have finished, at most
+        ``max_parallel_steps`` at a time. When a required step fails no new
+        steps are started, and the steps already running are awaited.
+
+        With a checkpoint store and a plan ID, every completed step's result
+        is persisted; running the same plan with the same inputs again skips
+        those steps. Checkpoints are dropped once the whole plan succeeds.
+
+        Plans with a run ID publish step_started, step_progress (retries),
+        step_finished (with a summary of the step's result, and the full
+        result for live subscribers) and step_failed events as they happen,
+        framed by plan_started and plan_finished.
+        """
+        dependencies = plan.dependencies()
+        # Fail fast on circular dependencies instead of never starting those steps
+        plan.topological_order()
+        finished: Set[str] = set()
+        started: Set[str] = set()
+        running: Dict[asyncio.Task, OrchestrationStep] = {}
+        aborted = False
+        plan_started = time.perf_counter()
+
+        checkpoint_key = None
+        if self.checkpoint_store is not None and plan.plan_id:
+            checkpoint_key = (plan.plan_id, plan.input_hash())
+            completed = await self.checkpoint_store.load(*checkpoint_key)
+            for step in plan.steps:
+                if step.name in completed:
+                    plan.add_result(step.name, completed[step.name])
+                    plan.resumed.append(step.name)
+                    started.add(step.name)
+                    finished.add(step.name)
+                    plan.current_step_index += 1
+            if plan.resumed:
+                self.logger.info(f"Resuming plan {plan.plan_id}; skipping {', '.join(plan.resumed)}")
+
+        self._emit(plan, "plan_started", data={"steps": [step.name for step in plan.steps], "resumed": plan.resumed})
+
+        while True:
+            if not aborted:
+                for step in plan.steps:
+                    if len(running) >= self.max_parallel_steps:
+                        break
+                    if step.name in started or not all(d in finished for d in dependencies[step.name]):
+                        continue
+                    started.add(step.name)
+                    plan.current_step_index += 1
+                    self._emit(plan, "step_started", step.name)
+                    running[asyncio.create_task(self._execute_step(step, plan))] = step
+            if not running:
                 break
 
-            try:
-                if step.tool_name:
-                    result = await self._execute_tool_step(step)
-                elif step.llm_prompt:
-                    result = await self._execute_llm_step(step)
-                else:
-                    raise ValueError(f"Step {step.name} has neither tool nor LLM prompt")
-
-                plan.add_result(step.name, result)
-            except Exception as e:
-                self.logger.error(f"Error executing step {step.name}: {str(e)}")
-                plan.add_error(step.name, str(e))
-                if step.required:
-                    break
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                step = running.pop(task)
+                finished.add(step.name)
+                try:
+                    plan.add_result(step.name, task.result())
+                except Exception as e:
+                    self.logger.error(f"Error executing step {step.name}: {str(e)}")
+                    plan.add_error(step.name, str(e))
+                    self._emit(plan, "step_failed", step.name, {"error": str(e), "duration_ms": step.duration_ms})
+                    if step.required:
+                        aborted = True
+                    continue
+                self._emit(plan, "step_finished", step.name, {
+                    "summary": summarize(plan.results[step.name]),
+                    "duration_ms": step.duration_ms
+                }, result=plan.results[step.name])
+                if checkpoint_key is not None:
+                    await self.checkpoint_store.save(*checkpoint_key, step.name, plan.results[step.name])
+
+        if checkpoint_key is not None and not plan.errors:
+            await self.checkpoint_store.clear(*checkpoint_key)
 
+        critical_path = plan.critical_path()
+        self._emit(plan, "plan_finished", data={"success": not plan.errors, "errors": plan.errors})
         return {
             "results": plan.results,
             "errors": plan.errors,
-            "success": len(plan.errors) == 0
+            "success": len(plan.errors) == 0,
+            "resumed": plan.resumed,
+            "timing": {
+                "total_ms": (time.perf_counter() - plan_started) * 1000,
+                "steps": {step.name: step.duration_ms for step in plan.steps if step.duration_ms is not None},
+                "critical_path": critical_path["steps"],
+                "critical_path_ms": critical_path["duration_ms"]
+            }
         }
 
-    async def _execute_tool_step(self, step: OrchestrationStep) -> Any:
-        """Execute a tool-based step with retries."""
-        tool = self.tool_registry.get_tool(step.tool_name)
-        if not tool:
-            raise ValueError(f"Tool {step.tool_name} not found")
+    def _emit(
+        self,
+        plan: OrchestrationPlan,
+        type: str,
+        step: Optional[str] = None,
+        data: Optional[Dict[str, Any]] = None,
+        result: Any = None
+    ):
+        if plan.run_id:
+            self.event_bus.publish(plan.run_id, type, step, data, result)
+
+    async def _execute_step(self, step: OrchestrationStep, plan: OrchestrationPlan) -> Any:
+        """Execute a single step, recording how long it took.
+
+        StepOutput references are resolved here, against the results of the
+        steps that have finished, so the plan's steps are never modified.
+        """
+        step_started = time.perf_counter()
+        try:
+            if step.tool_name:
+                return await self._execute_tool_step(step, resolve_refs(step.tool_params, plan.results), plan)
+            if step.llm_prompt:
+                prompt = step.llm_prompt
+                if step.llm_inputs:
+                    prompt = render_prompt(prompt, resolve_refs(step.llm_inputs, plan.results))
+                return await self._execute_llm_step(step, prompt)
+            raise ValueError(f"Step {step.name} has neither tool nor LLM prompt")
+        finally:
+            step.duration_ms = (time.perf_counter() - step_started) * 1000
+
+    async def _execute_tool_step(
+        self,
+        step: OrchestrationStep,
+        params: Optional[Dict[str, Any]] = None,
+        plan: Optional[OrchestrationPlan] = None
+    ) -> Any:
+        """Execute a tool-based step through the registry.
+
+        The registry validates the params and applies the tool's cache,
+        timeout, retry and circuit policy; the step is only retried here
+        when the registry gives up with a retryable error (e.g. an open
+        circuit or a full queue).
+        """
+        params = step.tool_params if params is None else params
+        context = plan.inputs if plan is not None else {}
 
         for attempt in range(self.max_retries):
-            try:
-                result = await tool.execute(step.tool_params)
-                if result.success:
-                    return result.data
+            result = await self.tool_registry.execute_tool(step.tool_name, params, context)
+            if result.success:
+                return result.data
+            if not result.retryable or attempt == self.max_retries - 1:
                 raise ValueError(result.error)
-            except Exception as e:
-                if attempt == self.max_retries - 1:
-                    raise
-                self.logger.warning(f"Retry {attempt + 1} for step {step.name}")
+            self.logger.warning(f"Retry {attempt + 1} for step {step.name}")
+            if plan is not None:
+                self._emit(plan, "step_progress", step.name, {"retry": attempt + 1, "error": result.error})
 
-    async def _execute_llm_step(self, step: OrchestrationStep) -> Any:
+    async def _execute_llm_step(self, step: OrchestrationStep, prompt: Optional[str] = None) -> Any:
         """Execute an LLM-based step."""
-        response = await self.llm.generate_response(step.llm_prompt)
+        response = await self.llm.generate_response(prompt if prompt is not None else step.llm_prompt)
         if not response.success:
             raise ValueError(response.error)
         return response.data
 
 class FormMigrationOrchestrator(BaseOrchestrator):
     async def create_plan(self, context: Dict[str, Any]) -> OrchestrationPlan:
-        """Create a plan for form migration."""
+        """Create a plan for form migration.
+
+        The form is extracted (with the extraction options in
+        ``context["params"]``) and analyzed, and code is generated for
+        ``context["language"]`` and ``context["framework"]``, which defaults
+        to the language's usual framework.
+        """
+        language = context.get("language") or "python"
+        framework = context.get("framework") or DEFAULT_FRAMEWORKS.get(language, "fastapi")
         steps = [
             OrchestrationStep(
                 name="analyze_form",
-                description="Analyze the form structure and requirements",
+                description="Extract the form's elements, validation rules and event handlers",
                 tool_name="web_navigation",
-                tool_params={"url": context["form_url"]}
+                tool_params={**context.get("params", {}), "url": context["form_url"]}
             ),
             OrchestrationStep(
-                name="validate_analysis",
-                description="Validate the form analysis results",
-                llm_prompt="Validate the following form analysis results: {analysis_results}"
+                name="analyze_structure",
+                description="Analyze the form structure and requirements",
+                tool_name="form_analysis",
+                tool_params={"form_data": StepOutput("analyze_form")},
+                depends_on=["analyze_form"]
             ),
             OrchestrationStep(
-                name="generate_api",
-                description="Generate API code based on form analysis",
-                tool_name="code_generation",
-                tool_params={
-                    "template": "api_python_fastapi",
-                    "form_data": "{analysis_results}"
-                }
+                name="validate_analysis",
+                description="Validate the form analysis results",
+                llm_prompt="Validate the following form analysis results: {analysis_results}",
+                llm_inputs={"analysis_results": StepOutput("analyze_structure")},
+                depends_on=["analyze_structure"]
             ),
             OrchestrationStep(
-                name="generate_form",
-                description="Generate HTML form code",
+                name="generate_code",
+                description="Generate the API, HTML form, validation and event code",
                 tool_name="code_generation",
                 tool_params={
-                    "template": "html_form",
-                    "form_data": "{analysis_results}"
-                }
+                    # Fields come from the extracted elements, rules and handlers from the analysis
+                    "analysis": {
+                        "form_name": context.get("form_name") or "Form",
+                        "elements": StepOutput("analyze_form")["elements"],
+                        "validation": StepOutput("analyze_structure")["validation"],
+                        "events": StepOutput("analyze_structure")["events"]
+                    },
+                    "language": language,
+                    "framework": framework
+                },
+                depends_on=["analyze_form", "analyze_structure"]
             ),
             OrchestrationStep(
                 name="validate_output",
                 description="Validate the generated code",
-                llm_prompt="Validate the following generated code: {generated_code}"
+                llm_prompt="Validate the following generated code: {generated_code}",
+                llm_inputs={"generated_code": StepOutput("generate_code")},
+                depends_on=["generate_code"]
             )
         ]
-        return OrchestrationPlan(steps)
-
-    async def execute_plan(self, plan: OrchestrationPlan) -> Dict[str, Any]:
-        """Execute the form migration plan with context passing between steps."""
-        results = await super().execute_plan(plan)
-        
-        # Update context for subsequent steps
-        for step in plan.steps:
-            if step.name in results["results"]:
-                # Replace placeholders in subsequent steps
-                for next_step in plan.steps[plan.current_step_index:]:
-                    if next_step.tool_params:
-                        for key, value in next_step.tool_params.items():
-                            if isinstance(value, str) and "{" in value:
-                                next_step.tool_params[key] = value.format(
-                                    **{step.name: results["results"][step.name]}
-                                )
-                    if next_step.llm_prompt and "{" in next_step.llm_prompt:
-                        next_step.llm_prompt = next_step.llm_prompt.format(
-                            **{step.name: results["results"][step.name]}
-                        )
-
-        return results 
\ No newline at end of file
+        return OrchestrationPlan(
+            steps,
+            plan_id=context.get("plan_id", "form_migration"),
+            inputs={key: value for key, value in context.items() if key != "run_id"},
+            run_id=context.get("run_id")
+        )
@@ -1,18 +1,37 @@
 import os
-from typing import Dict
-from fastapi import FastAPI, HTTPException, Request
+import json
+import asyncio
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from dotenv import load_dotenv
 import logging
 import traceback
 
-from agents.orchestrator import OrchestratorAgent
-from agents.web_navigation import WebNavigationAgent
-from agents.form_analysis import FormAnalysisAgent
-from agents.code_generation import CodeGenerationAgent
-from config.logging import setup_logging
+from src.config.logging import setup_logging
+from src.llm.base import LLMConfig
+from src.llm.batch import BatchConfig, BatchPipeline
+from src.llm.events import get_event_bus
+from src.llm.openai_interface import OpenAIInterface
+from src.llm.orchestration import FormMigrationOrchestrator
+from src.jobs.job_queue import FINAL_STATES, get_job_queue
+from src.jobs.worker import get_worker_pool
+from src.tools.archive import (
+    ARCHIVE_FORMATS, ArchiveWriter, StreamCompressor, archive_path_for, compress_chunks, negotiate_encoding
+)
+from src.tools.base import ToolRegistry
+from src.tools.browser_pool import get_browser_pool
+from src.tools.code_generation import CodeGenerationTool
+from src.tools.form_analysis import FormAnalysisTool
+from src.tools.replay import resolve_replay_path
+from src.tools.result_cache import ResultCache
+from src.tools.static_extraction import close_http_client
+from src.tools.web_navigation import WebNavigationTool
+from src.tools.crawler import CrawlConfig, FormCrawler
 
 # Load environment variables
 load_dotenv()
@@ -36,20 +55,100 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize agents
-orchestrator = OrchestratorAgent()
+# Tools shared by every generation, batch and crawl
+tool_registry = ToolRegistry()
+tool_registry.register(WebNavigationTool())
+tool_registry.register(FormAnalysisTool())
+tool_registry.register(CodeGenerationTool())
+# Runs form migration plans over the tool registry; created on startup
+orchestrator: Optional[FormMigrationOrchestrator] = None
+# Background generation runs, kept referenced until they finish
+runs: Dict[str, asyncio.Task] = {}
+
+# Seconds between checks for job worker processes that died
+JOB_SUPERVISE_INTERVAL = float(os.getenv("JOB_SUPERVISE_INTERVAL", "5"))
+# Restarts dead job workers while the application runs
+worker_supervisor: Optional[asyncio.Task] = None
+
+# Seconds between keep-alive comments on idle event streams
+SSE_HEARTBEAT = 15.0
+
+# Seconds a successful /generate result is reused for identical requests
+GENERATE_CACHE_TTL = float(os.getenv("GENERATE_CACHE_TTL", "60"))
+# Whole generation results stay in this process's memory, apart from the
+# shared (disk-backed) tool result cache
+generate_cache = ResultCache(directory=None, max_entries=int(os.getenv("GENERATE_CACHE_MAX_ENTRIES", "64")))
+
+# Smaller JSON responses are not worth compressing
+COMPRESSION_MIN_BYTES = 1024
+
+# Extraction options a request may pass through to web navigation
+EXTRACTION_PARAMS = {
+    "mode", "wait_until", "wait_for", "block_resources", "block_third_party", "use_cache", "incremental",
+    "explore", "har_path", "snapshot_dir", "username", "password", "login_url"
+}
 
 class GenerationRequest(BaseModel):
     url: str
     platform: str
     form_name: str
     language: str
+    # Extraction options passed through to web navigation
+    params: Dict[str, Any] = {}
+
+def normalize_generation_request(request: GenerationRequest) -> Dict[str, Any]:
+    """Return the generation parameters with insignificant differences removed.
+
+    Only used to build cache keys; generation itself gets the request as sent.
+    """
+    parts = urlsplit(request.url.strip())
+    return {
+        # Scheme and host are case-insensitive; the fragment never reaches the server
+        "url": urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", parts.query, "")),
+        "platform": request.platform.strip().lower(),
+        "form_name": request.form_name.strip(),
+        "language": request.language.strip().lower(),
+        "params": request.params
+    }
+
+class JobRequest(GenerationRequest):
+    tenant: str = "default"
+    priority: int = 0
+
+class GenerationTarget(BaseModel):
+    language: str
+    framework: str
+
+class BatchGenerationRequest(BaseModel):
+    urls: List[str]
+    targets: List[GenerationTarget] = [GenerationTarget(language="python", framework="fastapi")]
+    params: Dict[str, Any] = {}
+    max_concurrency: int = 4
+    # "ndjson", or an archive format ("zip", "tar.gz") holding one project per form and target
+    format: str = "ndjson"
+
+class CrawlRequest(BaseModel):
+    urls: List[str] = []
+    seed_url: Optional[str] = None
+    sitemap_url: Optional[str] = None
+    max_pages: int = 1000
+    max_depth: int = 3
+    max_concurrency: int = 8
+    per_host_concurrency: int = 2
+    politeness_delay: float = 0.5
+    include_pattern: Optional[str] = None
+    params: Dict[str, Any] = {}
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize agents on startup."""
+    """Initialize the orchestrator and the shared resources on startup."""
+    global orchestrator, worker_supervisor
     try:
-        await orchestrator.initialize()
+        await get_browser_pool().start()
+        orchestrator = FormMigrationOrchestrator(llm=OpenAIInterface(LLMConfig()), tool_registry=tool_registry)
+        if get_worker_pool().size > 0:
+            get_worker_pool().start()
+            worker_supervisor = asyncio.create_task(get_worker_pool().supervise(JOB_SUPERVISE_INTERVAL))
         logging.info("Application started successfully")
     except Exception as e:
         logging.error(f"Error during startup: {str(e)}")
@@ -59,7 +158,17 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup resources on shutdown."""
     try:
-        await orchestrator.cleanup()
+        if worker_supervisor is not None:
+            worker_supervisor.cancel()
+            await asyncio.gather(worker_supervisor, return_exceptions=True)
+        for task in list(runs.values()):
+            task.cancel()
+        await asyncio.gather(*runs.values(), return_exceptions=True)
+        await asyncio.to_thread(get_worker_pool().stop)
+        for name in tool_registry.list_tools():
+            await tool_registry.get_tool(name).cleanup()
+        await get_browser_pool().stop()
+        await close_http_client()
         logging.info("Application shutdown successfully")
     except Exception as e:
         logging.error(f"Error during shutdown: {str(e)}")
@@ -78,37 +187,368 @@ async def global_exception_handler(request: Request, exc: Exception):
         }
     )
 
+def extraction_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a request's extraction options, rejecting unknown ones and replay paths outside REPLAY_ROOT."""
+    unknown = sorted(set(params) - EXTRACTION_PARAMS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unsupported params: {', '.join(unknown)}")
+    for name in ("har_path", "snapshot_dir"):
+        if params.get(name):
+            try:
+                resolve_replay_path(params[name])
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+    return dict(params)
+
+def encoded_response(
+    chunks: Any,
+    media_type: str,
+    encoding: Optional[str],
+    headers: Optional[Dict[str, str]] = None
+) -> StreamingResponse:
+    """Stream sync or async chunks, compressed with the negotiated content encoding."""
+    headers = {**(headers or {}), "Vary": "Accept-Encoding"}
+    if encoding is None:
+        return StreamingResponse(chunks, media_type=media_type, headers=headers)
+    headers["Content-Encoding"] = encoding
+    if not hasattr(chunks, "__aiter__"):
+        return StreamingResponse(compress_chunks(chunks, encoding), media_type=media_type, headers=headers)
+    
+    async def compressed() -> AsyncIterator[bytes]:
+        compressor = StreamCompressor(encoding)
+        async for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+    
+    return StreamingResponse(compressed(), media_type=media_type, headers=headers)
+
+async def run_generation(request: GenerationRequest, run_id: Optional[str] = None) -> Dict[str, Any]:
+    """Run the form migration plan of a generation request, publishing its events under ``run_id``."""
+    plan = await orchestrator.create_plan({
+        "form_url": request.url,
+        "platform": request.platform,
+        "form_name": request.form_name,
+        "language": request.language,
+        "params": request.params,
+        "run_id": run_id
+    })
+    return await orchestrator.execute_plan(plan)
+
+def plan_error(result: Dict[str, Any]) -> str:
+    """Return the failed steps of a plan result as one message."""
+    return "; ".join(f"{step}: {error}" for step, error in result["errors"].items())
+
 @app.post("/generate")
-async def generate_code(request: GenerationRequest) -> Dict:
+async def generate_code(request: GenerationRequest, http_request: Request, response: Response) -> Any:
     """
     Generate code based on the provided request.
     
+    Identical concurrent requests share one pipeline execution, and a
+    successful result is reused for GENERATE_CACHE_TTL seconds. The
+    X-Generation-Cache header tells where the result came from. Large
+    results are gzip or brotli compressed when the client accepts it.
+    
     Args:
-        request: GenerationRequest containing URL, platform, form name, and language
+        request: GenerationRequest containing URL, platform, form name, language and extraction parameters
         
     Returns:
         Dictionary containing generated code and analysis results
     """
+    extraction_params(request.params)
     try:
         logging.info(f"Received generation request: {request.dict()}")
         
-        result = await orchestrator.execute({
-            "url": request.url,
-            "platform": request.platform,
-            "form_name": request.form_name,
-            "language": request.language
-        })
+        result, source = await generate_cache.get_or_compute(
+            generate_cache.key_for("generate", normalize_generation_request(request), {}, []),
+            lambda: run_generation(request),
+            GENERATE_CACHE_TTL,
+            cacheable=lambda result: result["success"]
+        )
+        response.headers["X-Generation-Cache"] = source
         
-        if result["status"] == "error":
-            logging.error(f"Generation failed: {result['error']}")
-            raise HTTPException(status_code=500, detail=result["error"])
+        if not result["success"]:
+            logging.error(f"Generation failed: {plan_error(result)}")
+            raise HTTPException(status_code=500, detail=plan_error(result))
         
         logging.info("Generation completed successfully")
-        return result
+        encoding = negotiate_encoding(http_request.headers.get("accept-encoding"))
+        body = json.dumps(result, default=str)
+        if encoding is None or len(body) < COMPRESSION_MIN_BYTES:
+            return result
+        return encoded_response([body], "application/json", encoding, {"X-Generation-Cache": source})
     except Exception as e:
         logging.error(f"Error during code generation: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/generate/batch")
+async def generate_batch(request: BatchGenerationRequest, http_request: Request) -> StreamingResponse:
+    """
+    Generate code for many forms and targets, streaming results as each form completes.
+    
+    Each form is crawled and analyzed once; only code generation fans out
+    per language/framework target, and the targets run in parallel.
+    
+    Args:
+        request: BatchGenerationRequest with form URLs, targets, extraction parameters and output format
+        
+    Returns:
+        Newline-delimited JSON of per-form results keyed by target (gzip or
+        brotli compressed when accepted), or a zip/tar.gz archive with a
+        <form>/<target>/ project per form, streamed from the templates
+    """
+    if not request.urls:
+        raise HTTPException(status_code=400, detail="Provide at least one url")
+    if not request.targets:
+        raise HTTPException(status_code=400, detail="Provide at least one target")
+    if request.format != "ndjson" and request.format not in ARCHIVE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format {request.format}")
+    
+    crawl_params = extraction_params(request.params)
+    code_generation_tool = tool_registry.get_tool("code_generation")
+    targets = list({
+        (target.language, target.framework): target.dict() for target in request.targets
+    }.values())
+    unsupported = [
+        f"{target['language']}/{target['framework']}" for target in targets
+        if code_generation_tool.missing_templates(target["language"], target["framework"])
+    ]
+    if unsupported:
+        raise HTTPException(status_code=400, detail=f"No templates for targets {', '.join(unsupported)}")
+    
+    logging.info(f"Received batch generation request: {request.dict()}")
+    archive = request.format in ARCHIVE_FORMATS
+    pipeline = BatchPipeline(
+        None,
+        tool_registry,
+        BatchConfig(
+            crawl_workers=request.max_concurrency,
+            crawl_params=crawl_params,
+            # Archives render the templates themselves while streaming
+            targets=[] if archive else targets,
+            llm_validation=False
+        )
+    )
+    urls = list(dict.fromkeys(request.urls))
+    
+    if not archive:
+        async def stream() -> AsyncIterator[str]:
+            async for item in pipeline.run(urls):
+                yield json.dumps(item.dict(exclude={"form_data"}), default=str) + "\n"
+        
+        encoding = negotiate_encoding(http_request.headers.get("accept-encoding"))
+        return encoded_response(stream(), "application/x-ndjson", encoding)
+    
+    writer = ArchiveWriter(request.format)
+    
+    def add_file(path: str, chunks: Any, written: Optional[List[bytes]] = None) -> bytes:
+        # Archive bytes are collected as they are produced, so the bytes of a
+        # file whose rendering fails midway are not lost from the archive
+        written = [] if written is None else written
+        for data in writer.add(path, chunks):
+            written.append(data)
+        return b"".join(written)
+    
+    async def stream_archive() -> AsyncIterator[bytes]:
+        async for item in pipeline.run(urls):
+            directory = archive_path_for(item.url)
+            if item.error is not None:
+                yield await asyncio.to_thread(add_file, f"{directory}/ERROR.txt", [f"{item.failed_stage}: {item.error}\n"])
+                continue
+            for target in targets:
+                prefix = f"{directory}/{target['language']}-{target['framework']}/"
+                written: List[bytes] = []
+                try:
+                    # Templates load up front; rendering and compression run off
+                    # the event loop, one file at a time
+                    files = await asyncio.to_thread(list, code_generation_tool.iter_artifacts(
+                        item.generation_input(), target["language"], target["framework"], prefix=prefix
+                    ))
+                    for path, chunks in files:
+                        written = []
+                        yield await asyncio.to_thread(add_file, path, chunks, written)
+                except Exception as e:
+                    # A failed target is reported in its directory instead of
+                    # cutting the archive short for the other targets and forms
+                    logging.error(f"Generation of {prefix} failed: {str(e)}")
+                    yield await asyncio.to_thread(add_file, f"{prefix}ERROR.txt", [f"generate: {str(e)}\n"], written)
+        yield await asyncio.to_thread(writer.close)
+    
+    return StreamingResponse(
+        stream_archive(),
+        media_type=writer.media_type,
+        headers={"Content-Disposition": f'attachment; filename="generated.{request.format}"'}
+    )
+
+async def execute_run(run_id: str, request: GenerationRequest):
+    """Run a generation in the background, publishing its progress on the event bus."""
+    event_bus = get_event_bus()
+    event_bus.publish(run_id, "run_started", data=request.dict())
+    try:
+        result = await run_generation(request, run_id)
+        if not result["success"]:
+            event_bus.publish(run_id, "run_failed", data={"error": plan_error(result), "errors": result["errors"]})
+        else:
+            event_bus.publish(run_id, "run_finished", data={"result": result})
+    except Exception as e:
+        logging.error(f"Error during run {run_id}: {str(e)}")
+        event_bus.publish(run_id, "run_failed", data={"error": str(e)})
+    finally:
+        runs.pop(run_id, None)
+
+@app.post("/runs", status_code=202)
+async def start_run(request: GenerationRequest) -> Dict:
+    """
+    Start a code generation in the background.
+    
+    Args:
+        request: GenerationRequest containing URL, platform, form name, language and extraction parameters
+        
+    Returns:
+        The run ID and the URL of its Server-Sent Events stream
+    """
+    extraction_params(request.params)
+    run_id = uuid.uuid4().hex
+    logging.info(f"Starting run {run_id}: {request.dict()}")
+    get_event_bus().publish(run_id, "run_queued")
+    runs[run_id] = asyncio.create_task(execute_run(run_id, request))
+    return {"run_id": run_id, "events_url": f"/runs/{run_id}/events"}
+
+@app.get("/runs/{run_id}/events")
+async def stream_run_events(run_id: str, request: Request) -> StreamingResponse:
+    """
+    Stream a run's progress events as Server-Sent Events.
+    
+    Events already published are replayed first; a reconnecting client's
+    Last-Event-ID header resumes the stream after that event. The stream
+    ends with a run_finished or run_failed event.
+    """
+    event_bus = get_event_bus()
+    if not event_bus.has_run(run_id):
+        raise HTTPException(status_code=404, detail=f"Unknown run {run_id}")
+    try:
+        after = int(request.headers.get("last-event-id", "0"))
+    except ValueError:
+        after = 0
+    
+    async def stream() -> AsyncIterator[str]:
+        async for event in event_bus.subscribe(run_id, after=after, heartbeat=SSE_HEARTBEAT):
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"id: {event.sequence}\nevent: {event.type}\ndata: {json.dumps(event.dict(), default=str)}\n\n"
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/runs/{run_id}/steps/{step}/result")
+async def get_step_result(run_id: str, step: str) -> Any:
+    """
+    Return the full result of a finished step of a run.
+    
+    Step events only carry a summary of the result for clients that were
+    not connected when the step finished, such as reconnecting streams.
+    """
+    result = get_event_bus().result(run_id, step)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"No result for step {step} of run {run_id}")
+    return result
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: JobRequest) -> Dict:
+    """
+    Queue a code generation job for the worker processes.
+    
+    Args:
+        request: JobRequest with the generation parameters, extraction parameters, tenant and priority
+        
+    Returns:
+        The job ID and status
+    """
+    params = extraction_params(request.params)
+    job = await get_job_queue().submit(
+        {
+            "url": request.url,
+            "platform": request.platform,
+            "form_name": request.form_name,
+            "language": request.language,
+            "params": params
+        },
+        tenant=request.tenant,
+        priority=request.priority
+    )
+    logging.info(f"Queued job {job.id} for tenant {job.tenant}")
+    return {"job_id": job.id, "status": job.status}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str) -> Dict:
+    """Return a job's status, and its result or error once it has finished."""
+    job = await get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job.dict()
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str) -> Dict:
+    """
+    Cancel a job.
+    
+    Queued jobs are cancelled immediately; running jobs are cancelled by
+    their worker at its next heartbeat. Finished jobs cannot be cancelled.
+    """
+    job_queue = get_job_queue()
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    if job.status in FINAL_STATES:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} already {job.status}")
+    job = await job_queue.cancel(job_id)
+    return job.dict()
+
+@app.post("/crawl")
+async def crawl_forms(request: CrawlRequest) -> StreamingResponse:
+    """
+    Extract forms from many pages, streaming one JSON line per completed page.
+    
+    Args:
+        request: CrawlRequest with a URL list, sitemap or seed URL and crawl limits
+        
+    Returns:
+        Newline-delimited JSON stream of per-page extraction results
+    """
+    if not (request.urls or request.seed_url or request.sitemap_url):
+        raise HTTPException(status_code=400, detail="Provide urls, seed_url or sitemap_url")
+    params = extraction_params(request.params)
+    
+    logging.info(f"Received crawl request: {request.dict()}")
+    crawler = FormCrawler(
+        tool_registry,
+        CrawlConfig(
+            max_concurrency=request.max_concurrency,
+            per_host_concurrency=request.per_host_concurrency,
+            politeness_delay=request.politeness_delay,
+            max_pages=request.max_pages,
+            max_depth=request.max_depth,
+            discover_links=request.seed_url is not None,
+            include_pattern=request.include_pattern
+        )
+    )
+    
+    async def stream() -> AsyncIterator[str]:
+        async for page in crawler.crawl(
+            urls=request.urls,
+            seed_url=request.seed_url,
+            sitemap_url=request.sitemap_url,
+            params=params
+        ):
+            yield json.dumps(page.dict(), default=str) + "\n"
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
 @app.get("/health")
 async def health_check() -> Dict:
     """Health check endpoint."""
@@ -0,0 +1,164 @@
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+import hashlib
+import io
+import re
+import tarfile
+import time
+import zipfile
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ARCHIVE_FORMATS = {"zip": "application/zip", "tar.gz": "application/gzip"}
+
+Chunks = Iterable[Union[str, bytes]]
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to the caller."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def _encode(chunks: Chunks) -> Iterator[bytes]:
+    for chunk in chunks:
+        yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+
+class ArchiveWriter:
+    """Builds a zip or tar.gz archive incrementally, one file at a time.
+
+    Archive bytes are returned as soon as they are produced, so a response
+    can stream the archive while later files are still being rendered.
+    Zip entries are compressed chunk by chunk as their content is rendered;
+    tar headers need each file's size, so one file at a time is buffered.
+    """
+
+    def __init__(self, format: str = "zip"):
+        if format not in ARCHIVE_FORMATS:
+            raise ValueError(f"Unsupported archive format: {format}")
+        self.format = format
+        self._sink = _ChunkSink()
+        if format == "zip":
+            self._archive = zipfile.ZipFile(self._sink, "w", compression=zipfile.ZIP_DEFLATED)
+        else:
+            self._archive = tarfile.open(fileobj=self._sink, mode="w|gz")
+
+    @property
+    def media_type(self) -> str:
+        return ARCHIVE_FORMATS[self.format]
+
+    def add(self, path: str, chunks: Chunks) -> Iterator[bytes]:
+        """Add a file from its content chunks, yielding archive bytes as they are produced."""
+        if self.format == "zip":
+            info = zipfile.ZipInfo(path, date_time=time.localtime()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with self._archive.open(info, "w") as entry:
+                for chunk in _encode(chunks):
+                    entry.write(chunk)
+                    data = self._sink.drain()
+                    if data:
+                        yield data
+        else:
+            content = b"".join(_encode(chunks))
+            info = tarfile.TarInfo(path)
+            info.size = len(content)
+            info.mtime = int(time.time())
+            self._archive.addfile(info, io.BytesIO(content))
+        data = self._sink.drain()
+        if data:
+            yield data
+
+    def close(self) -> bytes:
+        """Finish the archive and return its remaining bytes."""
+        self._archive.close()
+        return self._sink.drain()
+
+def iter_archive(files: Iterable[Tuple[str, Chunks]], format: str = "zip") -> Iterator[bytes]:
+    """Stream an archive of ``(path, chunks)`` files."""
+    writer = ArchiveWriter(format)
+    for path, chunks in files:
+        yield from writer.add(path, chunks)
+    yield writer.close()
+
+# Longest readable part of an archive directory name, before its hash suffix
+MAX_ARCHIVE_NAME = 100
+
+def archive_path_for(url: str) -> str:
+    """Return a directory name identifying a form's page inside an archive.
+
+    The readable part is a sanitized copy of the URL; a short hash of the
+    full URL keeps URLs that sanitize alike (``/x?y=1`` and ``/x/y/1``) apart.
+    """
+    name = re.sub(r"^[a-z]+://", "", url, flags=re.IGNORECASE)
+    name = re.sub(r"[^A-Za-z0-9._-]+", "_", name).strip("_")[:MAX_ARCHIVE_NAME].rstrip("_") or "form"
+    return f"{name}_{hashlib.sha256(url.encode('utf-8')).hexdigest()[:8]}"
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick "br" (when brotli is installed) or "gzip" from an Accept-Encoding header."""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        match = re.search(r"q=([0-9.]+)", params)
+        if match:
+            try:
+                quality = float(match.group(1))
+            except ValueError:
+                quality = 0.0
+        if coding:
+            accepted[coding.lower()] = quality
+    candidates = (["br"] if brotli is not None else []) + ["gzip"]
+    for coding in candidates:
+        if accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+class StreamCompressor:
+    """gzip or brotli compressor that flushes after every chunk.
+
+    Flushing costs a little compression ratio but lets each chunk of a
+    streamed response reach the client as soon as it is produced.
+    """
+
+    def __init__(self, encoding: str):
+        if encoding == "br" and brotli is not None:
+            self._compressor = brotli.Compressor()
+        elif encoding == "gzip":
+            self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        else:
+            raise ValueError(f"Unsupported content encoding: {encoding}")
+        self.encoding = encoding
+
+    def compress(self, chunk: Union[str, bytes]) -> bytes:
+        data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+def compress_chunks(chunks: Chunks, encoding: str) -> Iterator[bytes]:
+    """Compress a stream of chunks with the given content encoding."""
+    compressor = StreamCompressor(encoding)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
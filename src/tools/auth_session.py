@@ -0,0 +1,219 @@
+from typing import Dict, Any, List, Optional
+import asyncio
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from urllib.parse import parse_qs, urljoin, urlparse
+from pydantic import BaseModel
+from .browser_pool import BrowserPool
+
+# Query parameters ASP.NET Forms Authentication appends when redirecting to the login page
+RETURN_URL_PARAMS = {"returnurl", "redirecturl"}
+
+class AuthenticationError(Exception):
+    """Raised when a scripted login does not produce an authenticated session."""
+
+class LoginSpec(BaseModel):
+    """How to log in to one application with Forms Authentication."""
+    username: str
+    password: str
+    login_url: Optional[str] = None
+    username_selector: str = (
+        "input[type='email'], input[name*='user' i], input[id*='user' i], input[name*='login' i]"
+    )
+    password_selector: str = "input[type='password']"
+    submit_selector: str = "input[type='submit'], button[type='submit'], input[type='image']"
+
+    @classmethod
+    def from_params(cls, params: Dict[str, Any]) -> Optional["LoginSpec"]:
+        """Build a login spec from tool parameters, or None when no credentials are given."""
+        if not params.get("username") or not params.get("password"):
+            return None
+        selectors = {
+            key: params[key]
+            for key in ("username_selector", "password_selector", "submit_selector")
+            if params.get(key)
+        }
+        return cls(
+            username=params["username"],
+            password=params["password"],
+            login_url=params.get("login_url"),
+            **selectors
+        )
+
+    def credentials_hash(self) -> str:
+        """Return a short hash identifying these credentials without revealing them."""
+        digest = hashlib.sha256(f"{self.username}\0{self.password}".encode("utf-8")).hexdigest()
+        return digest[:16]
+
+    def redirected_to_login(self, final_url: str, requested_url: str) -> bool:
+        """Return whether a request for ``requested_url`` ended on the login page."""
+        login_url = urljoin(requested_url, self.login_url) if self.login_url else None
+        return is_login_page(final_url, login_url)
+
+class AuthSessionStore:
+    """Persists one Playwright storage state (cookies and localStorage) per origin and user.
+
+    The state is written to ``<directory>/<origin>_<credentials hash>.json``
+    so it is shared by every browser context and every worker process, but
+    only with requests that log in with the same credentials. Logins for an
+    origin and user are serialised with an in-process lock and an ``flock`` on
+    a sibling lock file, so a burst of requests with an expired session
+    triggers a single login.
+    """
+
+    def __init__(self, directory: str = "./data/auth", max_age: float = 1800.0):
+        self.directory = directory
+        self.max_age = max_age
+        self.logger = logging.getLogger("auth_session")
+        os.makedirs(self.directory, exist_ok=True)
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def state_path(self, origin: str, login: LoginSpec) -> str:
+        """Return the storage state file of an origin and user."""
+        name = origin.replace("://", "_").replace(":", "_").replace("/", "_")
+        return os.path.join(self.directory, f"{name}_{login.credentials_hash()}.json")
+
+    def load(self, origin: str, login: LoginSpec) -> Optional[Dict[str, Any]]:
+        """Return the stored state of an origin and user when it exists and has not expired."""
+        path = self.state_path(origin, login)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age:
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        now = time.time()
+        for cookie in state.get("cookies", []):
+            expires = cookie.get("expires", -1)
+            if expires is not None and 0 < expires < now:
+                return None
+        return state
+
+    async def session(
+        self,
+        browser_pool: BrowserPool,
+        url: str,
+        login: LoginSpec,
+        stale: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Return a valid storage state of ``login``'s user for the origin of ``url``, logging in if needed.
+
+        Pass the state that just failed as ``stale`` to force a new login; if
+        another request or process already replaced it, the fresh state is
+        returned without logging in again.
+        """
+        origin = origin_of(url)
+        path = self.state_path(origin, login)
+        state = await asyncio.to_thread(self.load, origin, login)
+        if state is not None and state != stale:
+            return state
+
+        async with self._locks.setdefault(path, asyncio.Lock()):
+            # Other worker processes may be logging in to the same origin as the same user
+            lock_file = await asyncio.to_thread(_lock_file, path + ".lock")
+            try:
+                state = await asyncio.to_thread(self.load, origin, login)
+                if state is not None and state != stale:
+                    return state
+                state = await self._login(browser_pool, url, login)
+                await asyncio.to_thread(self._save, origin, login, state)
+                return state
+            finally:
+                _unlock_file(lock_file)
+
+    def invalidate(self, origin: str, login: LoginSpec):
+        """Forget the stored state of an origin and user."""
+        try:
+            os.remove(self.state_path(origin, login))
+        except FileNotFoundError:
+            pass
+
+    async def _login(self, browser_pool: BrowserPool, url: str, login: LoginSpec) -> Dict[str, Any]:
+        """Run the scripted login in a fresh context and capture its storage state."""
+        login_url = urljoin(url, login.login_url) if login.login_url else url
+        self.logger.info(f"Logging in to {origin_of(url)} as {login.username}")
+        async with browser_pool.context() as browser_context:
+            page = await browser_context.new_page()
+            await page.goto(login_url, wait_until="domcontentloaded")
+            password_field = await page.query_selector(login.password_selector)
+            if password_field is None:
+                raise AuthenticationError(f"No login form found at {page.url}")
+
+            await page.fill(login.username_selector, login.username)
+            await password_field.fill(login.password)
+            async with page.expect_navigation(wait_until="domcontentloaded"):
+                await page.click(login.submit_selector)
+
+            still_on_login = await page.query_selector(login.password_selector) is not None
+            if still_on_login or login.redirected_to_login(page.url, url):
+                raise AuthenticationError(f"Login to {origin_of(url)} as {login.username} was rejected")
+            return await browser_context.storage_state()
+
+    def _save(self, origin: str, login: LoginSpec, state: Dict[str, Any]):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.state_path(origin, login))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+def _lock_file(path: str):
+    """Block until the exclusive lock on ``path`` is held and return the open file."""
+    f = open(path, "a")
+    fcntl.flock(f, fcntl.LOCK_EX)
+    return f
+
+def _unlock_file(f):
+    fcntl.flock(f, fcntl.LOCK_UN)
+    f.close()
+
+def origin_of(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}".lower()
+
+def is_login_page(url: str, login_url: Optional[str] = None) -> bool:
+    """Return whether a (final) URL is the login page the app redirects to."""
+    parsed = urlparse(url)
+    if login_url and parsed.path.lower() == urlparse(login_url).path.lower():
+        return True
+    query = {key.lower() for key in parse_qs(parsed.query)}
+    return bool(query & RETURN_URL_PARAMS)
+
+def cookie_header(state: Dict[str, Any], url: str) -> Optional[str]:
+    """Return the Cookie header a browser with ``state`` would send to ``url``."""
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+    path = parsed.path or "/"
+    cookies: List[str] = []
+    for cookie in state.get("cookies", []):
+        domain = cookie.get("domain", "").lstrip(".").lower()
+        if host != domain and not host.endswith("." + domain):
+            continue
+        if not path.startswith(cookie.get("path", "/")):
+            continue
+        if cookie.get("secure") and parsed.scheme != "https":
+            continue
+        cookies.append(f"{cookie['name']}={cookie['value']}")
+    return "; ".join(cookies) or None
+
+_shared_store: Optional[AuthSessionStore] = None
+
+def get_auth_store() -> AuthSessionStore:
+    """Return the process-wide authenticated session store."""
+    global _shared_store
+    if _shared_store is None:
+        _shared_store = AuthSessionStore(
+            directory=os.getenv("AUTH_STATE_DIR", "./data/auth"),
+            max_age=float(os.getenv("AUTH_SESSION_MAX_AGE", "1800"))
+        )
+    return _shared_store
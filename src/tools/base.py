@@ -1,16 +1,33 @@
 from typing import Dict, Any, List, Optional
 from abc import ABC, abstractmethod
 from pydantic import BaseModel
+import asyncio
 import logging
+import random
+import time
+from .result_cache import ResultCache, get_result_cache
 
 class ToolConfig(BaseModel):
     """Configuration for a tool."""
     name: str
     description: str
     enabled: bool = True
-    timeout: int = 30
+    timeout: float = 30
     retry_count: int = 3
     retry_delay: int = 1
+    retry_max_delay: float = 30.0
+    circuit_failure_threshold: int = 5
+    circuit_reset_timeout: float = 30.0
+    # Admission control: None means unlimited concurrent calls. Callers beyond
+    # max_concurrency wait (up to queue_timeout seconds) while fewer than
+    # max_queue are waiting, and are rejected immediately otherwise.
+    max_concurrency: Optional[int] = None
+    max_queue: int = 100
+    queue_timeout: Optional[float] = None
+    # Opt-in result cache; the key covers the params and these context keys
+    cache_enabled: bool = False
+    cache_ttl: float = 3600.0
+    cache_context_keys: List[str] = []
 
 class ToolResult(BaseModel):
     """Standardized tool execution result."""
@@ -18,6 +35,59 @@ class ToolResult(BaseModel):
     data: Dict[str, Any]
     error: Optional[str] = None
     metadata: Dict[str, Any] = {}
+    # Set by tools when the failure is transient and the call may be retried
+    retryable: bool = False
+
+# Exceptions escaping a tool that indicate a transient failure
+RETRYABLE_EXCEPTIONS = (asyncio.TimeoutError, ConnectionError)
+
+class CircuitBreaker:
+    """Stops calling a tool after repeated transient failures.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls are rejected for ``reset_timeout`` seconds; then a single trial
+    call is let through (half-open) and its outcome closes or reopens it.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Return whether a call may proceed, claiming the trial call when half-open."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def release_trial(self):
+        """Give up a claimed trial call that never reached the tool."""
+        self._trial_in_flight = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._trial_in_flight or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._trial_in_flight = False
 
 class BaseTool(ABC):
     """Base interface for all tools."""
@@ -52,11 +122,57 @@ class BaseTool(ABC):
             }
         )
 
+class ConcurrencyLimiter:
+    """Bounds the concurrent calls of one tool with a bounded wait queue."""
+
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: Optional[float]):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        # Created on first use so it binds to the running event loop
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def acquire(self) -> Optional[str]:
+        """Take a slot, returning a rejection reason instead when admission fails."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        if self._slots.locked():
+            if self.waiting >= self.max_queue:
+                return "queue full"
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                return "queue timeout"
+            finally:
+                self.waiting -= 1
+        else:
+            await self._slots.acquire()
+        self.active += 1
+        return None
+
+    def release(self):
+        self.active -= 1
+        self._slots.release()
+
 class ToolRegistry:
-    """Registry for managing available tools."""
+    """Registry for managing available tools.
+
+    Every call is bounded by the tool's ``timeout``, transient failures are
+    retried ``retry_count`` times with exponential backoff and jitter, and a
+    per-tool circuit breaker rejects calls while the tool keeps failing.
+    Tools with ``max_concurrency`` set admit that many calls at once and
+    queue or reject the rest, so one busy tool cannot starve the others.
+    """
     
-    def __init__(self):
+    def __init__(self, result_cache: Optional[ResultCache] = None):
         self._tools: Dict[str, BaseTool] = {}
+        self._result_cache = result_cache
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._limiters: Dict[str, ConcurrencyLimiter] = {}
+        self._metrics: Dict[str, Dict[str, int]] = {}
         self.logger = logging.getLogger("tool_registry")
 
     def register(self, tool: BaseTool):
@@ -64,8 +180,28 @@ class ToolRegistry:
         if tool.config.name in self._tools:
             raise ValueError(f"Tool {tool.config.name} is already registered")
         self._tools[tool.config.name] = tool
+        self._breakers[tool.config.name] = CircuitBreaker(
+            tool.config.circuit_failure_threshold,
+            tool.config.circuit_reset_timeout
+        )
+        if tool.config.max_concurrency:
+            self._limiters[tool.config.name] = ConcurrencyLimiter(
+                tool.config.max_concurrency,
+                tool.config.max_queue,
+                tool.config.queue_timeout
+            )
+        self._metrics[tool.config.name] = {
+            "calls": 0, "failures": 0, "timeouts": 0, "retries": 0, "circuit_rejections": 0,
+            "queue_rejections": 0
+        }
         self.logger.info(f"Registered tool: {tool.config.name}")
 
+    @property
+    def result_cache(self) -> ResultCache:
+        if self._result_cache is None:
+            self._result_cache = get_result_cache()
+        return self._result_cache
+
     def get_tool(self, name: str) -> Optional[BaseTool]:
         """Get a tool by name."""
         return self._tools.get(name)
@@ -74,6 +210,21 @@ class ToolRegistry:
         """List all registered tool names."""
         return list(self._tools.keys())
 
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Return the call counters, circuit state and queue depth of every tool.
+
+        Result cache counters, shared by all tools, are reported under "result_cache".
+        """
+        metrics: Dict[str, Dict[str, Any]] = {}
+        for name, counters in self._metrics.items():
+            metrics[name] = {**counters, "circuit": self._breakers[name].state}
+            limiter = self._limiters.get(name)
+            if limiter:
+                metrics[name].update(active=limiter.active, waiting=limiter.waiting)
+        if self._result_cache is not None:
+            metrics["result_cache"] = dict(self._result_cache.metrics)
+        return metrics
+
     async def execute_tool(self, name: str, params: Dict[str, Any], context: Dict[str, Any]) -> ToolResult:
         """Execute a tool by name."""
         tool = self.get_tool(name)
@@ -98,14 +249,130 @@ class ToolRegistry:
                     data={},
                     error=f"Invalid parameters for tool {name}"
                 )
-            
-            result = await tool.execute(params, context)
-            tool._log_execution(params, result)
-            return result
         except Exception as e:
-            self.logger.error(f"Error executing tool {name}: {str(e)}")
+            self.logger.error(f"Error validating parameters for tool {name}: {str(e)}")
             return ToolResult(
                 success=False,
                 data={},
                 error=str(e)
-            ) 
\ No newline at end of file
+            )
+
+        if not tool.config.cache_enabled:
+            return await self._execute_with_policy(tool, params, context)
+
+        async def compute() -> Dict[str, Any]:
+            return (await self._execute_with_policy(tool, params, context)).dict()
+
+        key = self.result_cache.key_for(name, params, context, tool.config.cache_context_keys)
+        payload, source = await self.result_cache.get_or_compute(
+            key,
+            compute,
+            tool.config.cache_ttl,
+            cacheable=lambda payload: payload["success"]
+        )
+        result = ToolResult(**payload)
+        if source != "miss":
+            result.metadata = {**result.metadata, "result_cache": source}
+        return result
+
+    async def _execute_with_policy(
+        self,
+        tool: BaseTool,
+        params: Dict[str, Any],
+        context: Dict[str, Any]
+    ) -> ToolResult:
+        """Run a validated call through the circuit breaker, admission control and retries."""
+        name = tool.config.name
+        metrics = self._metrics[name]
+        breaker = self._breakers[name]
+        # No await between these two lines, so the trial (if any) is ours
+        is_trial = breaker.state == "half_open"
+        if not breaker.allow():
+            metrics["circuit_rejections"] += 1
+            return ToolResult(
+                success=False,
+                data={},
+                error=f"Tool {name} is temporarily unavailable (circuit open)",
+                retryable=True
+            )
+
+        limiter = self._limiters.get(name)
+        attempt = 0
+        try:
+            while True:
+                if limiter:
+                    rejection = await limiter.acquire()
+                    if rejection:
+                        if is_trial:
+                            breaker.release_trial()
+                        metrics["queue_rejections"] += 1
+                        self.logger.warning(f"Rejected call to tool {name}: {rejection}")
+                        return ToolResult(
+                            success=False,
+                            data={},
+                            error=f"Tool {name} is overloaded ({rejection})",
+                            retryable=True
+                        )
+                metrics["calls"] += 1
+                try:
+                    result = await self._call(tool, params, context)
+                finally:
+                    if limiter:
+                        limiter.release()
+                if result.success or not result.retryable or attempt >= tool.config.retry_count:
+                    break
+                delay = self._backoff(tool.config, attempt)
+                attempt += 1
+                metrics["retries"] += 1
+                self.logger.warning(
+                    f"Retrying tool {name} in {delay:.2f}s (attempt {attempt + 1}): {result.error}"
+                )
+                await asyncio.sleep(delay)
+        except BaseException:
+            # A cancelled trial call must not leave the circuit half-open forever
+            if is_trial:
+                breaker.release_trial()
+            raise
+
+        if result.success or not result.retryable:
+            # The tool answered; only transient failures count against the circuit
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+        if not result.success:
+            metrics["failures"] += 1
+        tool._log_execution(params, result)
+        return result
+
+    async def _call(self, tool: BaseTool, params: Dict[str, Any], context: Dict[str, Any]) -> ToolResult:
+        """Run one attempt under the tool's deadline.
+
+        ``asyncio.wait_for`` cancels the attempt on timeout, so the tool's
+        ``async with`` blocks release browsers and connections on the way out.
+        """
+        name = tool.config.name
+        try:
+            return await asyncio.wait_for(tool.execute(params, context), tool.config.timeout)
+        except asyncio.TimeoutError:
+            self._metrics[name]["timeouts"] += 1
+            self.logger.error(f"Tool {name} timed out after {tool.config.timeout}s")
+            return ToolResult(
+                success=False,
+                data={},
+                error=f"Tool {name} timed out after {tool.config.timeout}s",
+                retryable=True
+            )
+        except Exception as e:
+            self.logger.error(f"Error executing tool {name}: {str(e)}")
+            return ToolResult(
+                success=False,
+                data={},
+                error=str(e),
+                retryable=isinstance(e, RETRYABLE_EXCEPTIONS)
+            )
+
+    @staticmethod
+    def _backoff(config: ToolConfig, attempt: int) -> float:
+        """Exponential backoff capped at ``retry_max_delay``, with equal jitter."""
+        delay = min(config.retry_delay * (2 ** attempt), config.retry_max_delay)
+        return delay / 2 + random.uniform(0, delay / 2)
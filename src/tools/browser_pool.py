@@ -0,0 +1,226 @@
+from typing import Dict, Any, List, Optional, AsyncIterator
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from pydantic import BaseModel
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+
+class BrowserPoolConfig(BaseModel):
+    """Configuration for the shared browser pool."""
+    size: int = 2
+    max_contexts: int = 8
+    headless: bool = True
+    launch_args: List[str] = ["--no-sandbox"]
+    recycle_after_pages: int = 200
+    recycle_after_memory_mb: int = 512
+    health_check_interval: float = 30.0
+    acquire_timeout: float = 60.0
+
+    @classmethod
+    def from_env(cls) -> "BrowserPoolConfig":
+        """Build a configuration from BROWSER_* environment variables."""
+        return cls(
+            size=int(os.getenv("BROWSER_POOL_SIZE", "2")),
+            max_contexts=int(os.getenv("BROWSER_MAX_CONTEXTS", "8")),
+            headless=os.getenv("BROWSER_HEADLESS", "true").lower() == "true",
+            recycle_after_pages=int(os.getenv("BROWSER_RECYCLE_PAGES", "200")),
+            recycle_after_memory_mb=int(os.getenv("BROWSER_RECYCLE_MEMORY_MB", "512")),
+            health_check_interval=float(os.getenv("BROWSER_HEALTH_CHECK_INTERVAL", "30")),
+            acquire_timeout=float(os.getenv("BROWSER_ACQUIRE_TIMEOUT", "60"))
+        )
+
+class PooledBrowser:
+    """A warm browser instance tracked by the pool."""
+
+    def __init__(self, browser: Browser):
+        self.browser = browser
+        self.active_contexts = 0
+        self.pages_served = 0
+        self.peak_memory_mb = 0.0
+        self.retiring = False
+
+    def is_healthy(self) -> bool:
+        return self.browser.is_connected()
+
+class BrowserPool:
+    """Process-wide pool of warm Chromium browsers.
+
+    Each request gets its own isolated ``BrowserContext``; browsers are shared
+    and recycled once they have served too many pages or grown too large.
+    """
+
+    def __init__(self, config: Optional[BrowserPoolConfig] = None):
+        self.config = config or BrowserPoolConfig()
+        self.logger = logging.getLogger("browser_pool")
+        self._playwright: Optional[Playwright] = None
+        self._browsers: List[PooledBrowser] = []
+        self._context_slots: Optional[asyncio.Semaphore] = None
+        self._lock = asyncio.Lock()
+        self._health_task: Optional[asyncio.Task] = None
+        self._started = False
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    async def start(self):
+        """Start the playwright driver and launch the warm browsers."""
+        async with self._lock:
+            if self._started:
+                return
+            self._playwright = await async_playwright().start()
+            self._context_slots = asyncio.Semaphore(self.config.max_contexts)
+            try:
+                for _ in range(self.config.size):
+                    self._browsers.append(await self._launch())
+            except Exception:
+                for pooled in self._browsers:
+                    await self._close_browser(pooled)
+                self._browsers = []
+                await self._playwright.stop()
+                self._playwright = None
+                raise
+            self._health_task = asyncio.create_task(self._health_loop())
+            self._started = True
+            self.logger.info(f"Browser pool started with {self.config.size} browsers")
+
+    async def stop(self):
+        """Close every browser and stop the playwright driver."""
+        async with self._lock:
+            if not self._started:
+                return
+            if self._health_task:
+                self._health_task.cancel()
+                try:
+                    await self._health_task
+                except asyncio.CancelledError:
+                    pass
+                self._health_task = None
+            for pooled in self._browsers:
+                await self._close_browser(pooled)
+            self._browsers = []
+            if self._playwright:
+                await self._playwright.stop()
+                self._playwright = None
+            self._started = False
+            self.logger.info("Browser pool stopped")
+
+    @asynccontextmanager
+    async def context(self, **context_options: Any) -> AsyncIterator[BrowserContext]:
+        """Lease an isolated browser context for the duration of a request."""
+        if not self._started:
+            await self.start()
+
+        await asyncio.wait_for(self._context_slots.acquire(), self.config.acquire_timeout)
+        pooled: Optional[PooledBrowser] = None
+        context: Optional[BrowserContext] = None
+        try:
+            pooled = await self._checkout()
+            context = await pooled.browser.new_context(**context_options)
+            context.on("page", lambda _page: self._count_page(pooled))
+            yield context
+        finally:
+            if context is not None:
+                await self._sample_memory(pooled, context)
+                try:
+                    await context.close()
+                except Exception as e:
+                    self.logger.warning(f"Error closing browser context: {str(e)}")
+            if pooled is not None:
+                await self._checkin(pooled)
+            self._context_slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of pool usage."""
+        return {
+            "browsers": len(self._browsers),
+            "active_contexts": sum(p.active_contexts for p in self._browsers),
+            "pages_served": [p.pages_served for p in self._browsers],
+            "peak_memory_mb": [p.peak_memory_mb for p in self._browsers]
+        }
+
+    async def _launch(self) -> PooledBrowser:
+        browser = await self._playwright.chromium.launch(
+            headless=self.config.headless,
+            args=self.config.launch_args
+        )
+        return PooledBrowser(browser)
+
+    async def _checkout(self) -> PooledBrowser:
+        """Pick the least-loaded healthy browser, replacing dead ones."""
+        async with self._lock:
+            for index, pooled in enumerate(self._browsers):
+                if not pooled.retiring and not pooled.is_healthy():
+                    self.logger.warning("Replacing disconnected browser")
+                    self._browsers[index] = await self._launch()
+            candidates = [p for p in self._browsers if not p.retiring]
+            if not candidates:
+                pooled = await self._launch()
+                self._browsers.append(pooled)
+                candidates = [pooled]
+            pooled = min(candidates, key=lambda p: p.active_contexts)
+            pooled.active_contexts += 1
+            return pooled
+
+    async def _checkin(self, pooled: PooledBrowser):
+        async with self._lock:
+            pooled.active_contexts -= 1
+            if not pooled.retiring and self._needs_recycling(pooled):
+                pooled.retiring = True
+                self.logger.info(
+                    f"Recycling browser after {pooled.pages_served} pages "
+                    f"({pooled.peak_memory_mb:.0f} MB)"
+                )
+                if pooled in self._browsers:
+                    self._browsers[self._browsers.index(pooled)] = await self._launch()
+            if pooled.retiring and pooled.active_contexts == 0:
+                await self._close_browser(pooled)
+
+    def _needs_recycling(self, pooled: PooledBrowser) -> bool:
+        return (
+            pooled.pages_served >= self.config.recycle_after_pages
+            or pooled.peak_memory_mb >= self.config.recycle_after_memory_mb
+        )
+
+    def _count_page(self, pooled: PooledBrowser):
+        pooled.pages_served += 1
+
+    async def _sample_memory(self, pooled: PooledBrowser, context: BrowserContext):
+        """Record the JS heap size reported by the context's pages."""
+        for page in context.pages:
+            try:
+                used = await page.evaluate(
+                    "() => performance.memory ? performance.memory.usedJSHeapSize : 0"
+                )
+                pooled.peak_memory_mb = max(pooled.peak_memory_mb, used / (1024 * 1024))
+            except Exception:
+                pass
+
+    async def _close_browser(self, pooled: PooledBrowser):
+        try:
+            await pooled.browser.close()
+        except Exception as e:
+            self.logger.warning(f"Error closing browser: {str(e)}")
+
+    async def _health_loop(self):
+        """Periodically replace idle browsers that have crashed or disconnected."""
+        while True:
+            await asyncio.sleep(self.config.health_check_interval)
+            async with self._lock:
+                for index, pooled in enumerate(self._browsers):
+                    if pooled.active_contexts == 0 and not pooled.is_healthy():
+                        self.logger.warning("Health check replaced a disconnected browser")
+                        try:
+                            self._browsers[index] = await self._launch()
+                        except Exception as e:
+                            self.logger.error(f"Failed to relaunch browser: {str(e)}")
+
+_shared_pool: Optional[BrowserPool] = None
+
+def get_browser_pool() -> BrowserPool:
+    """Return the process-wide browser pool, creating it on first use."""
+    global _shared_pool
+    if _shared_pool is None:
+        _shared_pool = BrowserPool(BrowserPoolConfig.from_env())
+    return _shared_pool
@@ -1,9 +1,14 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 import os
 from datetime import datetime
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, TemplateNotFound
 from .base import BaseTool, ToolConfig, ToolResult
 
+# Source file extension of each target language in archived projects
+FILE_EXTENSIONS = {"python": "py", "java": "java", "csharp": "cs"}
+# Framework generated for a language when none is requested
+DEFAULT_FRAMEWORKS = {"python": "fastapi", "java": "spring", "csharp": "aspnet"}
+
 class CodeGenerationTool(BaseTool):
     """Tool for generating modern code from form analysis."""
 
@@ -11,7 +16,8 @@ class CodeGenerationTool(BaseTool):
         super().__init__(
             ToolConfig(
                 name="code_generation",
-                description="Generates modern code from form analysis"
+                description="Generates modern code from form analysis",
+                cache_enabled=True
             )
         )
         self.template_env = Environment(
@@ -25,26 +31,14 @@ class CodeGenerationTool(BaseTool):
             language = params.get("language", "python")
             framework = params.get("framework", "fastapi")
             
-            # Generate API code
-            api_code = await self._generate_api_code(analysis, language, framework)
-            
-            # Generate HTML form
-            html_code = await self._generate_html_form(analysis)
-            
-            # Generate validation code
-            validation_code = await self._generate_validation_code(analysis, language)
-            
-            # Generate event handlers
-            event_code = await self._generate_event_handlers(analysis, language)
+            data: Dict[str, Dict[str, str]] = {}
+            for section, key, _, template_name, template_data in self._artifacts(analysis, language, framework):
+                template = self.template_env.get_template(template_name)
+                data.setdefault(section, {})[key] = template.render(**template_data)
             
             return ToolResult(
                 success=True,
-                data={
-                    "api_code": api_code,
-                    "html_code": html_code,
-                    "validation_code": validation_code,
-                    "event_code": event_code
-                },
+                data=data,
                 metadata={
                     "language": language,
                     "framework": framework,
@@ -68,84 +62,73 @@ class CodeGenerationTool(BaseTool):
         """Clean up any resources."""
         pass
 
-    async def _generate_api_code(self, analysis: Dict[str, Any], language: str, framework: str) -> Dict[str, str]:
-        """Generate API code based on the analysis."""
-        template_name = f"api_{language}_{framework}.jinja2"
-        template = self.template_env.get_template(template_name)
-        
-        # Prepare template data
-        template_data = {
-            "form_name": analysis.get("form_name", "Form"),
-            "fields": self._prepare_fields(analysis),
-            "validation_rules": analysis.get("validation", {}),
-            "event_handlers": analysis.get("events", {})
-        }
-        
-        # Generate code
-        code = template.render(**template_data)
-        
-        return {
-            "main": code,
-            "models": self._generate_models(analysis, language),
-            "routes": self._generate_routes(analysis, language, framework)
-        }
-
-    async def _generate_html_form(self, analysis: Dict[str, Any]) -> Dict[str, str]:
-        """Generate HTML form code."""
-        template = self.template_env.get_template("html_form.jinja2")
-        
-        # Prepare template data
-        template_data = {
-            "form_name": analysis.get("form_name", "Form"),
-            "fields": self._prepare_fields(analysis),
-            "validation_rules": analysis.get("validation", {}),
-            "event_handlers": analysis.get("events", {})
-        }
-        
-        # Generate code
-        code = template.render(**template_data)
-        
-        return {
-            "form": code,
-            "styles": self._generate_styles(analysis),
-            "scripts": self._generate_scripts(analysis)
-        }
-
-    async def _generate_validation_code(self, analysis: Dict[str, Any], language: str) -> Dict[str, str]:
-        """Generate validation code."""
-        template = self.template_env.get_template(f"validation_{language}.jinja2")
-        
-        # Prepare template data
-        template_data = {
-            "validation_rules": analysis.get("validation", {}),
-            "fields": self._prepare_fields(analysis)
-        }
-        
-        # Generate code
-        code = template.render(**template_data)
-        
-        return {
-            "validators": code,
-            "error_handlers": self._generate_error_handlers(analysis, language)
-        }
-
-    async def _generate_event_handlers(self, analysis: Dict[str, Any], language: str) -> Dict[str, str]:
-        """Generate event handler code."""
-        template = self.template_env.get_template(f"events_{language}.jinja2")
-        
-        # Prepare template data
-        template_data = {
-            "event_handlers": analysis.get("events", {}),
-            "fields": self._prepare_fields(analysis)
-        }
-        
-        # Generate code
-        code = template.render(**template_data)
-        
-        return {
-            "handlers": code,
-            "utilities": self._generate_event_utilities(analysis, language)
+    def missing_templates(self, language: str, framework: str) -> List[str]:
+        """Return the templates a language/framework target needs but which do not exist."""
+        missing = []
+        for _, _, _, template_name, _ in self._artifacts({}, language, framework):
+            try:
+                self.template_env.get_template(template_name)
+            except TemplateNotFound:
+                missing.append(template_name)
+        return missing
+
+    def iter_artifacts(
+        self,
+        analysis: Dict[str, Any],
+        language: str = "python",
+        framework: str = "fastapi",
+        prefix: str = ""
+    ) -> Iterator[Tuple[str, Iterator[str]]]:
+        """Yield each generated file's project path and its lazily rendered content.
+
+        Templates are rendered chunk by chunk as the content is consumed, so
+        archives can be streamed without building the whole project in memory.
+        All templates are loaded before the first file is yielded, so a
+        missing template fails the target before any of its files is written.
+        """
+        artifacts = [
+            (prefix + path, self.template_env.get_template(template_name), template_data)
+            for _, _, path, template_name, template_data in self._artifacts(analysis, language, framework)
+        ]
+        for path, template, template_data in artifacts:
+            yield path, template.generate(**template_data)
+
+    def _artifacts(
+        self,
+        analysis: Dict[str, Any],
+        language: str,
+        framework: str
+    ) -> List[Tuple[str, str, str, str, Dict[str, Any]]]:
+        """Return (section, key, project path, template, template data) of every generated file."""
+        fields = self._prepare_fields(analysis)
+        form_name = analysis.get("form_name", "Form")
+        validation_rules = analysis.get("validation", {})
+        event_handlers = analysis.get("events", {})
+        extension = FILE_EXTENSIONS.get(language, language)
+        form_data = {
+            "form_name": form_name,
+            "fields": fields,
+            "validation_rules": validation_rules,
+            "event_handlers": event_handlers
         }
+        return [
+            ("api_code", "main", f"api/main.{extension}", f"api_{language}_{framework}.jinja2", form_data),
+            ("api_code", "models", f"api/models.{extension}", f"models_{language}.jinja2", {"fields": fields}),
+            ("api_code", "routes", f"api/routes.{extension}", f"routes_{language}_{framework}.jinja2",
+             {"form_name": form_name, "fields": fields}),
+            ("html_code", "form", "web/form.html", "html_form.jinja2", form_data),
+            ("html_code", "styles", "web/styles.css", "styles.jinja2", {"fields": fields}),
+            ("html_code", "scripts", "web/scripts.js", "scripts.jinja2",
+             {"validation_rules": validation_rules, "event_handlers": event_handlers}),
+            ("validation_code", "validators", f"validation/validators.{extension}", f"validation_{language}.jinja2",
+             {"validation_rules": validation_rules, "fields": fields}),
+            ("validation_code", "error_handlers", f"validation/error_handlers.{extension}",
+             f"error_handlers_{language}.jinja2", {"validation_rules": validation_rules}),
+            ("event_code", "handlers", f"events/handlers.{extension}", f"events_{language}.jinja2",
+             {"event_handlers": event_handlers, "fields": fields}),
+            ("event_code", "utilities", f"events/utilities.{extension}", f"event_utilities_{language}.jinja2",
+             {"event_handlers": event_handlers})
+        ]
 
     def _prepare_fields(self, analysis: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Prepare field data for templates."""
@@ -155,13 +138,33 @@ class CodeGenerationTool(BaseTool):
                 "name": element.get("name"),
                 "type": self._map_input_type(element.get("type")),
                 "required": element.get("required", False),
-                "validation": element.get("validation", []),
+                "validation": self._field_validation(element),
                 "events": element.get("events", []),
                 "attributes": element.get("attributes", {})
             }
             fields.append(field)
         return fields
 
+    def _field_validation(self, element: Dict[str, Any]) -> Dict[str, Any]:
+        """Return an element's validation rules keyed by rule, as the templates read them.
+
+        Rules may be given as a dict or as a list of ``{"type", "value"}``
+        rules; the constraints of extracted elements (email type, pattern,
+        min, max and select options) are added to them.
+        """
+        validation = element.get("validation") or {}
+        if isinstance(validation, list):
+            validation = {rule.get("type"): rule.get("value", True) for rule in validation}
+        rules = dict(validation)
+        if element.get("type") == "email":
+            rules.setdefault("email", True)
+        for name in ("pattern", "min", "max"):
+            if element.get(name) not in (None, ""):
+                rules.setdefault(name, element[name])
+        if element.get("options"):
+            rules.setdefault("options", [option["value"] for option in element["options"]])
+        return rules
+
     def _map_input_type(self, input_type: str) -> str:
         """Map HTML input types to appropriate data types."""
         type_mapping = {
@@ -177,39 +180,3 @@ class CodeGenerationTool(BaseTool):
             "textarea": "string"
         }
         return type_mapping.get(input_type, "string")
-
-    def _generate_models(self, analysis: Dict[str, Any], language: str) -> str:
-        """Generate data models."""
-        template = self.template_env.get_template(f"models_{language}.jinja2")
-        return template.render(fields=self._prepare_fields(analysis))
-
-    def _generate_routes(self, analysis: Dict[str, Any], language: str, framework: str) -> str:
-        """Generate API routes."""
-        template = self.template_env.get_template(f"routes_{language}_{framework}.jinja2")
-        return template.render(
-            form_name=analysis.get("form_name", "Form"),
-            fields=self._prepare_fields(analysis)
-        )
-
-    def _generate_styles(self, analysis: Dict[str, Any]) -> str:
-        """Generate CSS styles."""
-        template = self.template_env.get_template("styles.jinja2")
-        return template.render(fields=self._prepare_fields(analysis))
-
-    def _generate_scripts(self, analysis: Dict[str, Any]) -> str:
-        """Generate JavaScript code."""
-        template = self.template_env.get_template("scripts.jinja2")
-        return template.render(
-            validation_rules=analysis.get("validation", {}),
-            event_handlers=analysis.get("events", {})
-        )
-
-    def _generate_error_handlers(self, analysis: Dict[str, Any], language: str) -> str:
-        """Generate error handling code."""
-        template = self.template_env.get_template(f"error_handlers_{language}.jinja2")
-        return template.render(validation_rules=analysis.get("validation", {}))
-
-    def _generate_event_utilities(self, analysis: Dict[str, Any], language: str) -> str:
-        """Generate event utility code."""
-        template = self.template_env.get_template(f"event_utilities_{language}.jinja2")
-        return template.render(event_handlers=analysis.get("events", {})) 
\ No newline at end of file
@@ -0,0 +1,188 @@
+from typing import Dict, Any, List, Optional, AsyncIterator, Set
+import asyncio
+import logging
+import re
+import time
+from urllib.parse import urldefrag, urlparse
+from lxml import etree
+from pydantic import BaseModel
+from .base import ToolRegistry, ToolResult
+from .static_extraction import get_http_client
+
+# Link targets that never contain forms
+SKIPPED_EXTENSIONS = (
+    ".png", ".jpg", ".jpeg", ".gif", ".svg", ".ico", ".css", ".js", ".axd",
+    ".pdf", ".zip", ".doc", ".docx", ".xls", ".xlsx", ".woff", ".woff2"
+)
+
+class CrawlConfig(BaseModel):
+    """Limits for a multi-page crawl."""
+    max_concurrency: int = 8
+    per_host_concurrency: int = 2
+    politeness_delay: float = 0.5
+    max_pages: int = 1000
+    max_depth: int = 3
+    discover_links: bool = True
+    include_pattern: Optional[str] = None
+
+class CrawlResult(BaseModel):
+    """Extraction result for a single crawled page."""
+    url: str
+    depth: int
+    result: ToolResult
+
+class _HostThrottle:
+    """Bounds concurrency and spaces out requests to a single host."""
+
+    def __init__(self, concurrency: int, delay: float):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.delay = delay
+        self._lock = asyncio.Lock()
+        self._next_request_at = 0.0
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        async with self._lock:
+            wait = self._next_request_at - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_request_at = time.monotonic() + self.delay
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.semaphore.release()
+
+class FormCrawler:
+    """Extracts forms from many pages concurrently through the web navigation tool.
+
+    Pages come from an explicit URL list, a sitemap, or a seed URL whose
+    same-origin links are followed. Results are yielded as each page completes.
+    Every page goes through the tool registry, so the tool's concurrency
+    limit, timeout, retries and circuit breaker apply to crawls too.
+    """
+
+    def __init__(
+        self,
+        tool_registry: ToolRegistry,
+        config: Optional[CrawlConfig] = None,
+        tool_name: str = "web_navigation"
+    ):
+        self.tool_registry = tool_registry
+        self.tool_name = tool_name
+        self.config = config or CrawlConfig()
+        self.logger = logging.getLogger("crawler")
+
+    async def crawl(
+        self,
+        urls: Optional[List[str]] = None,
+        seed_url: Optional[str] = None,
+        sitemap_url: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+        context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[CrawlResult]:
+        """Crawl the given pages and yield a result for each one as it completes."""
+        start_urls = list(urls or [])
+        if sitemap_url:
+            start_urls.extend(await self.read_sitemap(sitemap_url))
+        if seed_url:
+            start_urls.append(seed_url)
+        if not start_urls:
+            return
+
+        origins = {self._origin(url) for url in start_urls}
+        include = re.compile(self.config.include_pattern) if self.config.include_pattern else None
+        throttles: Dict[str, _HostThrottle] = {}
+        seen: Set[str] = set()
+        pending: asyncio.Queue = asyncio.Queue()
+        results: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        def enqueue(url: str, depth: int):
+            url = urldefrag(url)[0]
+            if url in seen or len(seen) >= self.config.max_pages:
+                return
+            seen.add(url)
+            pending.put_nowait((url, depth))
+
+        for url in start_urls:
+            enqueue(url, 0)
+
+        async def worker():
+            while True:
+                url, depth = await pending.get()
+                try:
+                    host = urlparse(url).netloc
+                    throttle = throttles.setdefault(
+                        host,
+                        _HostThrottle(self.config.per_host_concurrency, self.config.politeness_delay)
+                    )
+                    follow = self.config.discover_links and depth < self.config.max_depth
+                    page_params = dict(params or {}, url=url, collect_links=follow)
+                    async with throttle:
+                        result = await self._extract(page_params, context or {})
+                    if follow and result.success:
+                        for link in result.metadata.get("links", []):
+                            if self._should_follow(link, origins, include):
+                                enqueue(link, depth + 1)
+                    await results.put(CrawlResult(url=url, depth=depth, result=result))
+                finally:
+                    pending.task_done()
+
+        async def supervise():
+            await pending.join()
+            await results.put(done)
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.config.max_concurrency)]
+        supervisor = asyncio.create_task(supervise())
+        try:
+            while True:
+                item = await results.get()
+                if item is done:
+                    break
+                yield item
+        finally:
+            supervisor.cancel()
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(supervisor, *workers, return_exceptions=True)
+
+    async def read_sitemap(self, sitemap_url: str, depth: int = 0) -> List[str]:
+        """Return the page URLs listed in a sitemap, following sitemap indexes."""
+        response = await get_http_client().get(sitemap_url)
+        response.raise_for_status()
+        root = etree.fromstring(response.content, parser=etree.XMLParser(resolve_entities=False))
+        locations = [
+            (element.text or "").strip()
+            for element in root.iter("{*}loc")
+            if (element.text or "").strip()
+        ]
+        if etree.QName(root).localname != "sitemapindex":
+            return locations
+
+        urls: List[str] = []
+        if depth < 2:
+            for location in locations:
+                urls.extend(await self.read_sitemap(location, depth + 1))
+        return urls
+
+    async def _extract(self, params: Dict[str, Any], context: Dict[str, Any]) -> ToolResult:
+        try:
+            return await self.tool_registry.execute_tool(self.tool_name, params, context)
+        except Exception as e:
+            self.logger.error(f"Error crawling {params['url']}: {str(e)}")
+            return ToolResult(success=False, data={}, error=str(e))
+
+    def _should_follow(self, url: str, origins: Set[str], include: Optional["re.Pattern"]) -> bool:
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https"):
+            return False
+        if self._origin(url) not in origins:
+            return False
+        if parsed.path.lower().endswith(SKIPPED_EXTENSIONS):
+            return False
+        return include is None or bool(include.search(url))
+
+    @staticmethod
+    def _origin(url: str) -> str:
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}".lower()
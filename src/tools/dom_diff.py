@@ -0,0 +1,129 @@
+from typing import Dict, Any, List, Optional
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pydantic import BaseModel
+
+# Hidden fields whose values change on every request without the form changing
+VOLATILE_FIELDS = {
+    "__VIEWSTATE", "__VIEWSTATEGENERATOR", "__EVENTVALIDATION", "__EVENTTARGET",
+    "__EVENTARGUMENT", "__LASTFOCUS", "__PREVIOUSPAGE", "__REQUESTDIGEST"
+}
+
+class PageFingerprint(BaseModel):
+    """Structural fingerprint of one page: a signature hash per control."""
+    url: str
+    digest: str
+    controls: Dict[str, str]
+
+def control_key(element: Dict[str, Any], position: int = 0) -> str:
+    """Return the identity of a control across extractions of the same page.
+
+    Controls are identified by frame, form and name (or id); anonymous
+    controls fall back to their position among the page's controls. Radio
+    buttons and checkboxes sharing a name are told apart by their value
+    (or, without one, their position).
+    """
+    identity = element.get("name") or element.get("id") or f"#{position}"
+    if element.get("type") in ("radio", "checkbox"):
+        value = element.get("value")
+        identity += f"={value}" if value not in (None, "") else f"=#{position}"
+    return "|".join([element.get("frame") or "", element.get("form") or "", element.get("tag") or "", identity])
+
+def control_signature(element: Dict[str, Any]) -> str:
+    """Hash everything about a control that matters to analysis and code generation."""
+    signature = dict(element)
+    if element.get("name") in VOLATILE_FIELDS:
+        signature.pop("value", None)
+        signature.get("attributes", {}).pop("value", None)
+    canonical = json.dumps(signature, sort_keys=True, default=str)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+def fingerprint(url: str, elements: List[Dict[str, Any]]) -> PageFingerprint:
+    """Build the structural fingerprint of a page's extracted elements."""
+    controls = {
+        control_key(element, position): control_signature(element)
+        for position, element in enumerate(elements)
+    }
+    digest = hashlib.sha256(json.dumps(sorted(controls.items())).encode("utf-8")).hexdigest()
+    return PageFingerprint(url=url, digest=digest, controls=controls)
+
+def diff_elements(
+    previous: Optional[PageFingerprint],
+    current: PageFingerprint,
+    elements: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Return the controls added, removed or changed since the previous fingerprint.
+
+    Added and changed controls are returned in full; removed controls only by
+    key, since their elements are no longer on the page.
+    """
+    previous_controls = previous.controls if previous else {}
+    added: List[Dict[str, Any]] = []
+    changed: List[Dict[str, Any]] = []
+    for position, element in enumerate(elements):
+        key = control_key(element, position)
+        if key not in previous_controls:
+            added.append(element)
+        elif previous_controls[key] != current.controls[key]:
+            changed.append(element)
+    removed = [key for key in previous_controls if key not in current.controls]
+    return {
+        "baseline": previous is None,
+        "unchanged": previous is not None and previous.digest == current.digest,
+        "added": added,
+        "removed": removed,
+        "changed": changed
+    }
+
+class FingerprintStore:
+    """Keeps the last fingerprint of each page on disk."""
+
+    def __init__(self, directory: str = "./data/fingerprints"):
+        self.directory = directory
+        self.logger = logging.getLogger("dom_diff")
+        os.makedirs(self.directory, exist_ok=True)
+
+    async def load(self, url: str) -> Optional[PageFingerprint]:
+        """Return the last stored fingerprint of a page, if any."""
+        return await asyncio.to_thread(self._read, url)
+
+    async def save(self, page_fingerprint: PageFingerprint):
+        """Replace the stored fingerprint of a page."""
+        await asyncio.to_thread(self._write, page_fingerprint)
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json")
+
+    def _read(self, url: str) -> Optional[PageFingerprint]:
+        try:
+            with open(self._path(url), "r", encoding="utf-8") as f:
+                return PageFingerprint(**json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable fingerprint of {url}: {str(e)}")
+            return None
+
+    def _write(self, page_fingerprint: PageFingerprint):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(page_fingerprint.dict(), f)
+            os.replace(tmp_path, self._path(page_fingerprint.url))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+_shared_store: Optional[FingerprintStore] = None
+
+def get_fingerprint_store() -> FingerprintStore:
+    """Return the process-wide fingerprint store."""
+    global _shared_store
+    if _shared_store is None:
+        _shared_store = FingerprintStore(os.getenv("FINGERPRINT_DIR", "./data/fingerprints"))
+    return _shared_store
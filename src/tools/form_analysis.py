@@ -10,7 +10,8 @@ class FormAnalysisTool(BaseTool):
         super().__init__(
             ToolConfig(
                 name="form_analysis",
-                description="Analyzes form data and generates insights"
+                description="Analyzes form data and generates insights",
+                cache_enabled=True
             )
         )
 
@@ -0,0 +1,180 @@
+from typing import Dict, Any, List, Optional, Tuple
+from .viewstate import extract_server_side
+
+# Column order of the compact element payload returned by the in-page scripts
+ELEMENT_COLUMNS = [
+    "id", "name", "tag", "type", "value", "required", "disabled", "readonly",
+    "placeholder", "class", "maxlength", "min", "max", "pattern",
+    "label", "fieldset", "form", "options", "attributes", "frame"
+]
+
+# Event handler properties checked on every element inside a form. Checking a
+# fixed table is far cheaper than enumerating every property of every node.
+EVENT_HANDLER_NAMES = [
+    "onclick", "ondblclick", "onchange", "oninput", "onblur", "onfocus",
+    "onfocusin", "onfocusout", "onkeydown", "onkeyup", "onkeypress",
+    "onmousedown", "onmouseup", "onmouseover", "onmouseout", "onsubmit",
+    "onreset", "onselect", "oninvalid", "onpaste", "oncut", "oncopy"
+]
+
+# Key grouping the rules and handlers of controls that belong to no form
+NO_FORM_KEY = "(none)"
+
+# Separates the frame path from the form key for forms in child frames
+FRAME_KEY_SEPARATOR = "::"
+
+# Walks one frame's document, and every open shadow root below it, once and
+# collects in the same traversal the element rows (values ordered like
+# ``columns``), the client-side validation rules, the event handlers and the
+# sources of handlers or links that trigger ASP.NET postbacks. Controls
+# outside any form are included under ``noFormKey``. Select options are
+# encoded as [value, label, selected].
+FORM_WALKER_SCRIPT = """
+([columns, handlerNames, frame, noFormKey]) => {
+    const attr = (name) => (el) => el.getAttribute(name);
+    const flag = (name) => (el) => el.hasAttribute(name);
+    const text = (node) => node ? node.textContent.replace(/\\s+/g, ' ').trim() : null;
+    const extractors = {
+        id: attr('id'),
+        name: attr('name'),
+        tag: (el) => el.tagName.toLowerCase(),
+        type: (el) => el.tagName === 'INPUT' ? (el.getAttribute('type') || 'text').toLowerCase() : el.tagName.toLowerCase(),
+        value: attr('value'),
+        required: flag('required'),
+        disabled: flag('disabled'),
+        readonly: flag('readonly'),
+        placeholder: attr('placeholder'),
+        class: attr('class'),
+        maxlength: attr('maxlength'),
+        min: attr('min'),
+        max: attr('max'),
+        pattern: attr('pattern'),
+        label: (el) => {
+            const labels = el.labels ? Array.from(el.labels).map(text).filter(Boolean) : [];
+            return labels.length ? labels.join(' ') : null;
+        },
+        fieldset: (el) => {
+            const fieldset = el.closest('fieldset');
+            if (!fieldset) return null;
+            return text(fieldset.querySelector(':scope > legend')) || fieldset.id || null;
+        },
+        form: (el) => el.form ? (el.form.id || el.form.getAttribute('name') || 'default') : null,
+        options: (el) => el.tagName === 'SELECT'
+            ? Array.from(el.options).map(o => [o.value, o.label, o.selected])
+            : null,
+        attributes: (el) => {
+            const result = {};
+            for (const a of el.attributes) result[a.name] = a.value;
+            return result;
+        },
+        frame: () => frame
+    };
+    const getters = columns.map(c => extractors[c]);
+    const isControl = (el) => el.tagName === 'INPUT' || el.tagName === 'SELECT' || el.tagName === 'TEXTAREA';
+    const formKey = (form) => form ? (form.id || 'default') : noFormKey;
+
+    const rows = [];
+    const rules = {};
+    const handlers = {};
+    const postbacks = [];
+    const roots = [document];
+    for (let i = 0; i < roots.length; i++) {
+        for (const form of roots[i].querySelectorAll('form')) {
+            rules[formKey(form)] = rules[formKey(form)] || {};
+            handlers[formKey(form)] = handlers[formKey(form)] || {};
+        }
+        for (const el of roots[i].querySelectorAll('*')) {
+            if (el.shadowRoot) roots.push(el.shadowRoot);
+            const control = isControl(el);
+            const form = control ? el.form : el.closest('form');
+            if (!form && !control) continue;
+            const key = formKey(form);
+            if (control) {
+                rows.push(getters.map(get => get(el)));
+                (rules[key] || (rules[key] = {}))[el.name || el.id] = {
+                    required: el.required,
+                    pattern: el.pattern,
+                    min: el.min,
+                    max: el.max,
+                    minLength: el.minLength,
+                    maxLength: el.maxLength
+                };
+            }
+            let elementHandlers = null;
+            for (const name of handlerNames) {
+                if (typeof el[name] === 'function') {
+                    (elementHandlers || (elementHandlers = {}))[name] = true;
+                    const source = el.getAttribute(name);
+                    if (source && source.includes('PostBack')) postbacks.push(source);
+                }
+            }
+            if (elementHandlers) {
+                (handlers[key] || (handlers[key] = {}))[el.id || el.getAttribute('name') || ''] = elementHandlers;
+            }
+            const href = el.tagName === 'A' ? el.getAttribute('href') : null;
+            if (href && href.includes('PostBack')) postbacks.push(href);
+        }
+    }
+    return {elements: rows, validation: rules, handlers: handlers, postbacks: postbacks};
+}
+"""
+
+def decode_element_rows(rows: List[List[Any]]) -> List[Dict[str, Any]]:
+    """Expand the columnar element payload into one dict per element."""
+    elements = []
+    for row in rows:
+        element = dict(zip(ELEMENT_COLUMNS, row))
+        if element["options"] is not None:
+            element["options"] = [
+                {"value": value, "label": label, "selected": selected}
+                for value, label, selected in element["options"]
+            ]
+        elements.append(element)
+    return elements
+
+def build_form_data(
+    rows: List[List[Any]],
+    client_rules: Dict[str, Any],
+    client_handlers: Dict[str, Any],
+    postback_sources: List[str]
+) -> Dict[str, Any]:
+    """Assemble the extraction result shared by the browser and static extractors.
+
+    The ``server_side`` sections are decoded from the page's ViewState,
+    EventValidation and postback targets.
+    """
+    elements = decode_element_rows(rows)
+    server_rules, server_handlers = extract_server_side(elements, postback_sources)
+    return {
+        "elements": elements,
+        "validation_rules": {"client_side": client_rules, "server_side": server_rules},
+        "event_handlers": {"client_side": client_handlers, "server_side": server_handlers}
+    }
+
+def merge_frame_form_data(frames: List[Tuple[Optional[str], Dict[str, Any]]]) -> Dict[str, Any]:
+    """Merge the walker payloads of several frames into one extraction result.
+
+    ``frames`` pairs each frame path (None for the main frame) with its
+    payload. Form keys of child frames, including the ``form`` column of
+    their elements, are prefixed with the frame path so forms that share an
+    id in different frames stay apart.
+    """
+    merged: Dict[str, Any] = {
+        "elements": [],
+        "validation_rules": {"client_side": {}, "server_side": {}},
+        "event_handlers": {"client_side": {}, "server_side": {}}
+    }
+    for frame, payload in frames:
+        form_data = build_form_data(
+            payload["elements"], payload["validation"], payload["handlers"], payload["postbacks"]
+        )
+        prefix = f"{frame}{FRAME_KEY_SEPARATOR}" if frame is not None else ""
+        for element in form_data["elements"]:
+            if prefix and element["form"] is not None:
+                element["form"] = prefix + element["form"]
+        merged["elements"].extend(form_data["elements"])
+        for section in ("validation_rules", "event_handlers"):
+            for side in ("client_side", "server_side"):
+                for form_key, value in form_data[section][side].items():
+                    merged[section][side].setdefault(prefix + form_key, {}).update(value)
+    return merged
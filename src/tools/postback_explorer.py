@@ -0,0 +1,238 @@
+from typing import Dict, Any, List, Optional, Set, TYPE_CHECKING
+import asyncio
+import json
+import logging
+import re
+import time
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
+from pydantic import BaseModel
+from .auth_session import LoginSpec
+from .dom_diff import control_key, fingerprint
+
+if TYPE_CHECKING:
+    from .web_navigation import WebNavigationTool
+
+class ExplorationConfig(BaseModel):
+    """Budget and safety limits for postback exploration."""
+    max_states: int = 25
+    max_depth: int = 3
+    time_limit: float = 120.0
+    max_parallel: int = 4
+    max_options: int = 5
+    settle_timeout: float = 3.0
+    # Postback targets that look like they change data are never driven. The
+    # action word must stand alone in the control id (after a naming container
+    # separator, a btn/lnk/cmd prefix or a camelCase break), so ids such as
+    # btnSave or ctl00$Main$lnkDelete are skipped but UpdatePanel1 is not.
+    skip_targets: str = (
+        r"(?:^|(?<=[^A-Za-z])|(?<=[a-z])(?=[A-Z])|(?<=btn|lnk|cmd))"
+        r"(?i:save|delete|remove|submit|insert|update(?!panel|progress)|cancel|logout|logoff|signout)"
+        r"(?=$|[^a-z]|btn|button)"
+    )
+
+class ExploredState(BaseModel):
+    """A distinct page state reached by replaying a path of actions."""
+    fingerprint: str
+    path: List[Dict[str, Any]]
+    form_data: Dict[str, Any]
+
+class PostbackExplorer:
+    """Discovers fields that only appear after AutoPostBack or UpdatePanel round trips.
+
+    Starting from the initially extracted page, every AutoPostBack control
+    (dropdowns, check boxes, radio buttons) and every other ``__doPostBack``
+    target is driven, level by level, up to ``max_depth`` actions deep. Each
+    branch replays its action path in its own browser context, branches run
+    in parallel, and states are deduplicated by their structural fingerprint.
+    """
+
+    def __init__(self, tool: "WebNavigationTool", config: Optional[ExplorationConfig] = None):
+        self.tool = tool
+        self.config = config or ExplorationConfig()
+        self.logger = logging.getLogger("postback_explorer")
+        self._skip_targets = re.compile(self.config.skip_targets)
+
+    async def explore(self, url: str, params: Dict[str, Any], initial: Dict[str, Any]) -> Dict[str, Any]:
+        """Explore the page's postback states.
+
+        Returns the explored states and the union of fields, each with the
+        action paths (``conditions``) that reveal it; fields present on the
+        initial load have no conditions.
+        """
+        deadline = time.monotonic() + self.config.time_limit
+        root = ExploredState(fingerprint=fingerprint(url, initial["elements"]).digest, path=[], form_data=initial)
+        states = [root]
+        seen = {root.fingerprint}
+        fields = {
+            control_key(element, position): {**element, "conditions": []}
+            for position, element in enumerate(initial["elements"])
+        }
+        context_options = await self._context_options(url, params)
+        semaphore = asyncio.Semaphore(self.config.max_parallel)
+        truncated = None
+        frontier = [root]
+
+        for _ in range(self.config.max_depth):
+            branches = [
+                (state, state.path + [action])
+                for state in frontier
+                for action in self.candidate_actions(state.form_data)
+            ]
+            if not branches:
+                break
+            tasks = {
+                asyncio.create_task(self._visit(url, params, path, context_options, semaphore)): (parent, path)
+                for parent, path in branches
+            }
+            next_frontier: List[ExploredState] = []
+            pending: Set[asyncio.Task] = set(tasks)
+            try:
+                while pending and truncated is None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        truncated = "time_limit"
+                        break
+                    done, pending = await asyncio.wait(
+                        pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        parent, path = tasks[task]
+                        if task.exception() is not None:
+                            self.logger.warning(f"Postback branch {json.dumps(path)} failed: {str(task.exception())}")
+                            continue
+                        state = task.result()
+                        if state.fingerprint in seen:
+                            continue
+                        if len(states) >= self.config.max_states:
+                            truncated = "max_states"
+                            break
+                        seen.add(state.fingerprint)
+                        states.append(state)
+                        next_frontier.append(state)
+                        self._record_fields(fields, parent, state)
+            finally:
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+            if truncated:
+                break
+            frontier = next_frontier
+
+        return {
+            "states": [
+                {"fingerprint": state.fingerprint, "path": state.path, "elements": len(state.form_data["elements"])}
+                for state in states
+            ],
+            "fields": list(fields.values()),
+            "truncated": truncated
+        }
+
+    def candidate_actions(self, form_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Return the postback-triggering actions available in a page state."""
+        targets: Dict[str, List[str]] = {}
+        for form_targets in form_data["event_handlers"]["server_side"].values():
+            for target, events in form_targets.items():
+                targets.setdefault(target, []).extend(events.get("postback", {}).get("arguments", []))
+
+        actions: List[Dict[str, Any]] = []
+        driven: Set[str] = set()
+        for element in form_data["elements"]:
+            name = element.get("name")
+            if not name or name not in targets or element.get("disabled"):
+                continue
+            if element["tag"] == "select":
+                options = [option for option in element.get("options") or [] if not option["selected"]]
+                for option in options[:self.config.max_options]:
+                    actions.append({"action": "select", "control": name, "value": option["value"]})
+            elif element["type"] in ("checkbox", "radio"):
+                actions.append({"action": "check", "control": name, "value": element.get("value")})
+            else:
+                continue
+            driven.add(name)
+
+        for target, arguments in targets.items():
+            if target in driven or self._skip_targets.search(target):
+                continue
+            for argument in list(dict.fromkeys(arguments))[:self.config.max_options]:
+                actions.append({"action": "postback", "target": target, "argument": argument})
+        return actions
+
+    async def _visit(
+        self,
+        url: str,
+        params: Dict[str, Any],
+        path: List[Dict[str, Any]],
+        context_options: Dict[str, Any],
+        semaphore: asyncio.Semaphore
+    ) -> ExploredState:
+        """Replay an action path in a fresh browser context and extract the resulting state."""
+        async with semaphore:
+            async with self.tool.browser_pool.context(**context_options) as browser_context:
+                await self.tool._configure_resource_blocking(browser_context, url, params)
+                page = await browser_context.new_page()
+                await self.tool._navigate_to_url(
+                    url,
+                    page,
+                    wait_until=params.get("wait_until", "networkidle"),
+                    wait_for=params.get("wait_for")
+                )
+                for action in path:
+                    await self._apply(page, action)
+                form_data = await self.tool._extract_form_data(page)
+        return ExploredState(
+            fingerprint=fingerprint(url, form_data["elements"]).digest,
+            path=path,
+            form_data=form_data
+        )
+
+    async def _apply(self, page: Page, action: Dict[str, Any]):
+        """Perform one action and wait for the full or partial postback to settle."""
+        if action["action"] == "postback":
+            # Deferred so the evaluation returns before the page navigates away
+            trigger = page.evaluate(
+                "([target, argument]) => { setTimeout(() => __doPostBack(target, argument), 0); }",
+                [action["target"], action["argument"]]
+            )
+        else:
+            selector = f"[name={json.dumps(action['control'])}]"
+            if action["action"] == "select":
+                trigger = page.select_option(selector, action["value"])
+            else:
+                if action.get("value") is not None:
+                    selector += f"[value={json.dumps(action['value'])}]"
+                trigger = page.click(selector)
+
+        # Full postbacks navigate; UpdatePanel (partial) postbacks only fetch
+        try:
+            async with page.expect_navigation(
+                wait_until="domcontentloaded",
+                timeout=self.config.settle_timeout * 1000
+            ):
+                await trigger
+        except PlaywrightTimeoutError:
+            pass
+        try:
+            await page.wait_for_load_state("networkidle", timeout=self.config.settle_timeout * 1000)
+        except PlaywrightTimeoutError:
+            pass
+
+    async def _context_options(self, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        login = LoginSpec.from_params(params)
+        if login is None:
+            return {}
+        return {"storage_state": await self.tool.auth_store.session(self.tool.browser_pool, url, login)}
+
+    @staticmethod
+    def _record_fields(fields: Dict[str, Dict[str, Any]], parent: ExploredState, state: ExploredState):
+        """Attribute the fields a state has, and its parent lacks, to the state's action path."""
+        parent_keys = {
+            control_key(element, position) for position, element in enumerate(parent.form_data["elements"])
+        }
+        for position, element in enumerate(state.form_data["elements"]):
+            key = control_key(element, position)
+            if key not in parent_keys:
+                fields.setdefault(key, {**element, "conditions": []})["conditions"].append(state.path)
+
+def exploration_config(value: Any) -> ExplorationConfig:
+    """Build the exploration config from the ``explore`` parameter (true or a dict of limits)."""
+    return ExplorationConfig(**value) if isinstance(value, dict) else ExplorationConfig()
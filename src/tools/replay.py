@@ -0,0 +1,162 @@
+from typing import Dict, Any, List, Optional, Tuple
+import base64
+from collections import OrderedDict
+import json
+import logging
+import mimetypes
+import os
+from urllib.parse import unquote, urldefrag, urlparse
+import httpx
+from playwright.async_api import BrowserContext, Route
+from pydantic import BaseModel
+
+class ReplayResponse(BaseModel):
+    """A recorded response served during offline replay."""
+    status: int = 200
+    headers: Dict[str, str] = {}
+    body: bytes = b""
+
+class ReplayStore:
+    """Serves pages from a HAR file or a directory of saved HTML with no network.
+
+    Saved pages are looked up by ``<host>/<path>`` and then ``<path>`` below
+    ``snapshot_dir``; directory URLs map to ``index.html`` and extensionless
+    paths may also be stored with an ``.html`` suffix.
+    """
+
+    def __init__(self, har_path: Optional[str] = None, snapshot_dir: Optional[str] = None):
+        if not har_path and not snapshot_dir:
+            raise ValueError("ReplayStore requires har_path or snapshot_dir")
+        self.har_path = har_path
+        self.snapshot_dir = os.path.abspath(snapshot_dir) if snapshot_dir else None
+        self.logger = logging.getLogger("replay")
+        self._har_entries = self._load_har(har_path) if har_path else {}
+        self._http_client: Optional[httpx.AsyncClient] = None
+
+    def resolve(self, url: str) -> Optional[ReplayResponse]:
+        """Return the recorded response for a URL, or None when it was not captured."""
+        url = urldefrag(url)[0]
+        if url in self._har_entries:
+            return self._har_entries[url]
+        if self.snapshot_dir:
+            path = self._find_saved_file(url)
+            if path:
+                content_type = mimetypes.guess_type(path)[0] or "text/html"
+                with open(path, "rb") as f:
+                    return ReplayResponse(headers={"content-type": content_type}, body=f.read())
+        return None
+
+    async def install(self, browser_context: BrowserContext):
+        """Route every request of the browser context to the recorded corpus."""
+        if self.har_path and not self.snapshot_dir:
+            # Playwright's native HAR router matches methods and bodies too
+            await browser_context.route_from_har(self.har_path, not_found="abort")
+            return
+
+        async def handle_route(route: Route):
+            response = self.resolve(route.request.url)
+            if response is None:
+                await route.abort("internetdisconnected")
+                return
+            await route.fulfill(status=response.status, headers=response.headers, body=response.body)
+
+        await browser_context.route("**/*", handle_route)
+
+    def http_client(self) -> httpx.AsyncClient:
+        """Return an HTTP client whose requests are answered from the corpus."""
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(transport=httpx.MockTransport(self._handle_http))
+        return self._http_client
+
+    async def close(self):
+        """Close the corpus-backed HTTP client, if one was created."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    def _handle_http(self, request: httpx.Request) -> httpx.Response:
+        response = self.resolve(str(request.url))
+        if response is None:
+            return httpx.Response(404, request=request)
+        return httpx.Response(response.status, headers=response.headers, content=response.body)
+
+    def _find_saved_file(self, url: str) -> Optional[str]:
+        parsed = urlparse(url)
+        path = unquote(parsed.path).lstrip("/")
+        candidates: List[str] = []
+        for relative in (os.path.join(parsed.netloc, path), path):
+            if not relative or relative.endswith("/"):
+                candidates.append(os.path.join(relative, "index.html"))
+            else:
+                candidates.extend([relative, relative + ".html"])
+
+        for relative in candidates:
+            full_path = os.path.normpath(os.path.join(self.snapshot_dir, relative))
+            if not full_path.startswith(self.snapshot_dir + os.sep):
+                continue
+            if os.path.isfile(full_path):
+                return full_path
+        return None
+
+    def _load_har(self, har_path: str) -> Dict[str, ReplayResponse]:
+        """Index the GET responses recorded in a HAR file by URL."""
+        with open(har_path, "r", encoding="utf-8") as f:
+            har = json.load(f)
+        entries: Dict[str, ReplayResponse] = {}
+        for entry in har.get("log", {}).get("entries", []):
+            request = entry.get("request", {})
+            if request.get("method", "GET") != "GET":
+                continue
+            response = entry.get("response", {})
+            content = response.get("content", {})
+            text = content.get("text", "")
+            body = base64.b64decode(text) if content.get("encoding") == "base64" else text.encode("utf-8")
+            headers = {
+                header["name"].lower(): header["value"]
+                for header in response.get("headers", [])
+                if header["name"].lower() not in ("content-encoding", "content-length", "transfer-encoding")
+            }
+            entries.setdefault(urldefrag(request.get("url", ""))[0], ReplayResponse(
+                status=response.get("status", 200),
+                headers=headers,
+                body=body
+            ))
+        self.logger.info(f"Loaded {len(entries)} recorded responses from {har_path}")
+        return entries
+
+# Most replay corpora kept loaded at once; the least recently used is dropped
+MAX_REPLAY_STORES = 8
+
+_stores: "OrderedDict[Tuple[Optional[str], Optional[str]], ReplayStore]" = OrderedDict()
+
+def resolve_replay_path(path: str) -> str:
+    """Resolve a ``har_path``/``snapshot_dir`` param below the REPLAY_ROOT directory.
+
+    Paths come from API requests, so anything outside the root (absolute
+    paths, ``..`` segments, symlinks) is rejected rather than read.
+    """
+    root = os.path.realpath(os.getenv("REPLAY_ROOT", "./data/replay"))
+    full_path = os.path.realpath(os.path.join(root, path))
+    if not full_path.startswith(root + os.sep):
+        raise ValueError(f"Replay path {path} is outside the replay root")
+    return full_path
+
+async def get_replay_store(params: Dict[str, Any]) -> Optional[ReplayStore]:
+    """Return the (shared) replay store selected by ``har_path``/``snapshot_dir`` params.
+
+    A store evicted from the bounded cache has its HTTP client closed.
+    """
+    key = tuple(
+        resolve_replay_path(params[name]) if params.get(name) else None
+        for name in ("har_path", "snapshot_dir")
+    )
+    if not any(key):
+        return None
+    if key in _stores:
+        _stores.move_to_end(key)
+    else:
+        _stores[key] = ReplayStore(*key)
+        while len(_stores) > MAX_REPLAY_STORES:
+            _, evicted = _stores.popitem(last=False)
+            await evicted.close()
+    return _stores[key]
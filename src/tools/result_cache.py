@@ -0,0 +1,248 @@
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Tuple
+from collections import OrderedDict
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+
+class ResultCache:
+    """Two-tier (memory LRU + disk) cache of tool results with single-flight.
+
+    Entries are keyed by a canonical hash of the tool name, its parameters
+    and the context values the tool depends on. Concurrent identical calls
+    share one computation instead of each running the tool.
+
+    Payloads are kept serialized in both tiers and every caller gets its own
+    decoded copy, so mutating a result never leaks into other callers. Disk
+    entries are swept every ``sweep_interval`` seconds (or sooner after heavy
+    writes): expired ones are removed, then the least recently used ones
+    until the tier fits in ``max_disk_bytes``. With no ``directory`` the
+    cache is memory-only.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = "./data/result_cache",
+        max_entries: int = 256,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+        sweep_interval: float = 300.0
+    ):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.sweep_interval = sweep_interval
+        self.logger = logging.getLogger("result_cache")
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._next_sweep = time.monotonic() + sweep_interval
+        self._written_bytes = 0
+        self._sweep_task: Optional[asyncio.Task] = None
+        self.metrics = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0, "disk_evictions": 0}
+
+    def key_for(
+        self,
+        tool_name: str,
+        params: Dict[str, Any],
+        context: Dict[str, Any],
+        context_keys: List[str]
+    ) -> str:
+        """Return the cache key of a tool call."""
+        relevant_context = {key: context.get(key) for key in context_keys}
+        canonical = json.dumps([tool_name, params, relevant_context], sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        ttl: float,
+        cacheable: Callable[[Dict[str, Any]], bool] = lambda payload: True
+    ) -> Tuple[Dict[str, Any], str]:
+        """Return a cached payload or compute it once for all concurrent callers.
+
+        Returns the payload and where it came from: "memory", "disk",
+        "coalesced" (shared with an identical in-flight call) or "miss".
+        When the caller computing the payload is cancelled, the callers
+        waiting on it start over instead of being cancelled too.
+        """
+        while True:
+            serialized = self._get_memory(key)
+            if serialized is not None:
+                self.metrics["memory_hits"] += 1
+                return json.loads(serialized), "memory"
+            if key not in self._in_flight:
+                break
+            # None means the computing caller was cancelled
+            serialized = await asyncio.shield(self._in_flight[key])
+            if serialized is not None:
+                self.metrics["coalesced"] += 1
+                return json.loads(serialized), "coalesced"
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            serialized = await asyncio.to_thread(self._read, key) if self.directory else None
+            if serialized is None:
+                self.metrics["misses"] += 1
+                payload = await compute()
+                source = "miss"
+                serialized = json.dumps(payload, default=str)
+                if self.directory and cacheable(payload):
+                    await asyncio.to_thread(self._write, key, serialized, ttl)
+                    self._schedule_sweep(len(serialized))
+            else:
+                self.metrics["disk_hits"] += 1
+                payload = json.loads(serialized)
+                source = "disk"
+            if cacheable(payload):
+                self._put_memory(key, serialized, ttl)
+            future.set_result(serialized)
+            return payload, source
+        except BaseException as e:
+            # Identical callers waiting on this computation see the same failure,
+            # unless it was cancelled, in which case they retry
+            if isinstance(e, asyncio.CancelledError):
+                future.set_result(None)
+            else:
+                future.set_exception(e)
+                future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    def clear(self):
+        """Drop every in-memory entry (disk entries expire by TTL)."""
+        self._memory.clear()
+
+    def sweep(self) -> int:
+        """Remove expired disk entries, then the least recently used ones over the size cap.
+
+        Returns the number of entries removed. Runs on a worker thread.
+        """
+        if not self.directory:
+            return 0
+        now = time.time()
+        removed = 0
+        live: List[Tuple[float, int, str]] = []
+        for directory, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                    if name.endswith(".tmp"):
+                        # Left behind by a writer that died mid-write
+                        expired = stat.st_mtime < now - 3600
+                    else:
+                        with open(path, "r", encoding="utf-8") as f:
+                            expired = float(f.readline()) < now
+                except FileNotFoundError:
+                    continue
+                except (OSError, ValueError):
+                    expired = True
+                    stat = None
+                if expired:
+                    removed += self._remove(path)
+                elif stat is not None:
+                    live.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in live)
+        # Reads touch an entry's mtime, so the oldest mtime is the least recently used
+        for _, size, path in sorted(live):
+            if total <= self.max_disk_bytes:
+                break
+            removed += self._remove(path)
+            total -= size
+        self.metrics["disk_evictions"] += removed
+        return removed
+
+    def _schedule_sweep(self, written: int):
+        """Start a background sweep when it is due or many bytes were written since the last one."""
+        self._written_bytes += written
+        due = time.monotonic() >= self._next_sweep or self._written_bytes > self.max_disk_bytes // 10
+        if not due or (self._sweep_task is not None and not self._sweep_task.done()):
+            return
+        self._next_sweep = time.monotonic() + self.sweep_interval
+        self._written_bytes = 0
+        self._sweep_task = asyncio.get_running_loop().create_task(asyncio.to_thread(self.sweep))
+
+    def _remove(self, path: str) -> int:
+        try:
+            os.remove(path)
+            return 1
+        except FileNotFoundError:
+            return 0
+
+    def _get_memory(self, key: str) -> Optional[str]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires_at, serialized = entry
+        if expires_at < time.time():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return serialized
+
+    def _put_memory(self, key: str, serialized: str, ttl: float):
+        self._memory[key] = (time.time() + ttl, serialized)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _read(self, key: str) -> Optional[str]:
+        """Return an entry's serialized payload; its first line holds its expiry time."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                expires_at = float(f.readline())
+                serialized = f.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Discarding unreadable cache entry {key}: {str(e)}")
+            expires_at = 0
+        if expires_at < time.time():
+            self._remove(path)
+            return None
+        try:
+            # Marks the entry as recently used for the size-capped sweep
+            os.utime(path)
+        except OSError:
+            pass
+        return serialized
+
+    def _write(self, key: str, serialized: str, ttl: float):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(f"{time.time() + ttl!r}\n")
+                f.write(serialized)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+_shared_cache: Optional[ResultCache] = None
+
+def get_result_cache() -> ResultCache:
+    """Return the process-wide tool result cache."""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = ResultCache(
+            directory=os.getenv("RESULT_CACHE_DIR", "./data/result_cache"),
+            max_entries=int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "256")),
+            max_disk_bytes=int(os.getenv("RESULT_CACHE_MAX_DISK_MB", "512")) * 1024 * 1024,
+            sweep_interval=float(os.getenv("RESULT_CACHE_SWEEP_INTERVAL", "300"))
+        )
+    return _shared_cache
@@ -0,0 +1,207 @@
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pydantic import BaseModel
+from .static_extraction import get_http_client
+
+# Request options that do not change what is extracted from a page
+IGNORED_PARAMS = {"url", "use_cache", "password", "incremental"}
+
+class SnapshotCacheConfig(BaseModel):
+    """Configuration for the on-disk page snapshot cache."""
+    directory: str = "./data/snapshots"
+    ttl: float = 86400.0
+    max_bytes: int = 512 * 1024 * 1024
+    store_dom: bool = False
+
+    @classmethod
+    def from_env(cls) -> "SnapshotCacheConfig":
+        """Build a configuration from SNAPSHOT_CACHE_* environment variables."""
+        return cls(
+            directory=os.getenv("SNAPSHOT_CACHE_DIR", "./data/snapshots"),
+            ttl=float(os.getenv("SNAPSHOT_CACHE_TTL", "86400")),
+            max_bytes=int(os.getenv("SNAPSHOT_CACHE_MAX_MB", "512")) * 1024 * 1024,
+            store_dom=os.getenv("SNAPSHOT_CACHE_STORE_DOM", "false").lower() == "true"
+        )
+
+class Snapshot(BaseModel):
+    """A cached extraction result for one page."""
+    key: str
+    url: str
+    stored_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    data: Dict[str, Any]
+    metadata: Dict[str, Any] = {}
+
+class SnapshotCache:
+    """Content-addressed cache of page extraction results.
+
+    Entries are keyed by URL plus a hash of the extraction options. Fresh
+    entries (younger than ``ttl``) are served directly; stale entries that
+    carry an ETag or Last-Modified header are revalidated with a conditional
+    request. The least recently used entries are evicted once the cache grows
+    beyond ``max_bytes``.
+    """
+
+    def __init__(self, config: Optional[SnapshotCacheConfig] = None):
+        self.config = config or SnapshotCacheConfig()
+        self.logger = logging.getLogger("snapshot_cache")
+        os.makedirs(self.config.directory, exist_ok=True)
+        self._evict_lock = asyncio.Lock()
+
+    def key_for(self, url: str, params: Dict[str, Any]) -> str:
+        """Return the cache key for a URL and its extraction options."""
+        options = {k: v for k, v in params.items() if k not in IGNORED_PARAMS}
+        canonical = json.dumps([url, options], sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    async def lookup(self, key: str) -> Tuple[Optional[Snapshot], Optional[str]]:
+        """Return a usable snapshot and how it was validated ("hit" or "revalidated")."""
+        snapshot = await asyncio.to_thread(self._read, key)
+        if snapshot is None:
+            return None, None
+        if time.time() - snapshot.stored_at < self.config.ttl:
+            return snapshot, "hit"
+        if (snapshot.etag or snapshot.last_modified) and await self._revalidate(snapshot):
+            snapshot.stored_at = time.time()
+            await asyncio.to_thread(self._write_entry, snapshot)
+            return snapshot, "revalidated"
+        await asyncio.to_thread(self._remove, key)
+        return None, None
+
+    async def store(
+        self,
+        key: str,
+        url: str,
+        data: Dict[str, Any],
+        metadata: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None,
+        dom: Optional[str] = None
+    ):
+        """Store an extraction result, then evict entries over the size limit."""
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        snapshot = Snapshot(
+            key=key,
+            url=url,
+            stored_at=time.time(),
+            etag=headers.get("etag"),
+            last_modified=headers.get("last-modified"),
+            data=data,
+            metadata=metadata
+        )
+        await asyncio.to_thread(self._write_entry, snapshot)
+        if dom is not None and self.config.store_dom:
+            await asyncio.to_thread(self._write_dom, key, dom)
+        async with self._evict_lock:
+            await asyncio.to_thread(self._evict)
+
+    async def load_dom(self, key: str) -> Optional[str]:
+        """Return the raw DOM stored with a snapshot, if any."""
+        return await asyncio.to_thread(self._read_dom, key)
+
+    async def _revalidate(self, snapshot: Snapshot) -> bool:
+        """Ask the origin whether the page changed since it was cached."""
+        headers = {}
+        if snapshot.etag:
+            headers["If-None-Match"] = snapshot.etag
+        if snapshot.last_modified:
+            headers["If-Modified-Since"] = snapshot.last_modified
+        try:
+            response = await get_http_client().get(snapshot.url, headers=headers)
+        except Exception as e:
+            self.logger.warning(f"Revalidation of {snapshot.url} failed: {str(e)}")
+            return False
+        return response.status_code == 304
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.config.directory, f"{key}.json")
+
+    def _dom_path(self, key: str) -> str:
+        return os.path.join(self.config.directory, f"{key}.html.gz")
+
+    def _read(self, key: str) -> Optional[Snapshot]:
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                snapshot = Snapshot(**json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Discarding unreadable snapshot {key}: {str(e)}")
+            self._remove(key)
+            return None
+        # The modification time records the last access for LRU eviction
+        os.utime(path)
+        return snapshot
+
+    def _write_entry(self, snapshot: Snapshot):
+        payload = json.dumps(snapshot.dict(), default=str).encode("utf-8")
+        self._atomic_write(self._entry_path(snapshot.key), payload)
+
+    def _write_dom(self, key: str, dom: str):
+        self._atomic_write(self._dom_path(key), gzip.compress(dom.encode("utf-8")))
+
+    def _read_dom(self, key: str) -> Optional[str]:
+        try:
+            with gzip.open(self._dom_path(key), "rt", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _atomic_write(self, path: str, payload: bytes):
+        fd, tmp_path = tempfile.mkstemp(dir=self.config.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _remove(self, key: str):
+        for path in (self._entry_path(key), self._dom_path(key)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries: Dict[str, List[float]] = {}
+        for name in os.listdir(self.config.directory):
+            if name.endswith(".tmp"):
+                continue
+            key = name.split(".", 1)[0]
+            try:
+                stat = os.stat(os.path.join(self.config.directory, name))
+            except FileNotFoundError:
+                continue
+            size_and_access = entries.setdefault(key, [0, 0.0])
+            size_and_access[0] += stat.st_size
+            if name.endswith(".json"):
+                size_and_access[1] = stat.st_mtime
+
+        total = sum(size for size, _ in entries.values())
+        for key, (size, _) in sorted(entries.items(), key=lambda item: item[1][1]):
+            if total <= self.config.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+            self.logger.debug(f"Evicted snapshot {key}")
+
+_shared_cache: Optional[SnapshotCache] = None
+
+def get_snapshot_cache() -> Optional[SnapshotCache]:
+    """Return the process-wide snapshot cache, or None when it is disabled."""
+    global _shared_cache
+    if _shared_cache is None and os.getenv("SNAPSHOT_CACHE_ENABLED", "false").lower() == "true":
+        _shared_cache = SnapshotCache(SnapshotCacheConfig.from_env())
+    return _shared_cache
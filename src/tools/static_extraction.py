@@ -0,0 +1,272 @@
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import os
+import time
+from urllib.parse import urljoin
+import httpx
+import lxml.html
+from pydantic import BaseModel
+from .form_extraction import ELEMENT_COLUMNS, EVENT_HANDLER_NAMES, NO_FORM_KEY, build_form_data
+
+CONTROL_TAGS = {"input", "select", "textarea"}
+
+# Ids commonly used as the mount point of client-side rendered applications
+SPA_MOUNT_IDS = {"root", "app", "__next", "__nuxt"}
+
+class StaticPage(BaseModel):
+    """Result of fetching and parsing a page without a browser."""
+    url: str
+    status_code: int
+    headers: Dict[str, str]
+    form_data: Dict[str, Any]
+    extraction_ms: float
+    javascript_reason: Optional[str] = None
+    links: List[str] = []
+    html: Optional[str] = None
+
+    @property
+    def needs_javascript(self) -> bool:
+        return self.javascript_reason is not None
+
+_shared_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the process-wide pooled HTTP client, creating it on first use."""
+    global _shared_client
+    if _shared_client is None or _shared_client.is_closed:
+        _shared_client = httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=float(os.getenv("HTTP_TIMEOUT", "30")),
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+                max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+            ),
+            headers={"User-Agent": os.getenv("HTTP_USER_AGENT", "ART-CodeGen/1.0")}
+        )
+    return _shared_client
+
+async def close_http_client():
+    """Close the process-wide HTTP client."""
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.aclose()
+        _shared_client = None
+
+class StaticFormExtractor:
+    """Browser-free form extractor for server-rendered pages.
+
+    Produces the same ``elements`` / ``validation_rules`` / ``event_handlers``
+    shape as ``WebNavigationTool`` and reports when a page appears to need
+    JavaScript so the caller can fall back to a real browser.
+    """
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        self._client = client
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._client or get_http_client()
+
+    async def extract(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        keep_html: bool = False
+    ) -> StaticPage:
+        """Fetch a page and extract its form data."""
+        response = await self.client.get(url, headers=headers)
+        response.raise_for_status()
+        extraction_started = time.perf_counter()
+        form_data, reason, links = await asyncio.to_thread(
+            _extract_page, response.content, response.encoding, str(response.url)
+        )
+        return StaticPage(
+            url=str(response.url),
+            status_code=response.status_code,
+            headers=dict(response.headers),
+            form_data=form_data,
+            extraction_ms=(time.perf_counter() - extraction_started) * 1000,
+            javascript_reason=reason,
+            links=links,
+            html=response.text if keep_html else None
+        )
+
+def extract_from_html(html: bytes, encoding: Optional[str] = None) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Extract form data from raw HTML.
+
+    Returns the form data and, when the page looks like it needs JavaScript to
+    render its controls, a short reason string.
+    """
+    return _extract_document(_parse_document(html, encoding))
+
+def _extract_page(html: bytes, encoding: Optional[str], base_url: str) -> Tuple[Dict[str, Any], Optional[str], List[str]]:
+    document = _parse_document(html, encoding)
+    form_data, reason = _extract_document(document)
+    return form_data, reason, document_links(document, base_url)
+
+def _parse_document(html: bytes, encoding: Optional[str]):
+    parser = lxml.html.HTMLParser(encoding=encoding)
+    return lxml.html.document_fromstring(html, parser=parser)
+
+def document_links(document, base_url: str) -> List[str]:
+    """Return the absolute targets of every anchor in the document."""
+    links = []
+    for anchor in document.iter("a"):
+        href = (anchor.get("href") or "").strip()
+        if href and not href.lower().startswith(("javascript:", "mailto:", "#")):
+            links.append(urljoin(base_url, href))
+    return links
+
+def _extract_document(document) -> Tuple[Dict[str, Any], Optional[str]]:
+    labels = _index_labels(document)
+
+    rows: List[List[Any]] = []
+    rules: Dict[str, Dict[str, Any]] = {}
+    handlers: Dict[str, Dict[str, Any]] = {}
+    postbacks: List[str] = []
+
+    def visit(element, tag: str, form_key: str):
+        if tag in CONTROL_TAGS:
+            row = _element_row(document, element, tag, labels)
+            rows.append([row[column] for column in ELEMENT_COLUMNS])
+            rules.setdefault(form_key, {})[element.get("name") or element.get("id") or ""] = _validation_rules(element)
+        element_handlers = {}
+        for name in EVENT_HANDLER_NAMES:
+            source = element.get(name)
+            if source is not None:
+                element_handlers[name] = True
+                if "PostBack" in source:
+                    postbacks.append(source)
+        if element_handlers:
+            handlers.setdefault(form_key, {})[element.get("id") or element.get("name") or ""] = element_handlers
+        href = element.get("href") if tag == "a" else None
+        if href and "PostBack" in href:
+            postbacks.append(href)
+
+    for form in document.iter("form"):
+        form_key = form.get("id") or "default"
+        rules.setdefault(form_key, {})
+        handlers.setdefault(form_key, {})
+        for element in form.iter():
+            if not isinstance(element.tag, str) or element is form:
+                continue
+            visit(element, element.tag.lower(), form_key)
+
+    # Controls outside every form, grouped under the form they name if any
+    for element in document.iter(*CONTROL_TAGS):
+        if next(element.iterancestors("form"), None) is None:
+            visit(element, element.tag.lower(), _owning_form(document, element) or NO_FORM_KEY)
+
+    form_data = build_form_data(rows, rules, handlers, postbacks)
+    return form_data, _javascript_reason(document, rows)
+
+def _index_labels(document) -> Dict[str, List[str]]:
+    labels: Dict[str, List[str]] = {}
+    for label in document.iter("label"):
+        target = label.get("for")
+        if target:
+            labels.setdefault(target, []).append(_text(label))
+    return labels
+
+def _element_row(document, element, tag: str, labels: Dict[str, List[str]]) -> Dict[str, Any]:
+    attributes = dict(element.attrib)
+    element_id = element.get("id")
+
+    label_texts = list(labels.get(element_id, [])) if element_id else []
+    for ancestor in element.iterancestors("label"):
+        label_texts.append(_text(ancestor))
+    label_texts = [text for text in label_texts if text]
+
+    fieldset_name = None
+    for fieldset in element.iterancestors("fieldset"):
+        legend = next((child for child in fieldset if child.tag == "legend"), None)
+        fieldset_name = (_text(legend) if legend is not None else None) or fieldset.get("id")
+        break
+
+    return {
+        "id": element_id,
+        "name": element.get("name"),
+        "tag": tag,
+        "type": (element.get("type") or "text").lower() if tag == "input" else tag,
+        "value": element.get("value"),
+        "required": "required" in attributes,
+        "disabled": "disabled" in attributes,
+        "readonly": "readonly" in attributes,
+        "placeholder": element.get("placeholder"),
+        "class": element.get("class"),
+        "maxlength": element.get("maxlength"),
+        "min": element.get("min"),
+        "max": element.get("max"),
+        "pattern": element.get("pattern"),
+        "label": " ".join(label_texts) if label_texts else None,
+        "fieldset": fieldset_name,
+        "form": _owning_form(document, element),
+        "options": _select_options(element) if tag == "select" else None,
+        "attributes": attributes,
+        "frame": None
+    }
+
+def _owning_form(document, element) -> Optional[str]:
+    form_id = element.get("form")
+    if form_id:
+        for form in document.iter("form"):
+            if form.get("id") == form_id:
+                return form_id
+        return None
+    for form in element.iterancestors("form"):
+        return form.get("id") or form.get("name") or "default"
+    return None
+
+def _select_options(element) -> List[List[Any]]:
+    options = []
+    for option in element.iter("option"):
+        text = _text(option)
+        value = option.get("value")
+        options.append([
+            value if value is not None else text,
+            option.get("label") or text,
+            option.get("selected") is not None
+        ])
+    # Mirror the DOM: a single-choice list box with nothing marked selects its first option
+    single_choice = element.get("multiple") is None and _length(element.get("size")) <= 1
+    if options and single_choice and not any(option[2] for option in options):
+        options[0][2] = True
+    return options
+
+def _validation_rules(element) -> Dict[str, Any]:
+    """Mirror the DOM validity properties read by the in-page walker."""
+    return {
+        "required": element.get("required") is not None,
+        "pattern": element.get("pattern") or "",
+        "min": element.get("min") or "",
+        "max": element.get("max") or "",
+        "minLength": _length(element.get("minlength")),
+        "maxLength": _length(element.get("maxlength"))
+    }
+
+def _length(value: Optional[str]) -> int:
+    try:
+        length = int(value)
+    except (TypeError, ValueError):
+        return -1
+    return length if length >= 0 else -1
+
+def _text(node) -> str:
+    return " ".join(node.text_content().split())
+
+def _javascript_reason(document, rows: List[List[Any]]) -> Optional[str]:
+    """Return why the page appears to need a browser, or None."""
+    if not rows:
+        return "no form controls in server-rendered HTML"
+    for element in document.iter():
+        if not isinstance(element.tag, str):
+            continue
+        if element.get("ng-app") is not None or element.get("data-ng-app") is not None:
+            return "client-side framework template"
+        if element.get("id") in SPA_MOUNT_IDS and len(element) == 0 and not (element.text or "").strip():
+            return f"empty client-side mount point #{element.get('id')}"
+        if element.tag == "script" and element.get("src") is None and "document.write" in (element.text or ""):
+            return "inline script uses document.write"
+        if element.tag in ("iframe", "frame") and element.get("src"):
+            return "page embeds frames"
+    return None
@@ -0,0 +1,407 @@
+from typing import Dict, Any, List, Tuple
+import base64
+import binascii
+import copy
+import hashlib
+import re
+import struct
+import threading
+from collections import OrderedDict
+
+# ObjectStateFormatter token codes (System.Web.UI.ObjectStateFormatter)
+TOKEN_INT16 = 0x01
+TOKEN_INT32 = 0x02
+TOKEN_BYTE = 0x03
+TOKEN_CHAR = 0x04
+TOKEN_STRING = 0x05
+TOKEN_DATETIME = 0x06
+TOKEN_DOUBLE = 0x07
+TOKEN_SINGLE = 0x08
+TOKEN_COLOR = 0x09
+TOKEN_KNOWN_COLOR = 0x0A
+TOKEN_INT_ENUM = 0x0B
+TOKEN_EMPTY_COLOR = 0x0C
+TOKEN_PAIR = 0x0F
+TOKEN_TRIPLET = 0x10
+TOKEN_ARRAY = 0x14
+TOKEN_STRING_ARRAY = 0x15
+TOKEN_ARRAY_LIST = 0x16
+TOKEN_HASHTABLE = 0x17
+TOKEN_HYBRID_DICTIONARY = 0x18
+TOKEN_TYPE = 0x19
+TOKEN_UNIT = 0x1B
+TOKEN_EMPTY_UNIT = 0x1C
+TOKEN_INDEXED_STRING_ADD = 0x1E
+TOKEN_INDEXED_STRING = 0x1F
+TOKEN_STRING_FORMATTED = 0x28
+TOKEN_TYPE_REF_ADD = 0x29
+TOKEN_TYPE_REF_ADD_LOCAL = 0x2A
+TOKEN_TYPE_REF = 0x2B
+TOKEN_BINARY_SERIALIZED = 0x32
+TOKEN_SPARSE_ARRAY = 0x3C
+TOKEN_NULL = 0x64
+TOKEN_EMPTY_STRING = 0x65
+TOKEN_ZERO_INT32 = 0x66
+TOKEN_TRUE = 0x67
+TOKEN_FALSE = 0x68
+
+FORMATTER_MARKER = b"\xff\x01"
+
+# Base64 characters decoded per chunk
+CHUNK_CHARS = 64 * 1024
+
+# Strings longer than this are summarized instead of kept in the decoded tree
+MAX_STRING_LENGTH = 256
+
+# Nesting depth beyond which the tree is not decoded further
+MAX_DEPTH = 256
+
+# Decoded tree nodes kept in a form's server_side section; the rest are elided
+MAX_TREE_NODES = 1000
+
+POSTBACK_PATTERN = re.compile(
+    r"""__doPostBack\(\s*(?:\\?['"])([^'"\\]*)(?:\\?['"])\s*,\s*(?:\\?['"])([^'"\\]*)(?:\\?['"])"""
+)
+POSTBACK_OPTIONS_PATTERN = re.compile(
+    r"""WebForm_PostBackOptions\(\s*(?:&quot;|\\?")([^"&\\]*)(?:&quot;|\\?")\s*,\s*(?:&quot;|\\?")([^"&\\]*)(?:&quot;|\\?")\s*,\s*(true|false)"""
+)
+
+class ViewStateError(ValueError):
+    """Raised when a ViewState value cannot be decoded."""
+
+class _Base64Reader:
+    """Binary reader that decodes a base64 string lazily, chunk by chunk.
+
+    Only one decoded chunk is held at a time, so multi-megabyte ViewState
+    values are never materialized as one large byte string.
+    """
+
+    def __init__(self, value: str):
+        self._value = value
+        self._offset = 0
+        self._carry = ""
+        self._buffer = b""
+        self._position = 0
+        self.bytes_read = 0
+
+    def _fill(self) -> bool:
+        while self._offset < len(self._value):
+            chunk = self._value[self._offset:self._offset + CHUNK_CHARS]
+            self._offset += CHUNK_CHARS
+            chunk = self._carry + "".join(chunk.split())
+            if self._offset >= len(self._value):
+                chunk += "=" * (-len(chunk) % 4)
+                self._carry = ""
+            else:
+                # Whitespace may break 4-character alignment; carry the remainder
+                usable = len(chunk) - len(chunk) % 4
+                chunk, self._carry = chunk[:usable], chunk[usable:]
+            if not chunk:
+                continue
+            try:
+                decoded = base64.b64decode(chunk, validate=True)
+            except binascii.Error as e:
+                raise ViewStateError(f"Invalid base64 data: {str(e)}")
+            self._buffer = self._buffer[self._position:] + decoded
+            self._position = 0
+            return True
+        return False
+
+    def read(self, count: int) -> bytes:
+        while len(self._buffer) - self._position < count:
+            if not self._fill():
+                raise ViewStateError("Unexpected end of ViewState data")
+        data = self._buffer[self._position:self._position + count]
+        self._position += count
+        self.bytes_read += count
+        return data
+
+    def read_byte(self) -> int:
+        return self.read(1)[0]
+
+    def remaining(self) -> int:
+        """Return how many decoded bytes remain, consuming the rest of the input."""
+        remaining = len(self._buffer) - self._position
+        while self._fill():
+            remaining = len(self._buffer) - self._position
+        return remaining
+
+    def read_7bit_int(self) -> int:
+        result = 0
+        for shift in range(0, 35, 7):
+            byte = self.read_byte()
+            result |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                return result
+        raise ViewStateError("Malformed 7-bit encoded integer")
+
+    def read_string(self) -> str:
+        length = self.read_7bit_int()
+        if length <= MAX_STRING_LENGTH:
+            return self.read(length).decode("utf-8", errors="replace")
+        # Keep a prefix and skip the rest in bounded reads
+        prefix = self.read(MAX_STRING_LENGTH).decode("utf-8", errors="replace")
+        remaining = length - MAX_STRING_LENGTH
+        while remaining:
+            step = min(remaining, CHUNK_CHARS)
+            self.read(step)
+            remaining -= step
+        return f"{prefix}...<{length} bytes>"
+
+class ObjectStateDecoder:
+    """Decoder for the LosFormatter / ObjectStateFormatter binary format."""
+
+    def __init__(self, value: str):
+        self.reader = _Base64Reader(value)
+        self.strings: List[str] = []
+        self.types: List[str] = []
+        self.token_count = 0
+
+    def decode(self) -> Any:
+        if self.reader.read(2) != FORMATTER_MARKER:
+            raise ViewStateError("Not an ObjectStateFormatter payload (possibly encrypted)")
+        return self._read_object(0)
+
+    def _read_type(self) -> str:
+        token = self.reader.read_byte()
+        if token == TOKEN_TYPE_REF:
+            index = self.reader.read_7bit_int()
+            if index >= len(self.types):
+                raise ViewStateError(f"Unknown type reference {index}")
+            return self.types[index]
+        if token in (TOKEN_TYPE_REF_ADD, TOKEN_TYPE_REF_ADD_LOCAL):
+            name = self.reader.read_string()
+            self.types.append(name)
+            return name
+        raise ViewStateError(f"Unexpected type token 0x{token:02x}")
+
+    def _read_object(self, depth: int) -> Any:
+        if depth > MAX_DEPTH:
+            raise ViewStateError("ViewState nesting too deep")
+        reader = self.reader
+        token = reader.read_byte()
+        self.token_count += 1
+
+        if token == TOKEN_NULL:
+            return None
+        if token == TOKEN_EMPTY_STRING:
+            return ""
+        if token == TOKEN_ZERO_INT32:
+            return 0
+        if token == TOKEN_TRUE:
+            return True
+        if token == TOKEN_FALSE:
+            return False
+        if token == TOKEN_INT16:
+            return struct.unpack("<h", reader.read(2))[0]
+        if token == TOKEN_INT32:
+            value = reader.read_7bit_int()
+            return value - (1 << 32) if value >= (1 << 31) else value
+        if token == TOKEN_BYTE:
+            return reader.read_byte()
+        if token == TOKEN_CHAR:
+            lead = reader.read_byte()
+            extra = 3 if lead >= 0xF0 else 2 if lead >= 0xE0 else 1 if lead >= 0xC0 else 0
+            return (bytes([lead]) + reader.read(extra)).decode("utf-8", errors="replace")
+        if token == TOKEN_STRING:
+            return reader.read_string()
+        if token == TOKEN_DATETIME:
+            return {"datetime_ticks": struct.unpack("<q", reader.read(8))[0]}
+        if token == TOKEN_DOUBLE:
+            return struct.unpack("<d", reader.read(8))[0]
+        if token == TOKEN_SINGLE:
+            return struct.unpack("<f", reader.read(4))[0]
+        if token == TOKEN_COLOR:
+            return {"color": struct.unpack("<i", reader.read(4))[0]}
+        if token == TOKEN_KNOWN_COLOR:
+            return {"known_color": reader.read_7bit_int()}
+        if token == TOKEN_EMPTY_COLOR:
+            return {"color": None}
+        if token == TOKEN_INT_ENUM:
+            enum_type = self._read_type()
+            return {"enum": enum_type, "value": reader.read_7bit_int()}
+        if token == TOKEN_PAIR:
+            return {"pair": [self._read_object(depth + 1), self._read_object(depth + 1)]}
+        if token == TOKEN_TRIPLET:
+            return {"triplet": [self._read_object(depth + 1) for _ in range(3)]}
+        if token == TOKEN_ARRAY:
+            self._read_type()
+            return [self._read_object(depth + 1) for _ in range(reader.read_7bit_int())]
+        if token == TOKEN_STRING_ARRAY:
+            return [reader.read_string() for _ in range(reader.read_7bit_int())]
+        if token == TOKEN_ARRAY_LIST:
+            return [self._read_object(depth + 1) for _ in range(reader.read_7bit_int())]
+        if token in (TOKEN_HASHTABLE, TOKEN_HYBRID_DICTIONARY):
+            entries = []
+            for _ in range(reader.read_7bit_int()):
+                entries.append([self._read_object(depth + 1), self._read_object(depth + 1)])
+            return {"dictionary": entries}
+        if token == TOKEN_TYPE:
+            return {"type": self._read_type()}
+        if token == TOKEN_UNIT:
+            value = struct.unpack("<d", reader.read(8))[0]
+            unit_type = struct.unpack("<i", reader.read(4))[0]
+            return {"unit": value, "unit_type": unit_type}
+        if token == TOKEN_EMPTY_UNIT:
+            return {"unit": None}
+        if token == TOKEN_INDEXED_STRING_ADD:
+            value = reader.read_string()
+            self.strings.append(value)
+            return value
+        if token == TOKEN_INDEXED_STRING:
+            index = reader.read_byte()
+            if index >= len(self.strings):
+                raise ViewStateError(f"Unknown indexed string {index}")
+            return self.strings[index]
+        if token == TOKEN_STRING_FORMATTED:
+            converter_type = self._read_type()
+            return {"formatted": reader.read_string(), "type": converter_type}
+        if token == TOKEN_BINARY_SERIALIZED:
+            length = reader.read_7bit_int()
+            while length:
+                step = min(length, CHUNK_CHARS)
+                reader.read(step)
+                length -= step
+            return {"binary_serialized": True}
+        if token == TOKEN_SPARSE_ARRAY:
+            self._read_type()
+            length = reader.read_7bit_int()
+            items: List[Any] = [None] * min(length, 65536)
+            for _ in range(reader.read_7bit_int()):
+                index = reader.read_7bit_int()
+                item = self._read_object(depth + 1)
+                if index < len(items):
+                    items[index] = item
+            return items
+        raise ViewStateError(f"Unsupported token 0x{token:02x}")
+
+# Decoding runs on worker threads, so the memo is only touched under its lock
+_memo: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_memo_lock = threading.Lock()
+MEMO_SIZE = 128
+
+def _value_hash(value: str) -> str:
+    digest = hashlib.sha256()
+    for offset in range(0, len(value), CHUNK_CHARS):
+        digest.update(value[offset:offset + CHUNK_CHARS].encode("ascii", errors="replace"))
+    return digest.hexdigest()
+
+def decode_state_field(value: str) -> Dict[str, Any]:
+    """Decode a __VIEWSTATE or __EVENTVALIDATION value.
+
+    Returns a summary with the decoded object tree (``tree``), whether a MAC
+    follows the payload, and an ``error`` when the value is encrypted or not
+    in a supported format. Results are memoized by a hash of the value;
+    every call returns its own copy, so callers may modify it.
+    """
+    key = _value_hash(value)
+    with _memo_lock:
+        if key in _memo:
+            _memo.move_to_end(key)
+            return copy.deepcopy(_memo[key])
+
+    decoder = ObjectStateDecoder(value)
+    summary: Dict[str, Any] = {"hash": key, "encoded_length": len(value)}
+    try:
+        summary["tree"] = decoder.decode()
+        trailing = decoder.reader.remaining()
+        summary["mac_protected"] = trailing in (20, 32, 48, 64)
+        summary["decoded_bytes"] = decoder.reader.bytes_read + trailing
+        summary["tokens"] = decoder.token_count
+        summary["indexed_strings"] = list(decoder.strings)
+    except ViewStateError as e:
+        summary["error"] = str(e)
+
+    with _memo_lock:
+        _memo[key] = summary
+        if len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+    return copy.deepcopy(summary)
+
+def cap_tree(tree: Any, max_nodes: int = MAX_TREE_NODES) -> Tuple[Any, bool]:
+    """Return a copy of a decoded tree holding at most ``max_nodes`` nodes.
+
+    Nodes past the budget are replaced by a ``...<n more>`` marker in their
+    array; the second value tells whether anything was elided.
+    """
+    remaining = max_nodes
+    truncated = False
+
+    def capped(value: Any) -> Any:
+        nonlocal remaining, truncated
+        remaining -= 1
+        if isinstance(value, dict):
+            return {name: capped(item) for name, item in value.items()}
+        if isinstance(value, list):
+            items = []
+            for index, item in enumerate(value):
+                if remaining <= 0:
+                    items.append(f"...<{len(value) - index} more>")
+                    truncated = True
+                    break
+                items.append(capped(item))
+            return items
+        return value
+
+    return capped(tree), truncated
+
+def postback_targets(sources: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Find __doPostBack / WebForm_PostBackOptions targets in handler sources.
+
+    Each target maps to ``{"postback": {"arguments": [...]}}`` so that, like
+    the client-side handlers, the keys of a target are its event types.
+    """
+    targets: Dict[str, Dict[str, Any]] = {}
+    for source in sources:
+        for target, argument in POSTBACK_PATTERN.findall(source):
+            entry = targets.setdefault(target, {"postback": {"arguments": []}})["postback"]
+            if argument not in entry["arguments"]:
+                entry["arguments"].append(argument)
+        for target, argument, validates in POSTBACK_OPTIONS_PATTERN.findall(source):
+            entry = targets.setdefault(target, {"postback": {"arguments": []}})["postback"]
+            if argument not in entry["arguments"]:
+                entry["arguments"].append(argument)
+            entry["causes_validation"] = validates == "true"
+    return targets
+
+def extract_server_side(
+    elements: List[Dict[str, Any]],
+    handler_sources: List[str]
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Build the ``server_side`` validation and event sections of a form.
+
+    ``elements`` are the extracted form controls (the hidden __VIEWSTATE and
+    __EVENTVALIDATION fields are read from them) and ``handler_sources`` are
+    the inline handler and ``javascript:`` link sources found in the page.
+    Returns ``(validation_server_side, events_server_side)`` keyed by form.
+    """
+    validation: Dict[str, Dict[str, Any]] = {}
+    for element in elements:
+        name = element.get("name")
+        if name not in ("__VIEWSTATE", "__EVENTVALIDATION") or not element.get("value"):
+            continue
+        form_key = element.get("form") or "default"
+        decoded = decode_state_field(element["value"])
+        rules: Dict[str, Any] = {
+            "mac_protected": decoded.get("mac_protected", False),
+            "decoded": "error" not in decoded
+        }
+        if name == "__EVENTVALIDATION" and isinstance(decoded.get("tree"), list):
+            # The first entry is the ViewState hash; the rest are allowed postback values
+            rules["allowed_postback_values"] = max(len(decoded["tree"]) - 1, 0)
+        if name == "__VIEWSTATE" and "tree" in decoded:
+            rules["state_tokens"] = decoded["tokens"]
+            rules["persisted_properties"] = decoded["indexed_strings"]
+        if "tree" in decoded:
+            rules["tree"], truncated = cap_tree(decoded["tree"])
+            if truncated:
+                rules["tree_truncated"] = True
+        validation.setdefault(form_key, {})[name] = rules
+
+    events: Dict[str, Dict[str, Any]] = {}
+    targets = postback_targets(handler_sources)
+    if targets:
+        form_keys = {element.get("form") for element in elements if element.get("form")}
+        form_key = form_keys.pop() if len(form_keys) == 1 else "default"
+        events[form_key] = targets
+    return validation, events
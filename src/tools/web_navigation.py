@@ -1,179 +1,445 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import asyncio
-from playwright.async_api import async_playwright, Browser, Page
+import os
+import time
+from urllib.parse import urlparse
+import httpx
+from playwright.async_api import BrowserContext, Frame, Page, Response, Route
+from playwright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+from pydantic import BaseModel
+from .auth_session import AuthSessionStore, AuthenticationError, LoginSpec, cookie_header, get_auth_store
 from .base import BaseTool, ToolConfig, ToolResult
+from .browser_pool import BrowserPool, get_browser_pool
+from .dom_diff import FingerprintStore, diff_elements, fingerprint, get_fingerprint_store
+from .form_extraction import ELEMENT_COLUMNS, EVENT_HANDLER_NAMES, FORM_WALKER_SCRIPT, NO_FORM_KEY, merge_frame_form_data
+from .postback_explorer import PostbackExplorer, exploration_config
+from .replay import ReplayStore, get_replay_store
+from .snapshot_cache import SnapshotCache, get_snapshot_cache
+from .static_extraction import StaticFormExtractor, StaticPage
+
+# Load strategies accepted by the ``wait_until`` parameter. "form_controls"
+# returns as soon as the ``wait_for`` selector (form controls by default) is
+# attached, without waiting for analytics or long-polling requests to settle.
+LOAD_STRATEGIES = ["networkidle", "load", "domcontentloaded", "form_controls"]
+FORM_CONTROLS_SELECTOR = "form input, form select, form textarea"
+
+# Extractors selectable with the ``mode`` parameter
+EXTRACTION_MODES = ["browser", "static", "auto"]
+
+# Resource types aborted when ``block_resources`` is true
+BLOCKED_RESOURCE_TYPES = ["image", "font", "media", "stylesheet"]
+
+# Server responses worth retrying: throttling and gateway/availability errors
+TRANSIENT_STATUS_CODES = {429, 502, 503, 504}
+
+def is_transient_error(error: Exception) -> bool:
+    """Return whether a navigation error is likely to succeed on retry."""
+    if isinstance(error, (PlaywrightTimeoutError, httpx.TransportError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in TRANSIENT_STATUS_CODES
+    # Chromium network failures such as net::ERR_CONNECTION_RESET
+    return isinstance(error, PlaywrightError) and "net::ERR_" in str(error)
+
+class PageExtraction(BaseModel):
+    """Form data extracted from one page, with the details needed to cache it."""
+    form_data: Dict[str, Any]
+    extraction_ms: float
+    source: str
+    fallback_reason: Optional[str] = None
+    links: List[str] = []
+    headers: Dict[str, str] = {}
+    dom: Optional[str] = None
 
 class WebNavigationTool(BaseTool):
     """Tool for web navigation and form element extraction."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        browser_pool: Optional[BrowserPool] = None,
+        static_extractor: Optional[StaticFormExtractor] = None,
+        snapshot_cache: Optional[SnapshotCache] = None,
+        auth_store: Optional[AuthSessionStore] = None,
+        fingerprint_store: Optional[FingerprintStore] = None
+    ):
         super().__init__(
             ToolConfig(
                 name="web_navigation",
-                description="Handles web form navigation and element extraction"
+                description="Handles web form navigation and element extraction",
+                # Leaves room for postback exploration within its default time limit
+                timeout=180,
+                max_concurrency=int(os.getenv("WEB_NAVIGATION_MAX_CONCURRENCY", "8")),
+                max_queue=int(os.getenv("WEB_NAVIGATION_MAX_QUEUE", "32")),
+                queue_timeout=float(os.getenv("WEB_NAVIGATION_QUEUE_TIMEOUT", "30"))
             )
         )
-        self.browser: Optional[Browser] = None
+        self.browser_pool = browser_pool or get_browser_pool()
+        self.static_extractor = static_extractor or StaticFormExtractor()
+        self.snapshot_cache = snapshot_cache or get_snapshot_cache()
+        self._auth_store = auth_store
+        self._fingerprint_store = fingerprint_store
+        # Page used by the extraction helpers when no page is passed explicitly
         self.page: Optional[Page] = None
 
     async def execute(self, params: Dict[str, Any], context: Dict[str, Any]) -> ToolResult:
-        """Execute web navigation and form extraction."""
+        """Execute web navigation and form extraction.
+
+        ``mode`` selects the extractor: "browser" (default) always uses
+        Playwright, "static" only fetches and parses the HTML, and "auto"
+        parses the HTML first and falls back to Playwright when the page
+        appears to need JavaScript. When a snapshot cache is configured,
+        fresh or successfully revalidated snapshots are served without
+        loading the page (disable with ``use_cache=False``). With
+        ``incremental=True`` the result also carries a ``diff`` of the
+        controls added, removed or changed since the page's last extraction.
+        ``explore`` (true, or a dict of ``ExplorationConfig`` limits) also
+        drives the page's AutoPostBack controls and postback targets and adds
+        an ``exploration`` section with every field revealed on the way.
+        """
         try:
             url = params["url"]
-            await self._initialize_browser()
-            await self._navigate_to_url(url)
-            
-            # Extract form elements
-            elements = await self._extract_form_elements()
-            
-            # Extract validation rules
-            validation_rules = await self._extract_validation_rules()
-            
-            # Extract event handlers
-            event_handlers = await self._extract_event_handlers()
+            cache_key = None
+            if self.snapshot_cache and params.get("use_cache", True):
+                cache_key = self.snapshot_cache.key_for(url, params)
+                snapshot, status = await self.snapshot_cache.lookup(cache_key)
+                if snapshot:
+                    self.logger.debug(f"Serving {url} from snapshot cache ({status})")
+                    return await self._result(
+                        url, params, snapshot.data, {**snapshot.metadata, "cache": status}
+                    )
+
+            extraction = await self._extract_page(url, params)
+            if params.get("explore"):
+                if await get_replay_store(params):
+                    self.logger.warning(f"Skipping postback exploration of {url}: pages are replayed offline")
+                else:
+                    explorer = PostbackExplorer(self, exploration_config(params["explore"]))
+                    extraction.form_data["exploration"] = await explorer.explore(url, params, extraction.form_data)
             
-            return ToolResult(
-                success=True,
-                data={
-                    "elements": elements,
-                    "validation_rules": validation_rules,
-                    "event_handlers": event_handlers
-                },
-                metadata={
-                    "url": url,
-                    "timestamp": asyncio.get_event_loop().time()
-                }
+            self.logger.debug(
+                f"Extracted {len(extraction.form_data['elements'])} elements from {url} "
+                f"({extraction.source}) in {extraction.extraction_ms:.1f} ms"
             )
+            metadata = {
+                "url": url,
+                "timestamp": asyncio.get_event_loop().time(),
+                "extraction_ms": extraction.extraction_ms,
+                "source": extraction.source,
+                "fallback_reason": extraction.fallback_reason
+            }
+            if params.get("collect_links"):
+                metadata["links"] = extraction.links
+            if cache_key:
+                await self.snapshot_cache.store(
+                    cache_key,
+                    url,
+                    extraction.form_data,
+                    metadata,
+                    headers=extraction.headers,
+                    dom=extraction.dom
+                )
+                metadata["cache"] = "miss"
+            return await self._result(url, params, extraction.form_data, metadata)
         except Exception as e:
             self.logger.error(f"Error in web navigation: {str(e)}")
             return ToolResult(
                 success=False,
                 data={},
-                error=str(e)
+                error=str(e),
+                retryable=is_transient_error(e)
             )
-        finally:
-            await self.cleanup()
+
+    async def _result(
+        self,
+        url: str,
+        params: Dict[str, Any],
+        data: Dict[str, Any],
+        metadata: Dict[str, Any]
+    ) -> ToolResult:
+        """Build the tool result, diffing against the last fingerprint when incremental."""
+        if params.get("incremental"):
+            current = fingerprint(url, data["elements"])
+            previous = await self.fingerprint_store.load(url)
+            data = {**data, "diff": diff_elements(previous, current, data["elements"])}
+            metadata = {**metadata, "fingerprint": current.digest}
+            if previous is None or previous.digest != current.digest:
+                await self.fingerprint_store.save(current)
+        return ToolResult(success=True, data=data, metadata=metadata)
+
+    @property
+    def fingerprint_store(self) -> FingerprintStore:
+        if self._fingerprint_store is None:
+            self._fingerprint_store = get_fingerprint_store()
+        return self._fingerprint_store
+
+    @property
+    def auth_store(self) -> AuthSessionStore:
+        if self._auth_store is None:
+            self._auth_store = get_auth_store()
+        return self._auth_store
 
     async def validate_params(self, params: Dict[str, Any]) -> bool:
         """Validate the input parameters."""
         required_params = ["url"]
-        return all(param in params for param in required_params)
+        if not all(param in params for param in required_params):
+            return False
+        return (
+            params.get("wait_until", "networkidle") in LOAD_STRATEGIES
+            and params.get("mode", "browser") in EXTRACTION_MODES
+            and isinstance(params.get("explore", False), (bool, dict))
+        )
 
     async def cleanup(self):
-        """Clean up browser resources."""
-        if self.page:
-            await self.page.close()
-        if self.browser:
-            await self.browser.close()
-
-    async def _initialize_browser(self):
-        """Initialize the browser instance."""
-        playwright = await async_playwright().start()
-        self.browser = await playwright.chromium.launch(
-            headless=True,
-            args=["--no-sandbox"]
+        """Clean up browser resources.
+
+        Browsers belong to the shared pool and each request's context is closed
+        when it finishes, so only the shared pool shutdown releases browsers.
+        """
+        pass
+
+    async def _extract_page(self, url: str, params: Dict[str, Any]) -> PageExtraction:
+        """Extract the page with the extractor selected by ``mode``.
+
+        When ``har_path`` or ``snapshot_dir`` (below REPLAY_ROOT) is given,
+        both extractors are served from that recorded corpus and never touch
+        the network. When
+        ``username`` and ``password`` are given (and the page is not replayed),
+        the page is loaded with the origin's persisted login session.
+        """
+        mode = params.get("mode", "browser")
+        keep_dom = bool(self.snapshot_cache and self.snapshot_cache.config.store_dom)
+        replay_store = await get_replay_store(params)
+        login = None if replay_store else LoginSpec.from_params(params)
+        fallback_reason = None
+
+        if mode in ("static", "auto"):
+            static_extractor = self.static_extractor
+            if replay_store:
+                static_extractor = StaticFormExtractor(replay_store.http_client())
+            static_page = await self._extract_static(static_extractor, url, keep_dom, login)
+            if mode == "static" or not static_page.needs_javascript:
+                return PageExtraction(
+                    form_data=static_page.form_data,
+                    extraction_ms=static_page.extraction_ms,
+                    source="static",
+                    links=static_page.links,
+                    headers=static_page.headers,
+                    dom=static_page.html
+                )
+            fallback_reason = static_page.javascript_reason
+            self.logger.info(f"Falling back to browser for {url}: {fallback_reason}")
+
+        extraction = await self._extract_with_browser(url, params, keep_dom, replay_store, login)
+        extraction.fallback_reason = fallback_reason
+        return extraction
+
+    async def _extract_static(
+        self,
+        static_extractor: StaticFormExtractor,
+        url: str,
+        keep_dom: bool,
+        login: Optional[LoginSpec]
+    ) -> StaticPage:
+        """Fetch the page without a browser, sending the login session's cookies."""
+        if login is None:
+            return await static_extractor.extract(url, keep_html=keep_dom)
+
+        state = await self.auth_store.session(self.browser_pool, url, login)
+        static_page = await static_extractor.extract(
+            url, headers=self._cookie_headers(state, url), keep_html=keep_dom
         )
-        self.page = await self.browser.new_page()
+        if login.redirected_to_login(static_page.url, url):
+            self.logger.info(f"Session for {url} expired, logging in again")
+            state = await self.auth_store.session(self.browser_pool, url, login, stale=state)
+            static_page = await static_extractor.extract(
+                url, headers=self._cookie_headers(state, url), keep_html=keep_dom
+            )
+            if login.redirected_to_login(static_page.url, url):
+                raise AuthenticationError(f"Still redirected to the login page for {url}")
+        return static_page
 
-    async def _navigate_to_url(self, url: str):
-        """Navigate to the specified URL."""
-        await self.page.goto(url, wait_until="networkidle")
-        await self.page.wait_for_load_state("domcontentloaded")
+    async def _extract_with_browser(
+        self,
+        url: str,
+        params: Dict[str, Any],
+        keep_dom: bool = False,
+        replay_store: Optional[ReplayStore] = None,
+        login: Optional[LoginSpec] = None
+    ) -> PageExtraction:
+        """Load the page in a pooled browser context and extract its form data.
 
-    async def _extract_form_elements(self) -> List[Dict[str, Any]]:
+        With a ``login`` the context starts from the origin's persisted
+        storage state; a redirect to the login page means the server expired
+        the session, so the login is replayed once and the page reloaded.
+        """
+        if login is None:
+            return await self._load_in_browser(url, params, keep_dom, replay_store)
+
+        state = await self.auth_store.session(self.browser_pool, url, login)
+        extraction = await self._load_in_browser(url, params, keep_dom, replay_store, state, login)
+        if extraction is None:
+            self.logger.info(f"Session for {url} expired, logging in again")
+            state = await self.auth_store.session(self.browser_pool, url, login, stale=state)
+            extraction = await self._load_in_browser(url, params, keep_dom, replay_store, state, login)
+            if extraction is None:
+                raise AuthenticationError(f"Still redirected to the login page for {url}")
+        return extraction
+
+    async def _load_in_browser(
+        self,
+        url: str,
+        params: Dict[str, Any],
+        keep_dom: bool = False,
+        replay_store: Optional[ReplayStore] = None,
+        storage_state: Optional[Dict[str, Any]] = None,
+        login: Optional[LoginSpec] = None
+    ) -> Optional[PageExtraction]:
+        """Extract the page in one browser context; None when it redirected to the login page."""
+        context_options = {"storage_state": storage_state} if storage_state else {}
+        async with self.browser_pool.context(**context_options) as browser_context:
+            if replay_store:
+                await replay_store.install(browser_context)
+            await self._configure_resource_blocking(browser_context, url, params)
+            page = await browser_context.new_page()
+            response = await self._navigate_to_url(
+                url,
+                page,
+                wait_until=params.get("wait_until", "networkidle"),
+                wait_for=params.get("wait_for")
+            )
+            if login and login.redirected_to_login(page.url, url):
+                return None
+            
+            # Extract form elements, validation rules and event handlers
+            extraction_started = time.perf_counter()
+            form_data = await self._extract_form_data(page)
+            extraction_ms = (time.perf_counter() - extraction_started) * 1000
+
+            links: List[str] = []
+            if params.get("collect_links"):
+                links = await page.eval_on_selector_all("a[href]", "anchors => anchors.map(a => a.href)")
+            return PageExtraction(
+                form_data=form_data,
+                extraction_ms=extraction_ms,
+                source="browser",
+                links=links,
+                headers=response.headers if response else {},
+                dom=await page.content() if keep_dom else None
+            )
+
+    @staticmethod
+    def _cookie_headers(state: Dict[str, Any], url: str) -> Dict[str, str]:
+        cookies = cookie_header(state, url)
+        return {"Cookie": cookies} if cookies else {}
+
+    async def _navigate_to_url(
+        self,
+        url: str,
+        page: Optional[Page] = None,
+        wait_until: str = "networkidle",
+        wait_for: Optional[str] = None
+    ) -> Optional[Response]:
+        """Navigate to the specified URL using the requested load strategy."""
+        page = page or self.page
+        if wait_until == "form_controls":
+            response = await page.goto(url, wait_until="domcontentloaded")
+            await page.wait_for_selector(wait_for or FORM_CONTROLS_SELECTOR, state="attached")
+            return response
+
+        response = await page.goto(url, wait_until=wait_until)
+        await page.wait_for_load_state("domcontentloaded")
+        if wait_for:
+            await page.wait_for_selector(wait_for, state="attached")
+        return response
+
+    async def _configure_resource_blocking(
+        self,
+        browser_context: BrowserContext,
+        url: str,
+        params: Dict[str, Any]
+    ):
+        """Abort heavy or third-party requests when the request asks for it.
+
+        ``block_resources`` is either true (block BLOCKED_RESOURCE_TYPES) or a
+        list of Playwright resource types; ``block_third_party`` aborts every
+        request to a host other than the page's host or its subdomains.
+        """
+        block_resources = params.get("block_resources", False)
+        block_third_party = params.get("block_third_party", False)
+        if not block_resources and not block_third_party:
+            return
+
+        if block_resources is True:
+            blocked_types = set(BLOCKED_RESOURCE_TYPES)
+        else:
+            blocked_types = set(block_resources or [])
+        page_host = urlparse(url).hostname or ""
+
+        async def handle_route(route: Route):
+            request = route.request
+            if request.resource_type in blocked_types:
+                await route.abort()
+                return
+            is_main_document = request.is_navigation_request() and request.frame.parent_frame is None
+            if block_third_party and not is_main_document:
+                host = urlparse(request.url).hostname or ""
+                if host and host != page_host and not host.endswith("." + page_host):
+                    await route.abort()
+                    return
+            # Fall back to earlier routes (e.g. offline replay) or the network
+            await route.fallback()
+
+        await browser_context.route("**/*", handle_route)
+
+    async def _extract_form_data(self, page: Optional[Page] = None) -> Dict[str, Any]:
+        """Extract elements, validation rules and event handlers from every frame.
+
+        Each frame (and the open shadow roots inside it) is walked in a single
+        traversal, and all frames are walked concurrently. Frames that detach
+        or cannot be scripted while the walk runs are skipped.
+        """
+        page = page or self.page
+        frames = page.frames
+        payloads = await asyncio.gather(
+            *(self._walk_frame(frame, page.main_frame) for frame in frames),
+            return_exceptions=True
+        )
+        walked = []
+        for frame, payload in zip(frames, payloads):
+            if isinstance(payload, Exception):
+                if frame is page.main_frame:
+                    raise payload
+                self.logger.warning(f"Skipping frame {frame.url}: {str(payload)}")
+                continue
+            walked.append(payload)
+        # Decoding large ViewState values is CPU-bound, keep it off the event loop
+        return await asyncio.to_thread(merge_frame_form_data, walked)
+
+    async def _walk_frame(self, frame: Frame, main_frame: Frame) -> Tuple[Optional[str], Dict[str, Any]]:
+        path = None if frame is main_frame else self._frame_path(frame)
+        payload = await frame.evaluate(
+            FORM_WALKER_SCRIPT, [ELEMENT_COLUMNS, EVENT_HANDLER_NAMES, path, NO_FORM_KEY]
+        )
+        return path, payload
+
+    @staticmethod
+    def _frame_path(frame: Frame) -> str:
+        """Identify a child frame by its name (or index) at each nesting level."""
+        parts = []
+        while frame.parent_frame is not None:
+            siblings = frame.parent_frame.child_frames
+            parts.append(frame.name or str(siblings.index(frame) if frame in siblings else 0))
+            frame = frame.parent_frame
+        return "/".join(reversed(parts))
+
+    async def _extract_form_elements(self, page: Optional[Page] = None) -> List[Dict[str, Any]]:
         """Extract form elements and their properties."""
-        elements = await self.page.query_selector_all("form input, form select, form textarea")
-        form_data = []
-        
-        for element in elements:
-            element_data = await self._get_element_properties(element)
-            form_data.append(element_data)
-        
-        return form_data
-
-    async def _get_element_properties(self, element) -> Dict[str, Any]:
-        """Get properties of a form element."""
-        return {
-            "id": await element.get_attribute("id"),
-            "name": await element.get_attribute("name"),
-            "type": await element.get_attribute("type"),
-            "required": await element.get_attribute("required") is not None,
-            "value": await element.get_attribute("value"),
-            "placeholder": await element.get_attribute("placeholder"),
-            "class": await element.get_attribute("class"),
-            "disabled": await element.get_attribute("disabled") is not None,
-            "readonly": await element.get_attribute("readonly") is not None,
-            "maxlength": await element.get_attribute("maxlength"),
-            "min": await element.get_attribute("min"),
-            "max": await element.get_attribute("max"),
-            "pattern": await element.get_attribute("pattern")
-        }
-
-    async def _extract_validation_rules(self) -> Dict[str, Any]:
+        return (await self._extract_form_data(page))["elements"]
+
+    async def _extract_validation_rules(self, page: Optional[Page] = None) -> Dict[str, Any]:
         """Extract form validation rules."""
-        validation_rules = {}
-        
-        # Extract client-side validation rules
-        validation_script = """
-        () => {
-            const rules = {};
-            document.querySelectorAll('form').forEach(form => {
-                const formRules = {};
-                form.querySelectorAll('input, select, textarea').forEach(element => {
-                    formRules[element.name || element.id] = {
-                        required: element.required,
-                        pattern: element.pattern,
-                        min: element.min,
-                        max: element.max,
-                        minLength: element.minLength,
-                        maxLength: element.maxLength
-                    };
-                });
-                rules[form.id || 'default'] = formRules;
-            });
-            return rules;
-        }
-        """
-        
-        validation_rules["client_side"] = await self.page.evaluate(validation_script)
-        
-        # Extract server-side validation rules (if available)
-        # This would require additional analysis of the server-side code
-        validation_rules["server_side"] = {}
-        
-        return validation_rules
-
-    async def _extract_event_handlers(self) -> Dict[str, Any]:
+        return (await self._extract_form_data(page))["validation_rules"]
+
+    async def _extract_event_handlers(self, page: Optional[Page] = None) -> Dict[str, Any]:
         """Extract form event handlers."""
-        event_handlers = {}
-        
-        # Extract client-side event handlers
-        event_script = """
-        () => {
-            const handlers = {};
-            document.querySelectorAll('form').forEach(form => {
-                const formHandlers = {};
-                form.querySelectorAll('*').forEach(element => {
-                    const elementHandlers = {};
-                    for (const prop in element) {
-                        if (prop.startsWith('on') && typeof element[prop] === 'function') {
-                            elementHandlers[prop] = true;
-                        }
-                    }
-                    if (Object.keys(elementHandlers).length > 0) {
-                        formHandlers[element.id || element.name] = elementHandlers;
-                    }
-                });
-                handlers[form.id || 'default'] = formHandlers;
-            });
-            return handlers;
-        }
-        """
-        
-        event_handlers["client_side"] = await self.page.evaluate(event_script)
-        
-        # Extract server-side event handlers (if available)
-        # This would require additional analysis of the server-side code
-        event_handlers["server_side"] = {}
-        
-        return event_handlers 
\ No newline at end of file
+        return (await self._extract_form_data(page))["event_handlers"]
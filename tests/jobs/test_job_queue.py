@@ -0,0 +1,143 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+from src.jobs.job_queue import JobQueue
+from src.jobs.worker import JobWorker, WorkerPool, create_generation_handler
+from src.llm import checkpoint
+from src.llm.checkpoint import CheckpointStore
+from src.tools import result_cache
+from src.tools.result_cache import ResultCache
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.db"), max_attempts=2)
+
+@pytest.mark.asyncio
+async def test_claim_prefers_priority_then_age(queue):
+    first = await queue.submit({"n": 1})
+    urgent = await queue.submit({"n": 2}, priority=5)
+    await queue.submit({"n": 3})
+
+    assert (await queue.claim("w1")).id == urgent.id
+    assert (await queue.claim("w2")).id == first.id
+
+@pytest.mark.asyncio
+async def test_claim_is_fair_across_tenants(queue):
+    for n in range(3):
+        await queue.submit({"n": n}, tenant="busy", priority=10)
+    quiet = await queue.submit({"n": 0}, tenant="quiet")
+
+    claimed = [await queue.claim("w1"), await queue.claim("w2")]
+
+    assert [job.tenant for job in claimed] == ["busy", "quiet"]
+    assert claimed[1].id == quiet.id
+    assert claimed[0].status == "running" and claimed[0].attempts == 1
+
+@pytest.mark.asyncio
+async def test_cancel_queued_job(queue):
+    job = await queue.submit({"n": 1})
+
+    cancelled = await queue.cancel(job.id)
+
+    assert cancelled.status == "cancelled"
+    assert await queue.claim("w1") is None
+
+@pytest.mark.asyncio
+async def test_stale_jobs_are_requeued_then_failed(queue):
+    job = await queue.submit({"n": 1})
+    await queue.claim("w1")
+
+    assert await queue.requeue_stale(timeout=-1) == [job.id]
+    assert (await queue.get(job.id)).status == "queued"
+
+    await queue.claim("w2")
+    await queue.requeue_stale(timeout=-1)
+    failed = await queue.get(job.id)
+    assert failed.status == "failed"
+    assert failed.error == "Worker stopped responding"
+
+@pytest.mark.asyncio
+async def test_worker_records_results_and_failures(queue):
+    async def handler(payload):
+        if payload.get("fail"):
+            raise RuntimeError("Navigation failed")
+        return {"status": "success", "echo": payload}
+
+    ok = await queue.submit({"url": "http://example.com"})
+    broken = await queue.submit({"fail": True})
+    worker = JobWorker(queue, handler, "w1", heartbeat_interval=0.01)
+
+    assert await worker.run_once()
+    assert await worker.run_once()
+    assert not await worker.run_once()
+
+    assert (await queue.get(ok.id)).result == {"status": "success", "echo": {"url": "http://example.com"}}
+    assert (await queue.get(broken.id)).status == "failed"
+    assert (await queue.get(broken.id)).error == "Navigation failed"
+    assert await queue.counts() == {"succeeded": 1, "failed": 1}
+
+@pytest.mark.asyncio
+async def test_worker_cancels_running_job_on_request(queue):
+    started = asyncio.Event()
+
+    async def handler(payload):
+        started.set()
+        await asyncio.sleep(10)
+        return {}
+
+    job = await queue.submit({"n": 1})
+    worker = JobWorker(queue, handler, "w1", heartbeat_interval=0.01)
+    processing = asyncio.create_task(worker.run_once())
+    await started.wait()
+
+    assert (await queue.cancel(job.id)).cancel_requested
+    await asyncio.wait_for(processing, 1)
+
+    assert (await queue.get(job.id)).status == "cancelled"
+
+@pytest.mark.asyncio
+async def test_worker_runs_generation_job_with_real_tools(queue, tmp_path, monkeypatch):
+    (tmp_path / "snapshots").mkdir()
+    (tmp_path / "snapshots" / "Orders.aspx").write_text(
+        "<form id='form1'><input id='txtEmail' name='txtEmail' type='email' required></form>"
+    )
+    monkeypatch.setenv("REPLAY_ROOT", str(tmp_path))
+    monkeypatch.setattr(result_cache, "_shared_cache", ResultCache(directory=None))
+    monkeypatch.setattr(checkpoint, "_shared_store", CheckpointStore(str(tmp_path / "checkpoints.db")))
+    llm = Mock()
+    llm.generate_response = AsyncMock(return_value=Mock(success=True, data="Looks good"))
+    browser_pool = Mock(start=AsyncMock(), stop=AsyncMock())
+    handler, cleanup = await create_generation_handler(llm=llm, browser_pool=browser_pool)
+    job = await queue.submit({
+        "url": "http://legacy.example.com/Orders.aspx",
+        "platform": "webforms",
+        "form_name": "Orders",
+        "language": "java",
+        "params": {"mode": "static", "snapshot_dir": "snapshots", "use_cache": False}
+    })
+    worker = JobWorker(queue, handler, "w1", heartbeat_interval=0.01)
+
+    try:
+        assert await worker.run_once()
+    finally:
+        await cleanup()
+
+    finished = await queue.get(job.id)
+    assert finished.status == "succeeded", finished.error
+    code = finished.result["results"]["generate_code"]
+    assert "txtEmail" in code["api_code"]["models"]
+    assert "public class" in code["api_code"]["models"]
+    browser_pool.start.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_pool_supervisor_restarts_dead_workers_periodically(monkeypatch):
+    pool = WorkerPool(0)
+    checks = []
+    monkeypatch.setattr(pool, "replace_dead", lambda: checks.append(1) or 0)
+
+    supervisor = asyncio.create_task(pool.supervise(interval=0.01))
+    await asyncio.sleep(0.05)
+    pool.stop()
+    await asyncio.wait_for(supervisor, 1)
+
+    assert len(checks) >= 2
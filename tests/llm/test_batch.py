@@ -0,0 +1,133 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import Mock, AsyncMock
+from src.llm.batch import BatchConfig, BatchPipeline
+from src.tools.base import ToolRegistry, ToolResult
+from src.tools.code_generation import CodeGenerationTool
+from src.tools.form_analysis import FormAnalysisTool
+from src.tools.result_cache import ResultCache
+from src.tools.web_navigation import WebNavigationTool
+
+def make_registry(fail_url=None, delay=0.01):
+    active = {"web_navigation": 0, "form_analysis": 0, "code_generation": 0}
+    overlap = set()
+
+    async def execute_tool(name, params, context):
+        active[name] += 1
+        overlap.update(stage for stage, count in active.items() if count and stage != name)
+        await asyncio.sleep(delay)
+        active[name] -= 1
+        if name == "web_navigation":
+            if params["url"] == fail_url:
+                return ToolResult(success=False, data={}, error="Navigation failed")
+            return ToolResult(success=True, data={"url": params["url"], "elements": []}, error=None, metadata={})
+        if name == "form_analysis":
+            return ToolResult(success=True, data={"form": params["form_data"]["url"]}, error=None, metadata={})
+        return ToolResult(success=True, data={"code": params["language"]}, error=None, metadata={})
+
+    registry = Mock()
+    registry.execute_tool = AsyncMock(side_effect=execute_tool)
+    return registry, overlap
+
+def make_llm():
+    async def generate_response(prompt):
+        forms = prompt.count('"url"')
+        return Mock(success=True, data=json.dumps([{"valid": True}] * forms), error=None)
+
+    llm = Mock()
+    llm.generate_response = AsyncMock(side_effect=generate_response)
+    return llm
+
+async def run(pipeline, urls):
+    return [item async for item in pipeline.run(urls)]
+
+@pytest.mark.asyncio
+async def test_pipeline_overlaps_stages_and_batches_llm_calls():
+    registry, overlap = make_registry()
+    llm = make_llm()
+    pipeline = BatchPipeline(llm, registry, BatchConfig(
+        queue_size=2,
+        llm_batch_size=4,
+        llm_batch_wait=0.2,
+        targets=[{"language": "python", "framework": "fastapi"}, {"language": "csharp", "framework": "aspnet"}]
+    ))
+    urls = [f"http://example.com/form{i}" for i in range(8)]
+
+    items = await run(pipeline, urls)
+
+    assert sorted(item.url for item in items) == urls
+    assert all(item.error is None for item in items)
+    assert all(item.validation == {"valid": True} for item in items)
+    assert set(items[0].generated) == {"python-fastapi", "csharp-aspnet"}
+    assert set(items[0].timing) == {"crawl", "analyze", "generate", "validate"}
+    assert "web_navigation" in overlap
+    assert llm.generate_response.await_count < len(urls)
+
+@pytest.mark.asyncio
+async def test_failed_form_skips_remaining_stages():
+    registry, _ = make_registry(fail_url="http://example.com/broken")
+    pipeline = BatchPipeline(make_llm(), registry, BatchConfig(llm_batch_wait=0.05))
+
+    items = {item.url: item async for item in pipeline.run(["http://example.com/ok", "http://example.com/broken"])}
+
+    broken = items["http://example.com/broken"]
+    assert broken.failed_stage == "crawl"
+    assert broken.error == "Navigation failed"
+    assert broken.analysis is None and broken.validation is None
+    assert items["http://example.com/ok"].validation == {"valid": True}
+
+@pytest.mark.asyncio
+async def test_unusable_batch_response_falls_back_to_single_calls():
+    registry, _ = make_registry(delay=0)
+    llm = Mock()
+    llm.generate_response = AsyncMock(return_value=Mock(success=True, data="not json", error=None))
+    pipeline = BatchPipeline(llm, registry, BatchConfig(llm_batch_size=2, llm_batch_wait=0.5))
+
+    items = await run(pipeline, ["http://example.com/a", "http://example.com/b"])
+
+    assert [item.validation for item in items] == ["not json", "not json"]
+    assert llm.generate_response.await_count == 3
+
+@pytest.mark.asyncio
+async def test_targets_fan_out_from_one_crawl_without_validation():
+    registry, _ = make_registry(delay=0)
+    targets = [
+        {"language": "python", "framework": "fastapi"},
+        {"language": "java", "framework": "spring"},
+        {"language": "csharp", "framework": "aspnet"}
+    ]
+    pipeline = BatchPipeline(None, registry, BatchConfig(targets=targets, llm_validation=False))
+
+    items = await run(pipeline, ["http://example.com/a", "http://example.com/b"])
+
+    calls = [call.args[0] for call in registry.execute_tool.await_args_list]
+    assert calls.count("web_navigation") == 2
+    assert calls.count("form_analysis") == 2
+    assert calls.count("code_generation") == 6
+    assert set(items[0].generated) == {"python-fastapi", "java-spring", "csharp-aspnet"}
+    assert all(item.validation is None and "validate" not in item.timing for item in items)
+
+@pytest.mark.asyncio
+async def test_pipeline_generates_code_for_the_extracted_fields(tmp_path, monkeypatch):
+    (tmp_path / "snapshots").mkdir()
+    (tmp_path / "snapshots" / "Contact.aspx").write_text(
+        "<form id='form1'><input id='txtEmail' name='txtEmail' type='email' required>"
+        "<select id='ddlTopic' name='ddlTopic'><option value='sales'>Sales</option></select></form>"
+    )
+    monkeypatch.setenv("REPLAY_ROOT", str(tmp_path))
+    registry = ToolRegistry(ResultCache(directory=None))
+    registry.register(WebNavigationTool(browser_pool=Mock()))
+    registry.register(FormAnalysisTool())
+    registry.register(CodeGenerationTool())
+    pipeline = BatchPipeline(None, registry, BatchConfig(
+        crawl_params={"mode": "static", "snapshot_dir": "snapshots", "use_cache": False},
+        targets=[{"language": "python", "framework": "fastapi"}, {"language": "csharp", "framework": "aspnet"}]
+    ))
+
+    [item] = await run(pipeline, ["http://legacy.example.com/Contact.aspx"])
+
+    assert item.error is None
+    assert "txtEmail: EmailStr" in item.generated["python-fastapi"]["api_code"]["models"]
+    assert 'name="ddlTopic"' in item.generated["python-fastapi"]["html_code"]["form"]
+    assert "public string Txtemail" in item.generated["csharp-aspnet"]["api_code"]["models"]
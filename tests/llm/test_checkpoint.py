@@ -0,0 +1,83 @@
+import pytest
+from unittest.mock import Mock, AsyncMock
+from src.llm.checkpoint import CheckpointStore
+from src.llm.orchestration import OrchestrationStep, OrchestrationPlan, FormMigrationOrchestrator
+from src.tools.base import ToolResult
+
+@pytest.fixture
+def store(tmp_path):
+    return CheckpointStore(str(tmp_path / "checkpoints.db"))
+
+def make_plan():
+    return OrchestrationPlan([
+        OrchestrationStep("extract", "Extract", tool_name="test_tool", tool_params={"url": "http://example.com"}),
+        OrchestrationStep("generate", "Generate", tool_name="test_tool", tool_params={"template": "html_form"}),
+        OrchestrationStep("validate", "Validate", llm_prompt="Validate")
+    ], plan_id="migration", inputs={"form_url": "http://example.com"})
+
+def make_orchestrator(store, execute_tool, llm_success=True):
+    registry = Mock()
+    registry.execute_tool = execute_tool
+    llm = Mock()
+    llm.generate_response = AsyncMock(
+        return_value=Mock(success=llm_success, data="ok", error=None if llm_success else "LLM unavailable")
+    )
+    return FormMigrationOrchestrator(llm=llm, tool_registry=registry, max_retries=1, checkpoint_store=store)
+
+def make_tool():
+    return AsyncMock(side_effect=lambda name, params, context: ToolResult(
+        success=True, data={"echo": params}, error=None, metadata={}
+    ))
+
+@pytest.mark.asyncio
+async def test_store_round_trip(store):
+    assert await store.save("plan", "hash", "step1", {"fields": [1, 2]})
+    assert await store.save("plan", "other", "step1", "elsewhere")
+
+    assert await store.load("plan", "hash") == {"step1": {"fields": [1, 2]}}
+
+    await store.clear("plan", "hash")
+    assert await store.load("plan", "hash") == {}
+    assert await store.load("plan", "other") == {"step1": "elsewhere"}
+
+@pytest.mark.asyncio
+async def test_store_skips_unserializable_results(store):
+    assert not await store.save("plan", "hash", "step1", object())
+    assert await store.load("plan", "hash") == {}
+
+@pytest.mark.asyncio
+async def test_store_does_not_resume_expired_results(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.db"), ttl=0)
+    await store.save("plan", "hash", "step1", "old")
+
+    assert await store.load("plan", "hash") == {}
+
+@pytest.mark.asyncio
+async def test_failed_plan_resumes_from_first_incomplete_step(store):
+    tool = make_tool()
+    failed = await make_orchestrator(store, tool, llm_success=False).execute_plan(make_plan())
+
+    assert failed["success"] is False
+    assert tool.await_count == 2
+
+    tool = make_tool()
+    resumed = await make_orchestrator(store, tool).execute_plan(make_plan())
+
+    assert resumed["success"] is True
+    assert resumed["resumed"] == ["extract", "generate"]
+    assert tool.await_count == 0
+    assert resumed["results"]["extract"] == {"echo": {"url": "http://example.com"}}
+    # A successful run drops its checkpoints
+    assert await store.load("migration", make_plan().input_hash()) == {}
+
+@pytest.mark.asyncio
+async def test_changed_inputs_do_not_resume(store):
+    await make_orchestrator(store, make_tool(), llm_success=False).execute_plan(make_plan())
+    plan = make_plan()
+    plan.inputs = {"form_url": "http://example.com/other"}
+
+    tool = make_tool()
+    results = await make_orchestrator(store, tool).execute_plan(plan)
+
+    assert results["resumed"] == []
+    assert tool.await_count == 2
@@ -0,0 +1,128 @@
+import asyncio
+import pytest
+from unittest.mock import Mock, AsyncMock
+from src.llm.events import EventBus, summarize
+from src.llm.orchestration import OrchestrationStep, OrchestrationPlan, BaseOrchestrator, FormMigrationOrchestrator
+from src.tools.base import ToolResult
+
+async def collect(bus, run_id, after=0):
+    return [event async for event in bus.subscribe(run_id, after=after)]
+
+@pytest.mark.asyncio
+async def test_late_subscriber_replays_history_then_follows_live_events():
+    bus = EventBus()
+    bus.publish("run1", "run_started")
+    bus.publish("run1", "step_started", "extract")
+
+    subscriber = asyncio.create_task(collect(bus, "run1"))
+    await asyncio.sleep(0)
+    bus.publish("run1", "step_finished", "extract", {"result": {"fields": 3}})
+    bus.publish("run1", "run_finished")
+    events = await asyncio.wait_for(subscriber, 1)
+
+    assert [event.type for event in events] == ["run_started", "step_started", "step_finished", "run_finished"]
+    assert [event.sequence for event in events] == [1, 2, 3, 4]
+    assert events[2].data == {"result": {"fields": 3}}
+
+@pytest.mark.asyncio
+async def test_resubscribing_after_sequence_skips_seen_events():
+    bus = EventBus()
+    for event_type in ["run_started", "step_started", "run_finished"]:
+        bus.publish("run1", event_type)
+
+    events = await collect(bus, "run1", after=2)
+
+    assert [event.type for event in events] == ["run_finished"]
+
+@pytest.mark.asyncio
+async def test_subscribe_yields_heartbeats_while_idle():
+    bus = EventBus()
+    bus.publish("run1", "run_started")
+    stream = bus.subscribe("run1", heartbeat=0.01)
+
+    assert (await stream.__anext__()).type == "run_started"
+    assert await stream.__anext__() is None
+    await stream.aclose()
+
+def test_oldest_finished_runs_are_evicted():
+    bus = EventBus(max_runs=2)
+    for run_id in ["run1", "run2", "run3"]:
+        bus.publish(run_id, "run_finished")
+
+    assert not bus.has_run("run1")
+    assert bus.has_run("run3")
+
+@pytest.mark.asyncio
+async def test_eviction_skips_runs_that_are_still_streamed():
+    bus = EventBus(max_runs=2)
+    bus.publish("live", "run_started")
+    stream = bus.subscribe("live")
+    assert (await stream.__anext__()).type == "run_started"
+    bus.publish("done", "run_finished")
+
+    bus.publish("new", "run_started")
+
+    assert bus.has_run("live")
+    assert not bus.has_run("done")
+    await stream.aclose()
+
+def test_sequence_numbers_are_not_reused_after_dropped_events():
+    bus = EventBus(max_events_per_run=2)
+    sequences = [bus.publish("run1", "step_progress").sequence for _ in range(4)]
+    sequences.append(bus.publish("run1", "run_finished").sequence)
+
+    assert sequences == [1, 2, 3, 4, 5]
+    assert [event.sequence for event in bus.history("run1")] == [1, 2, 5]
+
+@pytest.mark.asyncio
+async def test_step_results_reach_live_subscribers_but_not_the_history():
+    bus = EventBus()
+    bus.publish("run1", "run_started")
+    subscriber = asyncio.create_task(collect(bus, "run1"))
+    await asyncio.sleep(0)
+    result = {"code": "x" * 1000}
+    bus.publish("run1", "step_finished", "generate", {"summary": summarize(result)}, result=result)
+    bus.publish("run1", "run_finished")
+
+    live = await asyncio.wait_for(subscriber, 1)
+    replayed = await collect(bus, "run1")
+
+    assert live[1].data["result"] is result
+    assert "result" not in replayed[1].data
+    assert bus.result("run1", "generate") is result
+    assert bus.result("run1", "validate") is None
+    assert bus.result("run2", "generate") is None
+
+def test_summarize_truncates_large_results():
+    summary = summarize({"code": "x" * 1000})
+
+    assert summary["size"] == 1011
+    assert summary["preview"].endswith("...")
+    assert len(summary["preview"]) == 503
+
+@pytest.mark.asyncio
+async def test_orchestrator_publishes_step_events():
+    bus = EventBus()
+    registry = Mock()
+    registry.execute_tool = AsyncMock(return_value=ToolResult(success=True, data={"code": "..."}, error=None, metadata={}))
+    llm = Mock()
+    llm.generate_response = AsyncMock(return_value=Mock(success=False, data=None, error="LLM unavailable"))
+    orchestrator = FormMigrationOrchestrator(llm=llm, tool_registry=registry, event_bus=bus)
+    plan = OrchestrationPlan([
+        OrchestrationStep("generate", "Generate", tool_name="test_tool"),
+        OrchestrationStep("validate", "Validate", llm_prompt="Validate")
+    ], run_id="run1")
+
+    await BaseOrchestrator.execute_plan(orchestrator, plan)
+
+    events = [(event.type, event.step) for event in bus.history("run1")]
+    assert events == [
+        ("plan_started", None),
+        ("step_started", "generate"),
+        ("step_finished", "generate"),
+        ("step_started", "validate"),
+        ("step_failed", "validate"),
+        ("plan_finished", None)
+    ]
+    assert bus.history("run1")[2].data["summary"] == {"type": "dict", "size": 14, "items": 1, "preview": '{"code":"..."}'}
+    assert bus.result("run1", "generate") == {"code": "..."}
@@ -4,10 +4,16 @@ from src.llm.orchestration import (
     OrchestrationStep,
     OrchestrationPlan,
     BaseOrchestrator,
-    FormMigrationOrchestrator
+    FormMigrationOrchestrator,
+    StepOutput,
+    resolve_refs
 )
 from src.llm.base import LLMResponse
-from src.tools.base import ToolResult
+from src.tools.base import ToolRegistry, ToolResult
+from src.tools.code_generation import CodeGenerationTool
+from src.tools.form_analysis import FormAnalysisTool
+from src.tools.result_cache import ResultCache
+from src.tools.web_navigation import WebNavigationTool
 
 @pytest.fixture
 def mock_llm():
@@ -20,20 +26,14 @@ def mock_llm():
     return llm
 
 @pytest.fixture
-def mock_tool():
-    tool = Mock()
-    tool.execute = AsyncMock(return_value=ToolResult(
+def mock_tool_registry():
+    registry = Mock()
+    registry.execute_tool = AsyncMock(return_value=ToolResult(
         success=True,
         data="Test result",
         error=None,
         metadata={}
     ))
-    return tool
-
-@pytest.fixture
-def mock_tool_registry(mock_tool):
-    registry = Mock()
-    registry.get_tool = Mock(return_value=mock_tool)
     return registry
 
 @pytest.fixture
@@ -116,7 +116,7 @@ async def test_form_migration_orchestrator_plan_creation(orchestrator):
     assert plan.steps[0].tool_params["url"] == "http://example.com/form"
 
 @pytest.mark.asyncio
-async def test_orchestrator_execute_tool_step(orchestrator, mock_tool):
+async def test_orchestrator_execute_tool_step(orchestrator, mock_tool_registry):
     step = OrchestrationStep(
         name="test_step",
         description="Test step",
@@ -126,7 +126,7 @@ async def test_orchestrator_execute_tool_step(orchestrator, mock_tool):
     
     result = await orchestrator._execute_tool_step(step)
     assert result == "Test result"
-    mock_tool.execute.assert_called_once_with({"param1": "value1"})
+    mock_tool_registry.execute_tool.assert_called_once_with("test_tool", {"param1": "value1"}, {})
 
 @pytest.mark.asyncio
 async def test_orchestrator_execute_llm_step(orchestrator, mock_llm):
@@ -165,8 +165,8 @@ async def test_orchestrator_execute_plan(orchestrator):
     assert len(results["errors"]) == 0
 
 @pytest.mark.asyncio
-async def test_orchestrator_execute_plan_with_error(orchestrator, mock_tool):
-    mock_tool.execute.side_effect = Exception("Test error")
+async def test_orchestrator_execute_plan_with_error(orchestrator, mock_tool_registry):
+    mock_tool_registry.execute_tool.return_value = ToolResult(success=False, data={}, error="Test error")
     
     steps = [
         OrchestrationStep(
@@ -191,20 +191,168 @@ async def test_orchestrator_execute_plan_with_error(orchestrator, mock_tool):
     assert "step2" not in results["results"]
 
 @pytest.mark.asyncio
-async def test_form_migration_orchestrator_context_passing(orchestrator):
+async def test_form_migration_orchestrator_context_passing(orchestrator, mock_tool_registry):
+    mock_tool_registry.execute_tool.return_value = ToolResult(
+        success=True,
+        data={"elements": [], "validation": {}, "events": {}},
+        error=None,
+        metadata={}
+    )
     context = {"form_url": "http://example.com/form"}
     plan = await orchestrator.create_plan(context)
     
-    # Mock the results of the first step
-    plan.add_result("analyze_form", {"form_data": "test data"})
-    
     # Execute the plan
     results = await orchestrator.execute_plan(plan)
     
     # Verify that the context was passed correctly
     assert results["success"] is True
     assert "analyze_form" in results["results"]
+    assert "analyze_structure" in results["results"]
     assert "validate_analysis" in results["results"]
-    assert "generate_api" in results["results"]
-    assert "generate_form" in results["results"]
-    assert "validate_output" in results["results"] 
\ No newline at end of file
+    assert "generate_code" in results["results"]
+    assert "validate_output" in results["results"] 
+
+
+def test_orchestration_plan_dependencies_default_to_previous_step():
+    plan = OrchestrationPlan([
+        OrchestrationStep("step1", "Step 1"),
+        OrchestrationStep("step2", "Step 2"),
+        OrchestrationStep("step3", "Step 3", depends_on=["step1"])
+    ])
+
+    assert plan.dependencies() == {"step1": [], "step2": ["step1"], "step3": ["step1"]}
+
+def test_orchestration_plan_rejects_circular_dependencies():
+    plan = OrchestrationPlan([
+        OrchestrationStep("step1", "Step 1", depends_on=["step2"]),
+        OrchestrationStep("step2", "Step 2", depends_on=["step1"])
+    ])
+
+    with pytest.raises(ValueError):
+        plan.topological_order()
+
+@pytest.mark.asyncio
+async def test_orchestrator_runs_independent_steps_in_parallel():
+    import asyncio
+
+    running = 0
+    peak = 0
+
+    async def slow_execute(name, params, context):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return ToolResult(success=True, data={"params": params}, error=None, metadata={})
+
+    registry = Mock()
+    registry.execute_tool = AsyncMock(side_effect=slow_execute)
+    llm = Mock()
+    llm.generate_response = AsyncMock(return_value=Mock(success=True, data="Test response"))
+    orchestrator = FormMigrationOrchestrator(llm=llm, tool_registry=registry)
+    plan = OrchestrationPlan([
+        OrchestrationStep("extract", "Extract", tool_name="test_tool"),
+        OrchestrationStep("generate_api", "API", tool_name="test_tool", depends_on=["extract"]),
+        OrchestrationStep("generate_form", "Form", tool_name="test_tool", depends_on=["extract"]),
+        OrchestrationStep("validate", "Validate", llm_prompt="Test prompt", depends_on=["generate_api", "generate_form"])
+    ])
+
+    results = await BaseOrchestrator.execute_plan(orchestrator, plan)
+
+    assert results["success"] is True
+    assert peak == 2
+    assert results["timing"]["critical_path"][0] == "extract"
+    assert results["timing"]["critical_path"][-1] == "validate"
+    assert set(results["timing"]["steps"]) == {"extract", "generate_api", "generate_form", "validate"}
+
+def test_resolve_refs_passes_objects_by_reference():
+    analysis = {"elements": [{"name": "email"}]}
+    params = {"form_data": StepOutput("analyze_form"), "first": StepOutput("analyze_form")["elements"][0]}
+
+    resolved = resolve_refs(params, {"analyze_form": analysis})
+
+    assert resolved["form_data"] is analysis
+    assert resolved["first"] is analysis["elements"][0]
+    assert isinstance(params["form_data"], StepOutput)
+    with pytest.raises(ValueError):
+        resolve_refs(params, {})
+
+def test_orchestration_plan_dependencies_include_referenced_steps():
+    plan = OrchestrationPlan([
+        OrchestrationStep("extract", "Extract", tool_name="test_tool"),
+        OrchestrationStep("lookup", "Lookup", tool_name="test_tool", depends_on=[]),
+        OrchestrationStep(
+            "generate", "Generate", tool_name="test_tool",
+            tool_params={"form_data": StepOutput("extract")}, depends_on=["lookup"]
+        )
+    ])
+
+    assert plan.dependencies()["generate"] == ["lookup", "extract"]
+
+@pytest.mark.asyncio
+async def test_form_migration_orchestrator_passes_step_outputs():
+    form_data = {"elements": [{"name": "email", "type": "email"}]}
+    analysis = {"structure": {}, "validation": {"client_side": {}}, "events": {"client_side": {}}, "summary": {}}
+    received = {}
+
+    async def execute(name, params, context):
+        received[name] = params
+        data = {"web_navigation": form_data, "form_analysis": analysis}.get(name) or {"code": params["language"]}
+        return ToolResult(success=True, data=data, error=None, metadata={})
+
+    registry = Mock()
+    registry.execute_tool = AsyncMock(side_effect=execute)
+    llm = Mock()
+    llm.generate_response = AsyncMock(return_value=Mock(success=True, data="Looks good"))
+    orchestrator = FormMigrationOrchestrator(llm=llm, tool_registry=registry)
+    plan = await orchestrator.create_plan({
+        "form_url": "http://example.com/form",
+        "form_name": "Orders",
+        "language": "java",
+        "params": {"mode": "static"}
+    })
+
+    results = await orchestrator.execute_plan(plan)
+
+    assert results["success"] is True
+    assert received["web_navigation"] == {"mode": "static", "url": "http://example.com/form"}
+    assert received["form_analysis"]["form_data"] is plan.results["analyze_form"]
+    generate = received["code_generation"]
+    assert (generate["language"], generate["framework"]) == ("java", "spring")
+    assert generate["analysis"]["form_name"] == "Orders"
+    assert generate["analysis"]["elements"] is form_data["elements"]
+    assert generate["analysis"]["validation"] is analysis["validation"]
+    prompts = [call.args[0] for call in llm.generate_response.call_args_list]
+    assert '"validation":{"client_side":{}}' in prompts[0]
+    assert '{"code":"java"}' in prompts[1]
+    assert all("{" + "analysis_results}" not in prompt for prompt in prompts)
+    assert isinstance(plan.steps[3].tool_params["analysis"]["elements"], StepOutput)
+
+@pytest.mark.asyncio
+async def test_form_migration_orchestrator_generates_code_with_real_tools(tmp_path, monkeypatch):
+    (tmp_path / "snapshots").mkdir()
+    (tmp_path / "snapshots" / "Orders.aspx").write_text(
+        "<form id='form1'><input id='txtEmail' name='txtEmail' type='email' required>"
+        "<input id='txtQty' name='txtQty' type='number' min='1'></form>"
+    )
+    monkeypatch.setenv("REPLAY_ROOT", str(tmp_path))
+    registry = ToolRegistry(ResultCache(directory=None))
+    registry.register(WebNavigationTool(browser_pool=Mock()))
+    registry.register(FormAnalysisTool())
+    registry.register(CodeGenerationTool())
+    llm = Mock()
+    llm.generate_response = AsyncMock(return_value=Mock(success=True, data="Looks good"))
+    orchestrator = FormMigrationOrchestrator(llm=llm, tool_registry=registry)
+    plan = await orchestrator.create_plan({
+        "form_url": "http://legacy.example.com/Orders.aspx",
+        "language": "python",
+        "params": {"mode": "static", "snapshot_dir": "snapshots", "use_cache": False}
+    })
+
+    results = await orchestrator.execute_plan(plan)
+
+    assert results["success"] is True, results["errors"]
+    code = results["results"]["generate_code"]
+    assert "txtEmail: EmailStr" in code["api_code"]["models"]
+    assert 'name="txtQty"' in code["html_code"]["form"]
@@ -0,0 +1,82 @@
+import io
+import json
+import zipfile
+import httpx
+import pytest
+from unittest.mock import AsyncMock, Mock
+from src import main
+from src.llm.orchestration import FormMigrationOrchestrator
+from src.tools.base import ToolRegistry
+from src.tools.code_generation import CodeGenerationTool
+from src.tools.form_analysis import FormAnalysisTool
+from src.tools.result_cache import ResultCache
+from src.tools.web_navigation import WebNavigationTool
+
+FORM = (
+    "<form id='form1'><input id='txtEmail' name='txtEmail' type='email' required>"
+    "<input id='txtQty' name='txtQty' type='number' min='1'></form>"
+)
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    (tmp_path / "snapshots").mkdir()
+    (tmp_path / "snapshots" / "Orders.aspx").write_text(FORM)
+    monkeypatch.setenv("REPLAY_ROOT", str(tmp_path))
+    registry = ToolRegistry(ResultCache(directory=None))
+    registry.register(WebNavigationTool(browser_pool=Mock()))
+    registry.register(FormAnalysisTool())
+    registry.register(CodeGenerationTool())
+    monkeypatch.setattr(main, "tool_registry", registry)
+    return registry
+
+def api_client():
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test")
+
+def parse_events(body):
+    return [json.loads(line[len("data: "):]) for line in body.splitlines() if line.startswith("data: ")]
+
+@pytest.mark.asyncio
+async def test_run_streams_step_events_and_serves_full_results(registry, monkeypatch):
+    llm = Mock()
+    llm.generate_response = AsyncMock(return_value=Mock(success=True, data="Looks good"))
+    monkeypatch.setattr(main, "orchestrator", FormMigrationOrchestrator(llm=llm, tool_registry=registry))
+
+    async with api_client() as client:
+        started = await client.post("/runs", json={
+            "url": "http://legacy.example.com/Orders.aspx",
+            "platform": "webforms",
+            "form_name": "Orders",
+            "language": "python",
+            "params": {"mode": "static", "snapshot_dir": "snapshots", "use_cache": False}
+        })
+        run_id = started.json()["run_id"]
+        events = parse_events((await client.get(f"/runs/{run_id}/events")).text)
+        result = await client.get(f"/runs/{run_id}/steps/generate_code/result")
+        missing = await client.get(f"/runs/{run_id}/steps/missing/result")
+
+    assert started.status_code == 202
+    assert events[-1]["type"] == "run_finished"
+    finished = [event["step"] for event in events if event["type"] == "step_finished"]
+    assert set(finished) == {"analyze_form", "analyze_structure", "validate_analysis", "generate_code", "validate_output"}
+    assert result.status_code == 200
+    assert "txtEmail: EmailStr" in result.json()["api_code"]["models"]
+    assert missing.status_code == 404
+
+@pytest.mark.asyncio
+async def test_batch_archive_contains_the_forms_fields(registry):
+    async with api_client() as client:
+        response = await client.post("/generate/batch", json={
+            "urls": ["http://legacy.example.com/Orders.aspx"],
+            "targets": [{"language": "python", "framework": "fastapi"}, {"language": "java", "framework": "spring"}],
+            "params": {"mode": "static", "snapshot_dir": "snapshots", "use_cache": False},
+            "format": "zip"
+        })
+
+    assert response.status_code == 200
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    files = {name: archive.read(name).decode("utf-8") for name in archive.namelist()}
+    assert not [name for name in files if name.endswith("ERROR.txt")]
+    models = {name.split("/")[-3]: content for name, content in files.items() if "/api/models." in name}
+    assert "txtEmail: EmailStr" in models["python-fastapi"]
+    assert "private String txtEmail;" in models["java-spring"]
+    assert any('name="txtQty"' in content for name, content in files.items() if name.endswith("web/form.html"))
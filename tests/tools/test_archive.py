@@ -0,0 +1,116 @@
+import gzip
+import io
+import tarfile
+import zipfile
+import pytest
+from jinja2 import DictLoader, Environment, TemplateNotFound
+from src.tools import archive
+from src.tools.archive import ArchiveWriter, archive_path_for, compress_chunks, iter_archive, negotiate_encoding
+from src.tools.code_generation import CodeGenerationTool
+
+FILES = [
+    ("form/api/main.py", ["import fastapi\n", "app = fastapi.FastAPI()\n"]),
+    ("form/web/form.html", iter(["<form>", "</form>"]))
+]
+
+def test_zip_archive_streams_files_from_chunks():
+    chunks = list(iter_archive(FILES, "zip"))
+
+    assert len(chunks) > 1
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as zf:
+        assert zf.namelist() == ["form/api/main.py", "form/web/form.html"]
+        assert zf.read("form/api/main.py") == b"import fastapi\napp = fastapi.FastAPI()\n"
+        assert zf.read("form/web/form.html") == b"<form></form>"
+
+def test_tar_gz_archive_round_trip():
+    writer = ArchiveWriter("tar.gz")
+    data = b"".join(writer.add("form/api/main.py", ["print('hi')\n"])) + writer.close()
+
+    with tarfile.open(fileobj=io.BytesIO(data), mode="r:gz") as tf:
+        assert tf.extractfile("form/api/main.py").read() == b"print('hi')\n"
+
+def test_unknown_archive_format_is_rejected():
+    with pytest.raises(ValueError):
+        ArchiveWriter("rar")
+
+def test_zip_archive_stays_valid_when_a_file_fails_to_render():
+    def failing():
+        yield "partial"
+        raise ValueError("render failed")
+
+    writer = ArchiveWriter("zip")
+    written = []
+    with pytest.raises(ValueError):
+        for data in writer.add("form/api/main.py", failing()):
+            written.append(data)
+    written.extend(writer.add("form/ERROR.txt", ["render failed\n"]))
+    written.append(writer.close())
+
+    with zipfile.ZipFile(io.BytesIO(b"".join(written))) as zf:
+        assert zf.namelist() == ["form/api/main.py", "form/ERROR.txt"]
+        assert zf.read("form/ERROR.txt") == b"render failed\n"
+
+def test_archive_path_for_url():
+    path = archive_path_for("https://example.com/Orders/Edit.aspx?id=3")
+
+    assert path.startswith("example.com_Orders_Edit.aspx_id_3_")
+    assert path == archive_path_for("https://example.com/Orders/Edit.aspx?id=3")
+
+def test_archive_path_for_keeps_similar_urls_apart():
+    assert archive_path_for("http://example.com/x?y=1") != archive_path_for("http://example.com/x/y/1")
+    assert len(archive_path_for("http://example.com/" + "a" * 500)) <= 110
+
+def test_negotiate_encoding(monkeypatch):
+    monkeypatch.setattr(archive, "brotli", None)
+
+    assert negotiate_encoding("gzip, deflate, br") == "gzip"
+    assert negotiate_encoding("gzip;q=0, identity") is None
+    assert negotiate_encoding("*") == "gzip"
+    assert negotiate_encoding(None) is None
+
+def test_negotiate_encoding_prefers_brotli_when_installed(monkeypatch):
+    monkeypatch.setattr(archive, "brotli", object())
+
+    assert negotiate_encoding("gzip, br") == "br"
+    assert negotiate_encoding("gzip, br;q=0") == "gzip"
+
+def test_gzip_stream_decompresses_to_input():
+    lines = ['{"url": "a"}\n', '{"url": "b"}\n']
+
+    compressed = list(compress_chunks(lines, "gzip"))
+
+    assert len(compressed) == 3
+    assert gzip.decompress(b"".join(compressed)).decode("utf-8") == "".join(lines)
+
+def test_iter_artifacts_lays_out_project_lazily():
+    tool = CodeGenerationTool()
+    tool.template_env = Environment(loader=DictLoader({
+        name: "{{ fields | length }} fields"
+        for name in [
+            "api_java_spring.jinja2", "models_java.jinja2", "routes_java_spring.jinja2", "html_form.jinja2",
+            "styles.jinja2", "scripts.jinja2", "validation_java.jinja2", "error_handlers_java.jinja2",
+            "events_java.jinja2", "event_utilities_java.jinja2"
+        ]
+    }))
+    analysis = {"form_name": "Orders", "elements": [{"name": "id", "type": "number"}]}
+
+    files = dict(tool.iter_artifacts(analysis, "java", "spring", prefix="orders/java-spring/"))
+
+    assert "orders/java-spring/api/main.java" in files
+    assert "orders/java-spring/web/form.html" in files
+    assert len(files) == 10
+    assert "".join(files["orders/java-spring/api/models.java"]) == "1 fields"
+
+def test_iter_artifacts_fails_before_yielding_when_a_template_is_missing():
+    tool = CodeGenerationTool()
+    tool.template_env = Environment(loader=DictLoader({"html_form.jinja2": ""}))
+
+    with pytest.raises(TemplateNotFound):
+        next(tool.iter_artifacts({"elements": []}, "csharp", "aspnetcore"))
+
+def test_missing_templates_lists_unknown_targets():
+    tool = CodeGenerationTool()
+    tool.template_env = Environment(loader=DictLoader({"api_csharp_aspnet.jinja2": "", "routes_csharp_aspnet.jinja2": ""}))
+
+    assert "api_csharp_aspnetcore.jinja2" in tool.missing_templates("csharp", "aspnetcore")
+    assert "api_csharp_aspnet.jinja2" not in tool.missing_templates("csharp", "aspnet")
@@ -0,0 +1,135 @@
+import asyncio
+import os
+import time
+import httpx
+import pytest
+from unittest.mock import Mock
+from src.tools.auth_session import AuthSessionStore, LoginSpec, cookie_header, is_login_page
+from src.tools.static_extraction import StaticFormExtractor
+from src.tools.web_navigation import WebNavigationTool
+
+ORIGIN = "http://legacy.example.com"
+
+def make_state(value="abc", expires=-1):
+    return {
+        "cookies": [
+            {"name": ".ASPXAUTH", "value": value, "domain": "legacy.example.com", "path": "/", "expires": expires},
+            {"name": "other", "value": "x", "domain": "other.example.com", "path": "/", "expires": -1}
+        ],
+        "origins": []
+    }
+
+@pytest.fixture
+def store(tmp_path):
+    return AuthSessionStore(directory=str(tmp_path))
+
+def test_login_spec_from_params():
+    assert LoginSpec.from_params({"url": ORIGIN}) is None
+
+    login = LoginSpec.from_params({
+        "username": "admin",
+        "password": "secret",
+        "login_url": "/Account/Login.aspx",
+        "submit_selector": "#btnLogin"
+    })
+
+    assert login.submit_selector == "#btnLogin"
+    assert login.redirected_to_login(f"{ORIGIN}/account/login.aspx", f"{ORIGIN}/Orders.aspx")
+    assert not login.redirected_to_login(f"{ORIGIN}/Orders.aspx", f"{ORIGIN}/Orders.aspx")
+
+def test_is_login_page_detects_return_url():
+    assert is_login_page(f"{ORIGIN}/Login.aspx?ReturnUrl=%2fOrders.aspx")
+    assert not is_login_page(f"{ORIGIN}/Orders.aspx?id=3")
+
+def test_cookie_header_matches_domain_and_path():
+    assert cookie_header(make_state(), f"{ORIGIN}/Orders.aspx") == ".ASPXAUTH=abc"
+    assert cookie_header(make_state(), "http://unrelated.example.org/") is None
+
+@pytest.mark.asyncio
+async def test_session_logs_in_once_and_reuses_state(store):
+    logins = []
+
+    async def fake_login(browser_pool, url, login):
+        logins.append(url)
+        await asyncio.sleep(0.01)
+        return make_state(f"v{len(logins)}")
+
+    store._login = fake_login
+    login = LoginSpec(username="admin", password="secret")
+
+    states = await asyncio.gather(*[
+        store.session(Mock(), f"{ORIGIN}/Page{i}.aspx", login) for i in range(5)
+    ])
+
+    assert len(logins) == 1
+    assert all(state == states[0] for state in states)
+    assert store.load(ORIGIN, login) == states[0]
+    assert oct(os.stat(store.state_path(ORIGIN, login)).st_mode & 0o777) == "0o600"
+
+    # A stale session is replaced once; a state already refreshed is reused
+    fresh = await store.session(Mock(), f"{ORIGIN}/Page1.aspx", login, stale=states[0])
+    assert fresh == make_state("v2")
+    assert await store.session(Mock(), ORIGIN, login, stale=states[0]) == fresh
+    assert len(logins) == 2
+
+@pytest.mark.asyncio
+async def test_sessions_are_not_shared_between_users(store):
+    async def fake_login(browser_pool, url, login):
+        return make_state(login.username)
+
+    store._login = fake_login
+    admin = LoginSpec(username="admin", password="secret")
+    clerk = LoginSpec(username="clerk", password="secret")
+    guessed = LoginSpec(username="admin", password="guess")
+
+    assert (await store.session(Mock(), ORIGIN, admin)) == make_state("admin")
+    assert store.load(ORIGIN, clerk) is None
+    assert store.load(ORIGIN, guessed) is None
+    assert (await store.session(Mock(), ORIGIN, clerk)) == make_state("clerk")
+    assert store.load(ORIGIN, admin) == make_state("admin")
+    assert "secret" not in store.state_path(ORIGIN, admin)
+
+    store.invalidate(ORIGIN, admin)
+    assert store.load(ORIGIN, admin) is None
+    assert store.load(ORIGIN, clerk) == make_state("clerk")
+
+def test_load_ignores_expired_state(store):
+    login = LoginSpec(username="admin", password="secret")
+    store._save(ORIGIN, login, make_state(expires=time.time() - 10))
+    assert store.load(ORIGIN, login) is None
+
+    store._save(ORIGIN, login, make_state())
+    old = time.time() - store.max_age - 1
+    os.utime(store.state_path(ORIGIN, login), (old, old))
+    assert store.load(ORIGIN, login) is None
+
+@pytest.mark.asyncio
+async def test_static_extraction_reauthenticates_on_login_redirect(store):
+    page = b"<html><body><form id='form1'><input name='txtName'></form></body></html>"
+    login_page = b"<html><body><form id='form1'><input type='password' name='pwd'></form></body></html>"
+
+    def handler(request):
+        if request.url.path == "/Login.aspx":
+            return httpx.Response(200, content=login_page)
+        if request.headers.get("Cookie") == ".ASPXAUTH=v2":
+            return httpx.Response(200, content=page)
+        return httpx.Response(302, headers={"Location": "/Login.aspx?ReturnUrl=%2fOrders.aspx"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=True)
+    logins = []
+
+    async def fake_login(browser_pool, url, login):
+        logins.append(url)
+        return make_state(f"v{len(logins)}")
+
+    store._login = fake_login
+    tool = WebNavigationTool(browser_pool=Mock(), static_extractor=StaticFormExtractor(client), auth_store=store)
+
+    result = await tool.execute(
+        {"url": f"{ORIGIN}/Orders.aspx", "mode": "static", "username": "admin", "password": "secret"},
+        {}
+    )
+
+    assert result.success, result.error
+    assert [e["name"] for e in result.data["elements"]] == ["txtName"]
+    assert len(logins) == 2
@@ -0,0 +1,65 @@
+import pytest
+from unittest.mock import Mock, AsyncMock, patch
+from src.tools.browser_pool import BrowserPool, BrowserPoolConfig
+
+def make_browser():
+    context = Mock()
+    context.pages = []
+    context.close = AsyncMock()
+    browser = Mock()
+    browser.is_connected = Mock(return_value=True)
+    browser.new_context = AsyncMock(return_value=context)
+    browser.close = AsyncMock()
+    return browser
+
+@pytest.fixture
+def mock_playwright():
+    playwright = Mock()
+    playwright.chromium.launch = AsyncMock(side_effect=lambda **kwargs: make_browser())
+    playwright.stop = AsyncMock()
+    starter = Mock()
+    starter.start = AsyncMock(return_value=playwright)
+    with patch("src.tools.browser_pool.async_playwright", return_value=starter):
+        yield playwright
+
+@pytest.mark.asyncio
+async def test_browser_pool_reuses_warm_browsers(mock_playwright):
+    pool = BrowserPool(BrowserPoolConfig(size=2, max_contexts=4))
+    await pool.start()
+
+    async with pool.context() as first:
+        async with pool.context() as second:
+            assert first is not None and second is not None
+            assert pool.stats()["active_contexts"] == 2
+
+    assert mock_playwright.chromium.launch.call_count == 2
+    assert pool.stats()["active_contexts"] == 0
+
+    await pool.stop()
+    mock_playwright.stop.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_browser_pool_recycles_after_page_limit(mock_playwright):
+    pool = BrowserPool(BrowserPoolConfig(size=1, recycle_after_pages=1))
+    await pool.start()
+    original = pool._browsers[0]
+
+    async with pool.context():
+        pool._count_page(original)
+
+    assert pool._browsers[0] is not original
+    original.browser.close.assert_called_once()
+    await pool.stop()
+
+@pytest.mark.asyncio
+async def test_browser_pool_replaces_disconnected_browser(mock_playwright):
+    pool = BrowserPool(BrowserPoolConfig(size=1))
+    await pool.start()
+    pool._browsers[0].browser.is_connected.return_value = False
+
+    async with pool.context():
+        pass
+
+    assert pool._browsers[0].is_healthy()
+    assert mock_playwright.chromium.launch.call_count == 2
+    await pool.stop()
@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+from src.tools.base import BaseTool, ToolConfig, ToolRegistry, ToolResult
+from src.tools.crawler import CrawlConfig, FormCrawler
+from src.tools.result_cache import ResultCache
+
+SITE = {
+    "http://legacy.example.com/Default.aspx": [
+        "http://legacy.example.com/Customers.aspx",
+        "http://legacy.example.com/Orders.aspx#top",
+        "http://other.example.net/Tracking.aspx",
+        "http://legacy.example.com/logo.png"
+    ],
+    "http://legacy.example.com/Customers.aspx": ["http://legacy.example.com/Default.aspx"],
+    "http://legacy.example.com/Orders.aspx": []
+}
+
+class SiteTool(BaseTool):
+    """Web navigation stand-in serving SITE, optionally failing a URL's first attempts."""
+
+    def __init__(self, active=None, flaky=None):
+        super().__init__(ToolConfig(name="web_navigation", description="Site", retry_delay=0))
+        self.active = active
+        self.flaky = dict(flaky or {})
+        self.calls = 0
+
+    async def execute(self, params, context):
+        self.calls += 1
+        if self.active is not None:
+            self.active["now"] += 1
+            self.active["peak"] = max(self.active["peak"], self.active["now"])
+        await asyncio.sleep(0.01)
+        if self.active is not None:
+            self.active["now"] -= 1
+        if self.flaky.get(params["url"]):
+            self.flaky[params["url"]] -= 1
+            raise ConnectionError("reset")
+        metadata = {"url": params["url"]}
+        if params.get("collect_links"):
+            metadata["links"] = SITE.get(params["url"], [])
+        return ToolResult(success=True, data={"elements": []}, metadata=metadata)
+
+    async def validate_params(self, params):
+        return "url" in params
+
+    async def cleanup(self):
+        pass
+
+def make_registry(tool=None):
+    registry = ToolRegistry(ResultCache(directory=None))
+    registry.register(tool or SiteTool())
+    return registry
+
+@pytest.mark.asyncio
+async def test_crawler_discovers_same_origin_links():
+    crawler = FormCrawler(make_registry(), CrawlConfig(politeness_delay=0))
+
+    results = [r async for r in crawler.crawl(seed_url="http://legacy.example.com/Default.aspx")]
+
+    assert sorted(r.url for r in results) == sorted(SITE)
+    assert all(r.result.success for r in results)
+    assert {r.url: r.depth for r in results}["http://legacy.example.com/Orders.aspx"] == 1
+
+@pytest.mark.asyncio
+async def test_crawler_respects_per_host_concurrency():
+    active = {"now": 0, "peak": 0}
+    crawler = FormCrawler(
+        make_registry(SiteTool(active)),
+        CrawlConfig(max_concurrency=8, per_host_concurrency=2, politeness_delay=0, discover_links=False)
+    )
+    urls = [f"http://legacy.example.com/Page{i}.aspx" for i in range(10)]
+
+    results = [r async for r in crawler.crawl(urls=urls)]
+
+    assert len(results) == 10
+    assert active["peak"] <= 2
+
+@pytest.mark.asyncio
+async def test_crawler_honors_max_pages():
+    crawler = FormCrawler(make_registry(), CrawlConfig(politeness_delay=0, max_pages=2))
+
+    results = [r async for r in crawler.crawl(seed_url="http://legacy.example.com/Default.aspx")]
+
+    assert len(results) == 2
+
+@pytest.mark.asyncio
+async def test_crawler_pages_go_through_the_registry_policies():
+    tool = SiteTool(flaky={"http://legacy.example.com/Orders.aspx": 1})
+    registry = make_registry(tool)
+    crawler = FormCrawler(registry, CrawlConfig(politeness_delay=0, discover_links=False))
+
+    results = [r async for r in crawler.crawl(urls=["http://legacy.example.com/Orders.aspx"])]
+
+    assert results[0].result.success
+    assert tool.calls == 2
+    assert registry.get_metrics()["web_navigation"]["retries"] == 1
@@ -0,0 +1,78 @@
+import httpx
+import pytest
+from src.tools.dom_diff import FingerprintStore, diff_elements, fingerprint
+from src.tools.static_extraction import StaticFormExtractor
+from src.tools.web_navigation import WebNavigationTool
+
+def element(name, **fields):
+    return {"name": name, "tag": "input", "type": "text", "form": "form1", "frame": None, "attributes": {}, **fields}
+
+def test_fingerprint_ignores_volatile_state_fields():
+    before = fingerprint("http://legacy.example.com/", [element("__VIEWSTATE", value="abc"), element("txtName")])
+    after = fingerprint("http://legacy.example.com/", [element("__VIEWSTATE", value="xyz"), element("txtName")])
+
+    assert before.digest == after.digest
+
+def test_diff_elements_reports_added_removed_and_changed():
+    url = "http://legacy.example.com/"
+    previous = fingerprint(url, [element("txtName"), element("txtPhone"), element("txtEmail")])
+    elements = [element("txtName"), element("txtEmail", required=True), element("txtFax")]
+
+    diff = diff_elements(previous, fingerprint(url, elements), elements)
+
+    assert diff["baseline"] is False
+    assert diff["unchanged"] is False
+    assert [e["name"] for e in diff["added"]] == ["txtFax"]
+    assert [e["name"] for e in diff["changed"]] == ["txtEmail"]
+    assert diff["removed"] == ["|form1|input|txtPhone"]
+
+def test_diff_elements_tells_radio_options_apart():
+    url = "http://legacy.example.com/"
+
+    def shipping(checked):
+        return [
+            element("rblShipping", type="radio", value=value, attributes={"checked": ""} if value == checked else {})
+            for value in ["sea", "rail", "air"]
+        ]
+
+    previous = fingerprint(url, shipping("sea"))
+    elements = shipping("rail")
+
+    diff = diff_elements(previous, fingerprint(url, elements), elements)
+
+    assert len(previous.controls) == 3
+    assert diff["unchanged"] is False
+    assert [e["value"] for e in diff["changed"]] == ["sea", "rail"]
+    assert diff["added"] == [] and diff["removed"] == []
+
+@pytest.mark.asyncio
+async def test_fingerprint_store_round_trip(tmp_path):
+    store = FingerprintStore(str(tmp_path))
+    page_fingerprint = fingerprint("http://legacy.example.com/", [element("txtName")])
+
+    assert await store.load(page_fingerprint.url) is None
+    await store.save(page_fingerprint)
+    assert await store.load(page_fingerprint.url) == page_fingerprint
+
+@pytest.mark.asyncio
+async def test_web_navigation_tool_incremental_recrawl(tmp_path):
+    pages = [
+        b"<html><body><form id='form1'><input name='txtName'><input name='txtPhone'></form></body></html>",
+        b"<html><body><form id='form1'><input name='txtName'><input name='txtPhone'></form></body></html>",
+        b"<html><body><form id='form1'><input name='txtName' required><input name='txtFax'></form></body></html>"
+    ]
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=pages.pop(0))))
+    tool = WebNavigationTool(static_extractor=StaticFormExtractor(client), fingerprint_store=FingerprintStore(str(tmp_path)))
+    params = {"url": "http://legacy.example.com/Edit.aspx", "mode": "static", "incremental": True}
+
+    first = await tool.execute(params, {})
+    second = await tool.execute(params, {})
+    third = await tool.execute(params, {})
+
+    assert first.data["diff"]["baseline"] is True
+    assert len(first.data["diff"]["added"]) == 2
+    assert second.data["diff"]["unchanged"] is True
+    assert second.metadata["fingerprint"] == first.metadata["fingerprint"]
+    assert [e["name"] for e in third.data["diff"]["added"]] == ["txtFax"]
+    assert [e["name"] for e in third.data["diff"]["changed"]] == ["txtName"]
+    assert third.data["diff"]["removed"] == ["|form1|input|txtPhone"]
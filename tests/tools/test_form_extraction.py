@@ -0,0 +1,103 @@
+import re
+import pytest
+from playwright.async_api import async_playwright
+from src.tools.form_extraction import (
+    ELEMENT_COLUMNS,
+    EVENT_HANDLER_NAMES,
+    FORM_WALKER_SCRIPT,
+    NO_FORM_KEY,
+    decode_element_rows
+)
+
+ALL_HANDLERS = " ".join(f'{name}="void 0"' for name in EVENT_HANDLER_NAMES)
+
+# One of every element kind the walker handles: typed and untyped inputs,
+# select, textarea, labels, fieldsets, handlers on controls and on plain
+# elements, postback handlers and links, controls outside any form, a form
+# without an id and a form inside an open shadow root.
+WALKER_FIXTURE = f"""
+<form id="orders">
+    <fieldset id="customerSet">
+        <legend>Customer</legend>
+        <label for="txtName">Name</label>
+        <input id="txtName" name="txtName" value="Ada" required placeholder="Full name"
+               class="wide" maxlength="40" pattern="[A-Za-z ]+">
+        <input id="txtAge" name="txtAge" type="number" min="18" max="99">
+        <input id="txtCode" name="txtCode" readonly>
+    </fieldset>
+    <input id="chkTerms" name="chkTerms" type="CHECKBOX" disabled>
+    <select id="ddlCountry" name="ddlCountry" onchange="__doPostBack('ddlCountry','')">
+        <option value="us" selected>United States</option>
+        <option value="ca">Canada</option>
+    </select>
+    <textarea id="txtNotes" name="txtNotes"></textarea>
+    <div id="panel" {ALL_HANDLERS}></div>
+    <a id="lnkNext" href="javascript:__doPostBack('gvOrders','Page$2')">Next</a>
+</form>
+<form name="unnamed"><input name="q"></form>
+<input id="search" name="search" onblur="void 0">
+<div id="host"></div>
+<script>
+    document.getElementById('host').attachShadow({{mode: 'open'}}).innerHTML =
+        '<form id="shadowForm"><input id="shadowField" name="shadowField" onclick="void 0"></form>';
+</script>
+"""
+
+@pytest.fixture
+async def page():
+    async with async_playwright() as p:
+        browser = await p.chromium.launch()
+        page = await browser.new_page()
+        yield page
+        await browser.close()
+
+def test_walker_has_an_extractor_for_every_column():
+    extractors = FORM_WALKER_SCRIPT[FORM_WALKER_SCRIPT.index("const extractors"):FORM_WALKER_SCRIPT.index("const getters")]
+
+    assert set(re.findall(r"^        (\w+):", extractors, flags=re.MULTILINE)) == set(ELEMENT_COLUMNS)
+
+@pytest.mark.asyncio
+async def test_walker_collects_every_element_kind_in_one_pass(page):
+    await page.set_content(WALKER_FIXTURE)
+
+    payload = await page.evaluate(FORM_WALKER_SCRIPT, [ELEMENT_COLUMNS, EVENT_HANDLER_NAMES, None, NO_FORM_KEY])
+    elements = {element["name"]: element for element in decode_element_rows(payload["elements"])}
+
+    assert list(elements) == ["txtName", "txtAge", "txtCode", "chkTerms", "ddlCountry", "txtNotes", "q", "search", "shadowField"]
+    name = elements["txtName"]
+    assert (name["tag"], name["type"], name["value"], name["required"]) == ("input", "text", "Ada", True)
+    assert (name["placeholder"], name["class"], name["maxlength"], name["pattern"]) == ("Full name", "wide", "40", "[A-Za-z ]+")
+    assert (name["label"], name["fieldset"], name["form"]) == ("Name", "Customer", "orders")
+    assert (elements["txtAge"]["type"], elements["txtAge"]["min"], elements["txtAge"]["max"]) == ("number", "18", "99")
+    assert elements["txtCode"]["readonly"] is True
+    assert (elements["chkTerms"]["type"], elements["chkTerms"]["disabled"]) == ("checkbox", True)
+    assert elements["ddlCountry"]["type"] == "select"
+    assert elements["ddlCountry"]["options"] == [
+        {"value": "us", "label": "United States", "selected": True},
+        {"value": "ca", "label": "Canada", "selected": False}
+    ]
+    assert elements["txtNotes"]["type"] == "textarea"
+    assert elements["q"]["form"] == "unnamed"
+    assert elements["search"]["form"] is None
+    assert elements["shadowField"]["form"] == "shadowForm"
+    assert elements["txtName"]["attributes"]["maxlength"] == "40"
+
+    rules = payload["validation"]
+    assert set(rules) == {"orders", "default", NO_FORM_KEY, "shadowForm"}
+    assert rules["orders"]["txtName"]["required"] is True
+    assert rules["orders"]["txtAge"]["min"] == "18"
+    assert "search" in rules[NO_FORM_KEY]
+
+    handlers = payload["handlers"]
+    # Every handler in the table that the browser exposes as a property is found
+    supported = await page.evaluate("(names) => names.filter(name => name in HTMLElement.prototype)", EVENT_HANDLER_NAMES)
+    assert handlers["orders"]["panel"] == {name: True for name in supported}
+    assert "onclick" in supported and "onsubmit" in supported
+    assert handlers["orders"]["ddlCountry"] == {"onchange": True}
+    assert handlers[NO_FORM_KEY]["search"] == {"onblur": True}
+    assert handlers["shadowForm"]["shadowField"] == {"onclick": True}
+
+    assert payload["postbacks"] == [
+        "__doPostBack('ddlCountry','')",
+        "javascript:__doPostBack('gvOrders','Page$2')"
+    ]
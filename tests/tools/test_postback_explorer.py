@@ -0,0 +1,91 @@
+import pytest
+from unittest.mock import Mock
+from src.tools.dom_diff import fingerprint
+from src.tools.postback_explorer import ExplorationConfig, ExploredState, PostbackExplorer
+from src.tools.static_extraction import extract_from_html
+
+URL = "http://legacy.example.com/Customer.aspx"
+
+def page(*extra_fields):
+    fields = "".join(f"<input name='{name}'>" for name in extra_fields)
+    form_data, _ = extract_from_html(f"""
+        <html><body><form id="form1">
+            <select name="ddlCountry" onchange="javascript:setTimeout('__doPostBack(\\'ddlCountry\\',\\'\\')', 0)">
+                <option value="">Choose</option>
+                <option value="US">United States</option>
+                <option value="CA">Canada</option>
+            </select>
+            <a href="javascript:__doPostBack('lnkAdvanced','')">Advanced</a>
+            <a href="javascript:__doPostBack('btnSave','')">Save</a>
+            {fields}
+        </form></body></html>
+    """.encode("utf-8"))
+    return form_data
+
+def test_candidate_actions_drive_autopostback_controls_and_skip_saves():
+    explorer = PostbackExplorer(Mock())
+
+    actions = explorer.candidate_actions(page())
+
+    assert actions == [
+        {"action": "select", "control": "ddlCountry", "value": "US"},
+        {"action": "select", "control": "ddlCountry", "value": "CA"},
+        {"action": "postback", "target": "lnkAdvanced", "argument": ""}
+    ]
+
+def test_skip_targets_match_whole_action_words_only():
+    explorer = PostbackExplorer(Mock())
+
+    skipped = ["btnSave", "ctl00$MainContent$btnUpdate", "lnkDelete", "UpdateButton", "btnsave", "Submit1"]
+    driven = ["UpdatePanel1", "ctl00$MainContent$upOrders", "upOrders$UpdateProgress", "txtUpdatedBy", "gvOrders"]
+
+    assert [target for target in skipped if not explorer._skip_targets.search(target)] == []
+    assert [target for target in driven if explorer._skip_targets.search(target)] == []
+
+def reveal(path):
+    fields = []
+    for action in path:
+        if action.get("value") == "US":
+            fields.append("txtState")
+        if action.get("value") == "CA":
+            fields.append("txtProvince")
+        if action.get("target") == "lnkAdvanced":
+            fields.append("txtNotes")
+    return page(*sorted(set(fields)))
+
+@pytest.mark.asyncio
+async def test_explore_unions_fields_with_revealing_conditions():
+    explorer = PostbackExplorer(Mock(), ExplorationConfig(max_depth=2))
+    visited = []
+
+    async def fake_visit(url, params, path, context_options, semaphore):
+        visited.append(path)
+        form_data = reveal(path)
+        return ExploredState(fingerprint=fingerprint(url, form_data["elements"]).digest, path=path, form_data=form_data)
+
+    explorer._visit = fake_visit
+    result = await explorer.explore(URL, {}, page())
+
+    fields = {field["name"]: field["conditions"] for field in result["fields"]}
+    assert fields["ddlCountry"] == []
+    assert fields["txtState"][0] == [{"action": "select", "control": "ddlCountry", "value": "US"}]
+    assert [{"action": "postback", "target": "lnkAdvanced", "argument": ""}] in fields["txtNotes"]
+    # Deduplicated by fingerprint: "US then Advanced" and "Advanced then US" are one state
+    fingerprints = [state["fingerprint"] for state in result["states"]]
+    assert len(fingerprints) == len(set(fingerprints))
+    assert len(result["states"]) < len(visited) + 1
+    assert result["truncated"] is None
+
+@pytest.mark.asyncio
+async def test_explore_stops_at_state_budget():
+    explorer = PostbackExplorer(Mock(), ExplorationConfig(max_states=2))
+
+    async def fake_visit(url, params, path, context_options, semaphore):
+        form_data = reveal(path)
+        return ExploredState(fingerprint=fingerprint(url, form_data["elements"]).digest, path=path, form_data=form_data)
+
+    explorer._visit = fake_visit
+    result = await explorer.explore(URL, {}, page())
+
+    assert len(result["states"]) == 2
+    assert result["truncated"] == "max_states"
@@ -0,0 +1,92 @@
+import asyncio
+import base64
+import json
+import pytest
+from collections import OrderedDict
+from unittest.mock import Mock
+from src.tools import replay
+from src.tools.replay import ReplayStore, get_replay_store
+from src.tools.web_navigation import WebNavigationTool
+
+PAGE = b"<html><body><form id='form1'><input name='txtName' required></form></body></html>"
+
+@pytest.fixture
+def snapshot_dir(tmp_path):
+    (tmp_path / "legacy.example.com" / "App").mkdir(parents=True)
+    (tmp_path / "legacy.example.com" / "App" / "Default.aspx").write_bytes(PAGE)
+    (tmp_path / "index.html").write_bytes(PAGE)
+    return tmp_path
+
+@pytest.fixture
+def har_path(tmp_path):
+    har = {"log": {"entries": [
+        {
+            "request": {"method": "GET", "url": "http://legacy.example.com/Orders.aspx"},
+            "response": {
+                "status": 200,
+                "headers": [{"name": "Content-Type", "value": "text/html"}, {"name": "Content-Encoding", "value": "gzip"}],
+                "content": {"text": base64.b64encode(PAGE).decode("ascii"), "encoding": "base64"}
+            }
+        }
+    ]}}
+    path = tmp_path / "corpus.har"
+    path.write_text(json.dumps(har))
+    return str(path)
+
+def test_replay_store_resolves_saved_pages(snapshot_dir):
+    store = ReplayStore(snapshot_dir=str(snapshot_dir))
+
+    assert store.resolve("http://legacy.example.com/App/Default.aspx#top").body == PAGE
+    assert store.resolve("http://other.example.com/").body == PAGE
+    assert store.resolve("http://legacy.example.com/Missing.aspx") is None
+    assert store.resolve("http://legacy.example.com/../../etc/passwd") is None
+
+def test_replay_store_indexes_har_entries(har_path):
+    store = ReplayStore(har_path=har_path)
+
+    response = store.resolve("http://legacy.example.com/Orders.aspx")
+
+    assert response.body == PAGE
+    assert response.headers == {"content-type": "text/html"}
+
+@pytest.mark.asyncio
+async def test_web_navigation_tool_static_replay_is_offline(snapshot_dir, monkeypatch):
+    monkeypatch.setenv("REPLAY_ROOT", str(snapshot_dir.parent))
+    tool = WebNavigationTool(browser_pool=Mock())
+
+    result = await tool.execute({
+        "url": "http://legacy.example.com/App/Default.aspx",
+        "mode": "static",
+        "snapshot_dir": snapshot_dir.name
+    }, {})
+
+    assert result.success is True
+    assert result.data["elements"][0]["name"] == "txtName"
+    assert result.metadata["source"] == "static"
+
+@pytest.mark.asyncio
+async def test_replay_paths_must_stay_below_the_replay_root(tmp_path, monkeypatch):
+    monkeypatch.setenv("REPLAY_ROOT", str(tmp_path / "replay"))
+    (tmp_path / "replay" / "site").mkdir(parents=True)
+
+    assert (await get_replay_store({"snapshot_dir": "site"})).snapshot_dir == str(tmp_path / "replay" / "site")
+    for path in ["/etc", "../secrets", "site/../../replay-other"]:
+        with pytest.raises(ValueError):
+            await get_replay_store({"snapshot_dir": path})
+    with pytest.raises(ValueError):
+        await get_replay_store({"har_path": str(tmp_path / "corpus.har")})
+
+@pytest.mark.asyncio
+async def test_replay_store_cache_is_bounded_and_closes_evicted_clients(tmp_path, monkeypatch):
+    monkeypatch.setenv("REPLAY_ROOT", str(tmp_path))
+    monkeypatch.setattr(replay, "_stores", OrderedDict())
+    clients = []
+    for index in range(replay.MAX_REPLAY_STORES + 2):
+        (tmp_path / f"site{index}").mkdir()
+        store = await get_replay_store({"snapshot_dir": f"site{index}"})
+        clients.append(store.http_client())
+
+    assert len(replay._stores) == replay.MAX_REPLAY_STORES
+    assert (None, str(tmp_path / "site0")) not in replay._stores
+    assert [client.is_closed for client in clients[:3]] == [True, True, False]
+    await asyncio.gather(*(store.close() for store in replay._stores.values()))
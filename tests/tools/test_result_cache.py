@@ -0,0 +1,151 @@
+import asyncio
+import os
+import time
+import pytest
+from typing import Any, Dict
+from src.tools.base import BaseTool, ToolConfig, ToolRegistry, ToolResult
+from src.tools.result_cache import ResultCache
+
+class CountingTool(BaseTool):
+    """Tool that fails its first call and succeeds afterwards."""
+
+    def __init__(self):
+        super().__init__(ToolConfig(name="counting", description="Counting tool", cache_enabled=True))
+        self.calls = 0
+
+    async def execute(self, params: Dict[str, Any], context: Dict[str, Any]) -> ToolResult:
+        self.calls += 1
+        if self.calls == 1:
+            return ToolResult(success=False, data={}, error="bad input")
+        return ToolResult(success=True, data={"calls": self.calls})
+
+    async def validate_params(self, params: Dict[str, Any]) -> bool:
+        return True
+
+    async def cleanup(self):
+        pass
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(directory=str(tmp_path), max_entries=2)
+
+def test_result_cache_key_is_canonical(cache):
+    first = cache.key_for("form_analysis", {"a": 1, "b": [1, 2]}, {"language": "python", "request_id": 1}, ["language"])
+    second = cache.key_for("form_analysis", {"b": [1, 2], "a": 1}, {"language": "python", "request_id": 2}, ["language"])
+    other = cache.key_for("form_analysis", {"a": 1, "b": [1, 2]}, {"language": "java"}, ["language"])
+
+    assert first == second
+    assert first != other
+
+@pytest.mark.asyncio
+async def test_result_cache_tiers(cache, tmp_path):
+    async def compute():
+        return {"value": 1}
+
+    assert await cache.get_or_compute("k1", compute, ttl=60) == ({"value": 1}, "miss")
+    assert await cache.get_or_compute("k1", compute, ttl=60) == ({"value": 1}, "memory")
+
+    cache.clear()
+    assert await cache.get_or_compute("k1", compute, ttl=60) == ({"value": 1}, "disk")
+    assert cache.metrics == {"memory_hits": 1, "disk_hits": 1, "misses": 1, "coalesced": 0, "disk_evictions": 0}
+
+@pytest.mark.asyncio
+async def test_result_cache_returns_a_copy_to_every_caller(cache):
+    async def compute():
+        await asyncio.sleep(0.01)
+        return {"fields": ["a"]}
+
+    (first, _), (coalesced, _) = await asyncio.gather(
+        cache.get_or_compute("k", compute, ttl=60),
+        cache.get_or_compute("k", compute, ttl=60)
+    )
+    first["fields"].append("mutated")
+    coalesced["fields"].append("mutated")
+    cached, source = await cache.get_or_compute("k", compute, ttl=60)
+
+    assert source == "memory"
+    assert cached == {"fields": ["a"]}
+    cached["fields"].clear()
+    assert (await cache.get_or_compute("k", compute, ttl=60))[0] == {"fields": ["a"]}
+
+@pytest.mark.asyncio
+async def test_memory_only_result_cache_never_touches_disk(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache = ResultCache(directory=None)
+
+    async def compute():
+        return {"value": 1}
+
+    assert await cache.get_or_compute("k", compute, ttl=60) == ({"value": 1}, "miss")
+    assert await cache.get_or_compute("k", compute, ttl=60) == ({"value": 1}, "memory")
+    cache.clear()
+    assert (await cache.get_or_compute("k", compute, ttl=60))[1] == "miss"
+    assert os.listdir(tmp_path) == []
+
+def test_result_cache_sweep_expires_and_caps_disk_entries(tmp_path):
+    cache = ResultCache(directory=str(tmp_path), max_disk_bytes=250)
+    cache._write("expired", '"x"', ttl=-1)
+    for age, key in enumerate(["k3", "k2", "k1"]):
+        cache._write(key, '"' + "x" * 100 + '"', ttl=60)
+        os.utime(cache._path(key), (time.time() - age, time.time() - age))
+
+    assert cache.sweep() == 2
+    assert not os.path.exists(cache._path("expired"))
+    assert not os.path.exists(cache._path("k1"))
+    assert os.path.exists(cache._path("k2")) and os.path.exists(cache._path("k3"))
+    assert cache.metrics["disk_evictions"] == 2
+
+@pytest.mark.asyncio
+async def test_result_cache_coalesces_identical_calls(cache):
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"value": calls}
+
+    results = await asyncio.gather(*[cache.get_or_compute("k", compute, ttl=60) for _ in range(5)])
+
+    assert calls == 1
+    assert all(payload == {"value": 1} for payload, _ in results)
+    assert sorted(source for _, source in results) == ["coalesced"] * 4 + ["miss"]
+
+@pytest.mark.asyncio
+async def test_waiters_recompute_when_the_computing_call_is_cancelled(cache):
+    calls = 0
+    started = asyncio.Event()
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        started.set()
+        await asyncio.sleep(0.05)
+        return {"value": calls}
+
+    leader = asyncio.create_task(cache.get_or_compute("k", compute, ttl=60))
+    await started.wait()
+    waiters = [asyncio.create_task(cache.get_or_compute("k", compute, ttl=60)) for _ in range(3)]
+    await asyncio.sleep(0)
+    leader.cancel()
+    results = await asyncio.gather(*waiters)
+
+    assert leader.cancelled()
+    assert calls == 2
+    assert all(payload == {"value": 2} for payload, _ in results)
+    assert sorted(source for _, source in results) == ["coalesced", "coalesced", "miss"]
+
+@pytest.mark.asyncio
+async def test_registry_caches_successful_results_only(cache):
+    registry = ToolRegistry(result_cache=cache)
+    tool = CountingTool()
+    registry.register(tool)
+
+    assert not (await registry.execute_tool("counting", {"form_data": {}}, {})).success
+    assert (await registry.execute_tool("counting", {"form_data": {}}, {})).success
+    cached = await registry.execute_tool("counting", {"form_data": {}}, {})
+
+    assert cached.metadata["result_cache"] == "memory"
+    assert cached.data == {"calls": 2}
+    assert tool.calls == 2
+    assert registry.get_metrics()["result_cache"]["memory_hits"] == 1
@@ -0,0 +1,79 @@
+import os
+import time
+import pytest
+import httpx
+from unittest.mock import patch
+from src.tools.snapshot_cache import SnapshotCache, SnapshotCacheConfig
+
+FORM_DATA = {"elements": [{"name": "txtName"}], "validation_rules": {}, "event_handlers": {}}
+
+@pytest.fixture
+def cache(tmp_path):
+    return SnapshotCache(SnapshotCacheConfig(directory=str(tmp_path), ttl=60, store_dom=True))
+
+def test_snapshot_cache_key_ignores_cache_flags(cache):
+    url = "http://legacy.example.com/Default.aspx"
+    assert cache.key_for(url, {"url": url, "use_cache": True}) == cache.key_for(url, {"url": url})
+    assert cache.key_for(url, {"mode": "static"}) != cache.key_for(url, {"mode": "browser"})
+
+@pytest.mark.asyncio
+async def test_snapshot_cache_round_trip(cache):
+    key = cache.key_for("http://legacy.example.com/Default.aspx", {})
+    await cache.store(key, "http://legacy.example.com/Default.aspx", FORM_DATA, {"source": "static"},
+                      headers={"ETag": '"v1"'}, dom="<form></form>")
+
+    snapshot, status = await cache.lookup(key)
+
+    assert status == "hit"
+    assert snapshot.data == FORM_DATA
+    assert snapshot.etag == '"v1"'
+    assert await cache.load_dom(key) == "<form></form>"
+
+@pytest.mark.asyncio
+async def test_snapshot_cache_revalidates_stale_entries(cache):
+    url = "http://legacy.example.com/Default.aspx"
+    key = cache.key_for(url, {})
+    await cache.store(key, url, FORM_DATA, {}, headers={"ETag": '"v1"'})
+    snapshot, _ = await cache.lookup(key)
+    snapshot.stored_at = time.time() - 120
+    cache._write_entry(snapshot)
+
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(304)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with patch("src.tools.snapshot_cache.get_http_client", return_value=client):
+        snapshot, status = await cache.lookup(key)
+
+    assert status == "revalidated"
+    assert requests[0].headers["If-None-Match"] == '"v1"'
+    assert time.time() - snapshot.stored_at < 60
+
+@pytest.mark.asyncio
+async def test_snapshot_cache_drops_stale_entries_without_validators(cache):
+    key = cache.key_for("http://legacy.example.com/Default.aspx", {})
+    await cache.store(key, "http://legacy.example.com/Default.aspx", FORM_DATA, {})
+    snapshot, _ = await cache.lookup(key)
+    snapshot.stored_at = time.time() - 120
+    cache._write_entry(snapshot)
+
+    assert await cache.lookup(key) == (None, None)
+    assert not os.path.exists(cache._entry_path(key))
+
+@pytest.mark.asyncio
+async def test_snapshot_cache_evicts_least_recently_used(tmp_path):
+    cache = SnapshotCache(SnapshotCacheConfig(directory=str(tmp_path), max_bytes=400))
+    keys = []
+    for index in range(3):
+        key = cache.key_for(f"http://legacy.example.com/Page{index}.aspx", {})
+        keys.append(key)
+        await cache.store(key, f"http://legacy.example.com/Page{index}.aspx", FORM_DATA, {})
+        os.utime(cache._entry_path(key), (index, index))
+
+    await cache.store(keys[0], "http://legacy.example.com/Page0.aspx", FORM_DATA, {})
+
+    assert os.path.exists(cache._entry_path(keys[0]))
+    assert not os.path.exists(cache._entry_path(keys[1]))
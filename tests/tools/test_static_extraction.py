@@ -0,0 +1,93 @@
+import pytest
+import httpx
+from src.tools.static_extraction import StaticFormExtractor, extract_from_html
+
+WEBFORM_HTML = b"""
+<html><body>
+<form id="form1" method="post" action="Default.aspx">
+    <input type="hidden" name="__VIEWSTATE" id="__VIEWSTATE" value="/wEPDwUKLTk" />
+    <fieldset>
+        <legend>Customer</legend>
+        <label for="txtName">Name</label>
+        <input name="txtName" type="text" id="txtName" maxlength="50" required />
+        <select name="ddlCountry" id="ddlCountry" onchange="javascript:setTimeout('__doPostBack(\\'ddlCountry\\',\\'\\')', 0)">
+            <option value="us">United States</option>
+            <option value="ca">Canada</option>
+        </select>
+    </fieldset>
+    <textarea name="txtComments" id="txtComments" rows="4"></textarea>
+    <input type="submit" name="btnSave" value="Save" id="btnSave" onclick="return validate();" />
+</form>
+</body></html>
+"""
+
+def test_extract_from_html_matches_browser_shape():
+    form_data, reason = extract_from_html(WEBFORM_HTML)
+
+    assert reason is None
+    assert set(form_data) == {"elements", "validation_rules", "event_handlers"}
+    elements = {e["name"]: e for e in form_data["elements"]}
+    assert len(elements) == 5
+
+    name = elements["txtName"]
+    assert name["type"] == "text"
+    assert name["required"] is True
+    assert name["label"] == "Name"
+    assert name["fieldset"] == "Customer"
+    assert name["form"] == "form1"
+
+    country = elements["ddlCountry"]
+    assert country["type"] == "select"
+    assert country["options"][0] == {"value": "us", "label": "United States", "selected": True}
+
+    assert elements["txtComments"]["attributes"]["rows"] == "4"
+
+    rules = form_data["validation_rules"]["client_side"]["form1"]
+    assert rules["txtName"]["required"] is True
+    assert rules["txtName"]["maxLength"] == 50
+    assert rules["txtComments"]["minLength"] == -1
+    assert form_data["validation_rules"]["server_side"]["form1"]["__VIEWSTATE"]["decoded"] is False
+
+    handlers = form_data["event_handlers"]["client_side"]["form1"]
+    assert handlers["ddlCountry"] == {"onchange": True}
+    assert handlers["btnSave"] == {"onclick": True}
+
+    postbacks = form_data["event_handlers"]["server_side"]["form1"]
+    assert postbacks["ddlCountry"] == {"postback": {"arguments": [""]}}
+
+def test_extract_from_html_detects_client_rendered_pages():
+    _, reason = extract_from_html(b"<html><body><div id='root'></div><script src='app.js'></script></body></html>")
+    assert reason is not None
+
+    _, reason = extract_from_html(b"<html><body><form><div ng-app='x'><input name='a'></div></form></body></html>")
+    assert reason == "client-side framework template"
+
+    _, reason = extract_from_html(b"<html><body><form><input name='a'></form><iframe src='Edit.aspx'></iframe></body></html>")
+    assert reason == "page embeds frames"
+
+def test_extract_from_html_includes_controls_outside_forms():
+    form_data, _ = extract_from_html(b"""
+        <html><body>
+            <form id="form1"><input name="txtName"></form>
+            <input name="txtSearch" onkeyup="filter()">
+            <select name="ddlSort" form="form1"><option>Name</option></select>
+        </body></html>
+    """)
+
+    assert [(e["name"], e["form"]) for e in form_data["elements"]] == [
+        ("txtName", "form1"), ("txtSearch", None), ("ddlSort", "form1")
+    ]
+    assert set(form_data["validation_rules"]["client_side"]["form1"]) == {"txtName", "ddlSort"}
+    assert form_data["event_handlers"]["client_side"]["(none)"] == {"txtSearch": {"onkeyup": True}}
+
+@pytest.mark.asyncio
+async def test_static_form_extractor_fetches_with_shared_client():
+    def handler(request):
+        return httpx.Response(200, content=WEBFORM_HTML, headers={"ETag": '"abc"'})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        page = await StaticFormExtractor(client).extract("http://legacy.example.com/Default.aspx")
+
+    assert page.needs_javascript is False
+    assert page.headers["etag"] == '"abc"'
+    assert len(page.form_data["elements"]) == 5
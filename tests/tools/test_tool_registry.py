@@ -0,0 +1,173 @@
+import asyncio
+import pytest
+from typing import Any, Dict, List
+from src.tools.base import BaseTool, CircuitBreaker, ToolConfig, ToolRegistry, ToolResult
+
+class ScriptedTool(BaseTool):
+    """Tool returning (or raising) a scripted sequence of outcomes."""
+
+    def __init__(self, outcomes: List[Any], **config: Any):
+        super().__init__(ToolConfig(name="scripted", description="Scripted tool", retry_delay=0, **config))
+        self.outcomes = list(outcomes)
+        self.calls = 0
+        self.cancelled = False
+
+    async def execute(self, params: Dict[str, Any], context: Dict[str, Any]) -> ToolResult:
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if self.outcomes else ToolResult(success=True, data={})
+        if outcome == "hang":
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                self.cancelled = True
+                raise
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    async def validate_params(self, params: Dict[str, Any]) -> bool:
+        return True
+
+    async def cleanup(self):
+        pass
+
+def failure(retryable: bool) -> ToolResult:
+    return ToolResult(success=False, data={}, error="boom", retryable=retryable)
+
+@pytest.mark.asyncio
+async def test_registry_retries_retryable_failures():
+    registry = ToolRegistry()
+    tool = ScriptedTool([failure(True), ConnectionError("reset"), ToolResult(success=True, data={"ok": True})])
+    registry.register(tool)
+
+    result = await registry.execute_tool("scripted", {}, {})
+
+    assert result.success
+    assert tool.calls == 3
+    assert registry.get_metrics()["scripted"]["retries"] == 2
+
+@pytest.mark.asyncio
+async def test_registry_does_not_retry_permanent_failures():
+    registry = ToolRegistry()
+    tool = ScriptedTool([failure(False), ValueError("bad form")])
+    registry.register(tool)
+
+    assert not (await registry.execute_tool("scripted", {}, {})).success
+    assert not (await registry.execute_tool("scripted", {}, {})).success
+    assert tool.calls == 2
+    assert registry.get_metrics()["scripted"]["retries"] == 0
+
+@pytest.mark.asyncio
+async def test_registry_enforces_timeout_and_cancels_the_call():
+    registry = ToolRegistry()
+    tool = ScriptedTool(["hang"], timeout=0.05, retry_count=0)
+    registry.register(tool)
+
+    result = await registry.execute_tool("scripted", {}, {})
+
+    assert not result.success
+    assert result.retryable
+    assert "timed out" in result.error
+    assert tool.cancelled
+    assert registry.get_metrics()["scripted"]["timeouts"] == 1
+
+@pytest.mark.asyncio
+async def test_registry_opens_circuit_after_repeated_failures():
+    registry = ToolRegistry()
+    tool = ScriptedTool([failure(True)] * 2, retry_count=0, circuit_failure_threshold=2, circuit_reset_timeout=60)
+    registry.register(tool)
+
+    await registry.execute_tool("scripted", {}, {})
+    await registry.execute_tool("scripted", {}, {})
+    rejected = await registry.execute_tool("scripted", {}, {})
+
+    assert "circuit open" in rejected.error
+    assert tool.calls == 2
+    metrics = registry.get_metrics()["scripted"]
+    assert metrics["circuit_rejections"] == 1
+    assert metrics["circuit"] == "open"
+
+def test_circuit_breaker_half_open_allows_one_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+
+    assert breaker.state == "half_open"
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+@pytest.mark.asyncio
+async def test_cancelled_half_open_trial_releases_the_circuit():
+    registry = ToolRegistry()
+    tool = ScriptedTool(
+        [failure(True), "hang"],
+        retry_count=0,
+        circuit_failure_threshold=1,
+        circuit_reset_timeout=0.01
+    )
+    registry.register(tool)
+    await registry.execute_tool("scripted", {}, {})
+    await asyncio.sleep(0.02)
+
+    trial = asyncio.create_task(registry.execute_tool("scripted", {}, {}))
+    await asyncio.sleep(0.01)
+    trial.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await trial
+
+    result = await registry.execute_tool("scripted", {}, {})
+    assert result.success
+    assert registry.get_metrics()["scripted"]["circuit"] == "closed"
+
+class GatedTool(ScriptedTool):
+    """Tool whose calls block until the test opens the gate."""
+
+    def __init__(self, **config: Any):
+        super().__init__([], **config)
+        self.gate = asyncio.Event()
+        self.running = 0
+        self.peak = 0
+
+    async def execute(self, params: Dict[str, Any], context: Dict[str, Any]) -> ToolResult:
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await self.gate.wait()
+            return ToolResult(success=True, data={})
+        finally:
+            self.running -= 1
+
+@pytest.mark.asyncio
+async def test_registry_limits_concurrency_and_rejects_when_queue_is_full():
+    registry = ToolRegistry()
+    tool = GatedTool(max_concurrency=2, max_queue=1)
+    registry.register(tool)
+
+    calls = [asyncio.create_task(registry.execute_tool("scripted", {}, {})) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    rejected = await registry.execute_tool("scripted", {}, {})
+
+    assert not rejected.success
+    assert "queue full" in rejected.error
+    assert registry.get_metrics()["scripted"]["waiting"] == 1
+
+    tool.gate.set()
+    results = await asyncio.gather(*calls)
+    assert all(result.success for result in results)
+    assert tool.peak == 2
+    assert registry.get_metrics()["scripted"]["queue_rejections"] == 1
+
+@pytest.mark.asyncio
+async def test_registry_rejects_calls_that_wait_too_long():
+    registry = ToolRegistry()
+    tool = GatedTool(max_concurrency=1, queue_timeout=0.02)
+    registry.register(tool)
+
+    first = asyncio.create_task(registry.execute_tool("scripted", {}, {}))
+    await asyncio.sleep(0.01)
+    queued = await registry.execute_tool("scripted", {}, {})
+
+    assert "queue timeout" in queued.error
+    tool.gate.set()
+    assert (await first).success
@@ -0,0 +1,87 @@
+import base64
+from src.tools import viewstate
+from src.tools.viewstate import cap_tree, decode_state_field, extract_server_side, postback_targets
+
+def encode(payload: bytes, mac: bytes = b"\x00" * 20) -> str:
+    return base64.b64encode(b"\xff\x01" + payload + mac).decode("ascii")
+
+def string(value: str) -> bytes:
+    data = value.encode("utf-8")
+    return bytes([len(data)]) + data
+
+# Pair(Pair("1234", null), ArrayList[IndexedStringAdd("Text"), IndexedString(0), true])
+VIEWSTATE = encode(
+    b"\x0f" + b"\x0f" + b"\x05" + string("1234") + b"\x64"
+    + b"\x16\x03" + b"\x1e" + string("Text") + b"\x1f\x00" + b"\x67"
+)
+
+# ArrayList[viewstate hash, two allowed postback values]
+EVENTVALIDATION = encode(b"\x16\x03" + b"\x02\x81\x01" + b"\x02\x05" + b"\x66")
+
+def test_decode_state_field_reads_object_tree():
+    decoded = decode_state_field(VIEWSTATE)
+
+    assert "error" not in decoded
+    assert decoded["tree"] == {"pair": [{"pair": ["1234", None]}, ["Text", "Text", True]]}
+    assert decoded["mac_protected"] is True
+    assert decoded["indexed_strings"] == ["Text"]
+
+def test_decode_state_field_streams_large_values(monkeypatch):
+    monkeypatch.setattr(viewstate, "CHUNK_CHARS", 8)
+    long_text = "x" * 1000
+    value = encode(b"\x05" + b"\xe8\x07" + long_text.encode("ascii"))
+    # Insert line breaks to check chunk realignment
+    value = "\n".join(value[i:i + 76] for i in range(0, len(value), 76))
+
+    decoded = decode_state_field(value)
+
+    assert decoded["tree"].endswith("...<1000 bytes>")
+    assert decoded["mac_protected"] is True
+
+def test_decode_state_field_is_memoized_and_returns_copies(monkeypatch):
+    first = decode_state_field(VIEWSTATE)
+    first["indexed_strings"].append("mutated")
+    monkeypatch.setattr(viewstate, "ObjectStateDecoder", None)
+
+    second = decode_state_field(VIEWSTATE)
+
+    assert second["indexed_strings"] == ["Text"]
+    assert second is not first
+
+def test_decode_state_field_reports_encrypted_values():
+    decoded = decode_state_field(base64.b64encode(b"\x12\x34encrypted").decode("ascii"))
+    assert "possibly encrypted" in decoded["error"]
+
+def test_cap_tree_elides_nodes_past_the_budget():
+    tree, truncated = cap_tree({"pair": [list(range(10)), "text"]}, max_nodes=5)
+
+    assert tree == {"pair": [[0, 1, "...<8 more>"], "...<1 more>"]}
+    assert truncated is True
+    assert cap_tree(["a", "b"], max_nodes=5) == (["a", "b"], False)
+
+def test_postback_targets():
+    targets = postback_targets([
+        "javascript:__doPostBack('ctl00$Main$gvOrders','Page$2')",
+        "setTimeout('__doPostBack(\\'ctl00$Main$ddlCountry\\',\\'\\')', 0)",
+        'WebForm_DoPostBackWithOptions(new WebForm_PostBackOptions(&quot;ctl00$Main$btnSave&quot;, &quot;&quot;, true, &quot;&quot;, &quot;&quot;, false, false))'
+    ])
+
+    assert targets["ctl00$Main$gvOrders"] == {"postback": {"arguments": ["Page$2"]}}
+    assert targets["ctl00$Main$ddlCountry"] == {"postback": {"arguments": [""]}}
+    assert targets["ctl00$Main$btnSave"]["postback"]["causes_validation"] is True
+
+def test_extract_server_side():
+    elements = [
+        {"name": "__VIEWSTATE", "value": VIEWSTATE, "form": "form1"},
+        {"name": "__EVENTVALIDATION", "value": EVENTVALIDATION, "form": "form1"},
+        {"name": "txtName", "value": None, "form": "form1"}
+    ]
+
+    validation, events = extract_server_side(elements, ["__doPostBack('btnSave','')"])
+
+    assert validation["form1"]["__VIEWSTATE"]["decoded"] is True
+    assert validation["form1"]["__VIEWSTATE"]["persisted_properties"] == ["Text"]
+    assert validation["form1"]["__EVENTVALIDATION"]["allowed_postback_values"] == 2
+    assert validation["form1"]["__VIEWSTATE"]["tree"] == {"pair": [{"pair": ["1234", None]}, ["Text", "Text", True]]}
+    assert "tree_truncated" not in validation["form1"]["__VIEWSTATE"]
+    assert events["form1"]["btnSave"] == {"postback": {"arguments": [""]}}
@@ -315,4 +315,103 @@ async def test_web_navigation_tool_event_handlers_extraction(web_navigation_tool
     country_events = event_handlers["country"]
     assert len(country_events) == 1
     assert country_events[0]["type"] == "change"
-    assert country_events[0]["handler"] == "updateCities" 
\ No newline at end of file
+    assert country_events[0]["handler"] == "updateCities" 
+
+
+def test_decode_element_rows():
+    """Test expanding the columnar element payload."""
+    from src.tools.form_extraction import ELEMENT_COLUMNS, decode_element_rows
+
+    row = {column: None for column in ELEMENT_COLUMNS}
+    row.update({
+        "name": "country",
+        "type": "select",
+        "required": True,
+        "options": [["us", "United States", True], ["ca", "Canada", False]]
+    })
+
+    elements = decode_element_rows([[row[column] for column in ELEMENT_COLUMNS]])
+
+    assert len(elements) == 1
+    assert elements[0]["name"] == "country"
+    assert elements[0]["required"] is True
+    assert elements[0]["options"][0] == {"value": "us", "label": "United States", "selected": True}
+    assert elements[0]["options"][1]["selected"] is False
+
+@pytest.mark.asyncio
+async def test_web_navigation_tool_resource_blocking(web_navigation_tool):
+    """Test that heavy and third-party requests are aborted."""
+    from unittest.mock import Mock, AsyncMock
+
+    browser_context = Mock()
+    browser_context.route = AsyncMock()
+    await web_navigation_tool._configure_resource_blocking(
+        browser_context,
+        "http://legacy.example.com/Default.aspx",
+        {"block_resources": True, "block_third_party": True}
+    )
+    handler = browser_context.route.call_args[0][1]
+
+    def make_route(url, resource_type, navigation=False):
+        route = Mock()
+        route.abort = AsyncMock()
+        route.fallback = AsyncMock()
+        route.request.url = url
+        route.request.resource_type = resource_type
+        route.request.is_navigation_request = Mock(return_value=navigation)
+        route.request.frame.parent_frame = None
+        return route
+
+    image = make_route("http://legacy.example.com/logo.png", "image")
+    await handler(image)
+    image.abort.assert_called_once()
+
+    tracker = make_route("http://analytics.example.net/track.js", "script")
+    await handler(tracker)
+    tracker.abort.assert_called_once()
+
+    script = make_route("http://cdn.legacy.example.com/WebResource.axd", "script")
+    await handler(script)
+    script.fallback.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_web_navigation_tool_rejects_unknown_load_strategy(web_navigation_tool):
+    """Test validation of the load strategy parameter."""
+    assert await web_navigation_tool.validate_params({"url": "http://example.com", "wait_until": "form_controls"}) is True
+    assert await web_navigation_tool.validate_params({"url": "http://example.com", "wait_until": "never"}) is False
+
+@pytest.mark.asyncio
+async def test_web_navigation_tool_merges_frames(web_navigation_tool):
+    """Test that every frame is walked and its forms keep their provenance."""
+    from unittest.mock import Mock, AsyncMock
+    from src.tools.form_extraction import ELEMENT_COLUMNS
+
+    def payload(frame, form, name):
+        row = {column: None for column in ELEMENT_COLUMNS}
+        row.update({"name": name, "form": form, "frame": frame, "attributes": {}})
+        return {
+            "elements": [[row[column] for column in ELEMENT_COLUMNS]],
+            "validation": {form: {name: {"required": False}}},
+            "handlers": {form: {}},
+            "postbacks": []
+        }
+
+    main_frame = Mock(parent_frame=None)
+    main_frame.evaluate = AsyncMock(return_value=payload(None, "form1", "txtSearch"))
+    content = Mock(parent_frame=main_frame, url="http://legacy.example.com/Edit.aspx")
+    content.name = "ifrContent"
+    content.evaluate = AsyncMock(return_value=payload("ifrContent", "form1", "txtName"))
+    detached = Mock(parent_frame=main_frame, url="about:blank")
+    detached.name = ""
+    detached.evaluate = AsyncMock(side_effect=Exception("Frame was detached"))
+    main_frame.child_frames = [content, detached]
+
+    page = Mock(main_frame=main_frame, frames=[main_frame, content, detached])
+    form_data = await web_navigation_tool._extract_form_data(page)
+
+    assert [(e["name"], e["form"], e["frame"]) for e in form_data["elements"]] == [
+        ("txtSearch", "form1", None),
+        ("txtName", "ifrContent::form1", "ifrContent")
+    ]
+    assert set(form_data["validation_rules"]["client_side"]) == {"form1", "ifrContent::form1"}
+    assert content.evaluate.call_args[0][1][2] == "ifrContent"
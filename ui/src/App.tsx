@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import {
     Container,
     Box,
@@ -12,9 +12,24 @@ import {
     Paper,
     CircularProgress,
     Alert,
+    LinearProgress,
+    List,
+    ListItem,
+    ListItemText,
 } from '@mui/material';
 import axios from 'axios';
 
+const API_URL = 'http://localhost:8000';
+// Consecutive stream errors, without an event in between, before giving up on a run
+const MAX_STREAM_FAILURES = 5;
+
+interface StepStatus {
+    name: string;
+    status: 'running' | 'retrying' | 'finished' | 'failed';
+    detail?: string;
+    result?: any;
+}
+
 interface GenerationRequest {
     url: string;
     platform: string;
@@ -32,19 +47,92 @@ function App() {
     const [loading, setLoading] = useState(false);
     const [error, setError] = useState<string | null>(null);
     const [result, setResult] = useState<any>(null);
+    const [steps, setSteps] = useState<StepStatus[]>([]);
+    const eventSource = useRef<EventSource | null>(null);
+
+    useEffect(() => () => eventSource.current?.close(), []);
+
+    const updateStep = (name: string, update: Partial<StepStatus>) => {
+        setSteps((current) => {
+            const existing = current.find((step) => step.name === name);
+            if (!existing) {
+                return [...current, { name, status: 'running', ...update }];
+            }
+            return current.map((step) => (step.name === name ? { ...step, ...update } : step));
+        });
+    };
+
+    const finish = () => {
+        eventSource.current?.close();
+        eventSource.current = null;
+        setLoading(false);
+    };
+
+    const followRun = (eventsUrl: string) => {
+        const source = new EventSource(`${API_URL}${eventsUrl}`);
+        eventSource.current = source;
+        let finished = false;
+        let failures = 0;
+        const on = (type: string, handler: (event: any) => void) =>
+            source.addEventListener(type, (message) => {
+                failures = 0;
+                handler(JSON.parse((message as MessageEvent).data));
+            });
+
+        // EventSource reconnects on its own (resuming via Last-Event-ID);
+        // stop it once the run is over or the server keeps failing
+        source.onerror = () => {
+            failures += 1;
+            if (finished || eventSource.current !== source) {
+                source.close();
+                return;
+            }
+            if (failures >= MAX_STREAM_FAILURES || source.readyState === EventSource.CLOSED) {
+                setError('Lost connection to the run');
+                finish();
+            }
+        };
+
+        on('step_started', (event) => updateStep(event.step, { status: 'running' }));
+        on('step_progress', (event) =>
+            updateStep(event.step, { status: 'retrying', detail: `Retry ${event.data.retry}: ${event.data.error}` })
+        );
+        on('step_finished', (event) => {
+            // Full results only reach live subscribers; replayed events fetch them
+            updateStep(event.step, { status: 'finished', result: event.data.result ?? event.data.summary, detail: undefined });
+            if (event.data.result === undefined) {
+                axios
+                    .get(`${API_URL}/runs/${event.run_id}/steps/${event.step}/result`)
+                    .then((response) => updateStep(event.step, { result: response.data }))
+                    .catch(() => undefined);
+            }
+        });
+        on('step_failed', (event) => updateStep(event.step, { status: 'failed', detail: event.data.error }));
+        on('run_finished', (event) => {
+            finished = true;
+            setResult(event.data.result);
+            finish();
+        });
+        on('run_failed', (event) => {
+            finished = true;
+            setError(event.data.error || 'An error occurred');
+            finish();
+        });
+    };
 
     const handleSubmit = async (e: React.FormEvent) => {
         e.preventDefault();
+        eventSource.current?.close();
         setLoading(true);
         setError(null);
         setResult(null);
+        setSteps([]);
 
         try {
-            const response = await axios.post('http://localhost:8000/generate', request);
-            setResult(response.data);
+            const response = await axios.post(`${API_URL}/runs`, request);
+            followRun(response.data.events_url);
         } catch (err: any) {
             setError(err.response?.data?.detail || 'An error occurred');
-        } finally {
             setLoading(false);
         }
     };
@@ -111,6 +199,27 @@ function App() {
                     </form>
                 </Paper>
 
+                {steps.length > 0 && (
+                    <Paper sx={{ p: 3, mb: 3 }}>
+                        <Typography variant="h6" gutterBottom>
+                            Progress
+                        </Typography>
+                        {loading && <LinearProgress sx={{ mb: 2 }} />}
+                        <List dense>
+                            {steps.map((step) => (
+                                <ListItem key={step.name} sx={{ display: 'block' }}>
+                                    <ListItemText primary={`${step.name}: ${step.status}`} secondary={step.detail} />
+                                    {step.result !== undefined && (
+                                        <pre style={{ overflow: 'auto', maxHeight: 240 }}>
+                                            {JSON.stringify(step.result, null, 2)}
+                                        </pre>
+                                    )}
+                                </ListItem>
+                            ))}
+                        </List>
+                    </Paper>
+                )}
+
                 {error && (
                     <Alert severity="error" sx={{ mb: 2 }}>
                         {error}